@@ -0,0 +1,187 @@
+import json
+from bisect import insort
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from .database import UserAggregate, PainEntry, LifestyleEntry
+
+# Window sizes match the context semantics: last 30 pain entries, last 7 lifestyle entries
+PAIN_WINDOW = 30
+LIFESTYLE_WINDOW = 7
+# Tries at a write that lost a race for an aggregate row before giving up
+WRITE_ATTEMPTS = 3
+
+def new_aggregate(user_id: str) -> UserAggregate:
+    return UserAggregate(
+        user_id=user_id,
+        pain_window="[]",
+        pain_sum=0.0,
+        pain_count=0,
+        lifestyle_window="[]",
+        sleep_sum=0.0,
+        stress_sum=0.0,
+        exercise_sum=0.0,
+        lifestyle_count=0
+    )
+
+def apply_pain_entry(aggregate: UserAggregate, date: datetime, pain_score: int):
+    """Add a pain entry to the rolling window, evicting the oldest if it is full"""
+    window = json.loads(aggregate.pain_window)
+    insort(window, [date.isoformat(), pain_score])
+    aggregate.pain_sum += pain_score
+    aggregate.pain_count += 1
+    
+    if len(window) > PAIN_WINDOW:
+        _, evicted_score = window.pop(0)
+        aggregate.pain_sum -= evicted_score
+        aggregate.pain_count -= 1
+    
+    aggregate.pain_window = json.dumps(window)
+    aggregate.updated_at = datetime.utcnow()
+
+def apply_lifestyle_entry(aggregate: UserAggregate, date: datetime, sleep_hours: float, stress_level: int, exercise_minutes: int):
+    """Add a lifestyle entry to the rolling window, evicting the oldest if it is full"""
+    window = json.loads(aggregate.lifestyle_window)
+    insort(window, [date.isoformat(), sleep_hours, stress_level, exercise_minutes])
+    aggregate.sleep_sum += sleep_hours
+    aggregate.stress_sum += stress_level
+    aggregate.exercise_sum += exercise_minutes
+    aggregate.lifestyle_count += 1
+    
+    if len(window) > LIFESTYLE_WINDOW:
+        _, evicted_sleep, evicted_stress, evicted_exercise = window.pop(0)
+        aggregate.sleep_sum -= evicted_sleep
+        aggregate.stress_sum -= evicted_stress
+        aggregate.exercise_sum -= evicted_exercise
+        aggregate.lifestyle_count -= 1
+    
+    aggregate.lifestyle_window = json.dumps(window)
+    aggregate.updated_at = datetime.utcnow()
+
+def aggregate_averages(aggregate: UserAggregate) -> dict:
+    """Averages used for prediction context, with the usual defaults for missing data"""
+    pain_count = aggregate.pain_count if aggregate else 0
+    lifestyle_count = aggregate.lifestyle_count if aggregate else 0
+    
+    return {
+        "historical_avg_pain": aggregate.pain_sum / pain_count if pain_count else 5.0,
+        "avg_sleep": aggregate.sleep_sum / lifestyle_count if lifestyle_count else 7.0,
+        "avg_stress": aggregate.stress_sum / lifestyle_count if lifestyle_count else 5.0,
+        "avg_exercise": aggregate.exercise_sum / lifestyle_count if lifestyle_count else 30.0,
+        "data_points": pain_count
+    }
+
+def recent_entry_queries(user_id: str):
+    """Queries for the raw entries that make up a user's current windows"""
+    pain_query = select(PainEntry.date, PainEntry.pain_score).where(
+        PainEntry.user_id == user_id
+    ).order_by(PainEntry.date.desc()).limit(PAIN_WINDOW)
+    
+    lifestyle_query = select(
+        LifestyleEntry.date,
+        LifestyleEntry.sleep_hours,
+        LifestyleEntry.stress_level,
+        LifestyleEntry.exercise_minutes
+    ).where(
+        LifestyleEntry.user_id == user_id
+    ).order_by(LifestyleEntry.date.desc()).limit(LIFESTYLE_WINDOW)
+    
+    return pain_query, lifestyle_query
+
+def aggregate_from_entries(user_id: str, pain_rows, lifestyle_rows) -> UserAggregate:
+    """Build an aggregate from raw (date, ...) rows"""
+    aggregate = new_aggregate(user_id)
+    for row in pain_rows:
+        apply_pain_entry(aggregate, row.date, row.pain_score)
+    for row in lifestyle_rows:
+        apply_lifestyle_entry(aggregate, row.date, row.sleep_hours, row.stress_level, row.exercise_minutes)
+    return aggregate
+
+async def get_aggregate_for_update(user_id: str, db) -> UserAggregate:
+    """Load (locking where supported) or create the user's aggregate row.
+    
+    A missing row is seeded from the user's stored entries, so users with
+    entries from before aggregates existed keep their history. Call this
+    before the new entry reaches the database (sessions don't autoflush),
+    or the new entry would be counted twice. Row locks don't exist on
+    SQLite, so commit through commit_with_retry, which redoes the write
+    when another writer changed or created the row first.
+    """
+    result = await db.execute(
+        select(UserAggregate).where(UserAggregate.user_id == user_id).with_for_update()
+    )
+    aggregate = result.scalar_one_or_none()
+    if aggregate is None:
+        pain_query, lifestyle_query = recent_entry_queries(user_id)
+        aggregate = aggregate_from_entries(
+            user_id, (await db.execute(pain_query)).all(), (await db.execute(lifestyle_query)).all()
+        )
+        db.add(aggregate)
+    return aggregate
+
+async def commit_with_retry(db, write, attempts=WRITE_ATTEMPTS):
+    """Run ``await write()`` and commit, starting over after a concurrent aggregate update.
+    
+    ``write`` must redo all of its session changes (objects added before a
+    rollback are expunged) and read the aggregate through
+    get_aggregate_for_update.
+    """
+    for attempt in range(attempts):
+        await write()
+        try:
+            await db.commit()
+            return
+        except (StaleDataError, IntegrityError):
+            # Updated since we read it (StaleDataError) or seeded by someone else (IntegrityError)
+            await db.rollback()
+            if attempt == attempts - 1:
+                raise
+
+def _iter_entry_user_ids(db, chunk_size):
+    """Yield distinct user ids that have entries, one chunk at a time"""
+    user_ids = select(PainEntry.user_id).union(select(LifestyleEntry.user_id)).subquery()
+    last_user_id = None
+    while True:
+        query = select(user_ids.c.user_id).order_by(user_ids.c.user_id).limit(chunk_size)
+        if last_user_id is not None:
+            query = query.where(user_ids.c.user_id > last_user_id)
+        chunk = db.execute(query).scalars().all()
+        if not chunk:
+            return
+        yield chunk
+        last_user_id = chunk[-1]
+
+def _recompute(user_id: str, db) -> UserAggregate:
+    pain_query, lifestyle_query = recent_entry_queries(user_id)
+    return aggregate_from_entries(user_id, db.execute(pain_query).all(), db.execute(lifestyle_query).all())
+
+def rebuild_aggregates(db, chunk_size=500) -> int:
+    """Recompute every user's aggregate row from raw entries"""
+    rebuilt = 0
+    for user_ids in _iter_entry_user_ids(db, chunk_size):
+        for user_id in user_ids:
+            aggregate = _recompute(user_id, db)
+            # merge() rejects a version that differs from the stored row's, so it is stamped afterwards
+            del aggregate.updated_at
+            db.merge(aggregate).updated_at = datetime.utcnow()
+            rebuilt += 1
+        db.commit()
+    return rebuilt
+
+def check_aggregates(db, chunk_size=500, tolerance=1e-6) -> list:
+    """Return user ids whose stored aggregate disagrees with their raw entries"""
+    mismatched = []
+    for user_ids in _iter_entry_user_ids(db, chunk_size):
+        stored = {
+            aggregate.user_id: aggregate
+            for aggregate in db.execute(
+                select(UserAggregate).where(UserAggregate.user_id.in_(user_ids))
+            ).scalars()
+        }
+        for user_id in user_ids:
+            expected = aggregate_averages(_recompute(user_id, db))
+            actual = aggregate_averages(stored.get(user_id))
+            if any(abs(expected[key] - actual[key]) > tolerance for key in expected):
+                mismatched.append(user_id)
+    return mismatched
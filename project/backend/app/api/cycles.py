@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from datetime import datetime, date, time, timedelta
+from ..database import get_async_db, PeriodStart, UserCycle
+from ..utils.cache import prediction_cache
+from ..cycles import get_cycle_for_update, apply_period_start, cycle_summary
+from .pain import _invalidate_forecasts
+
+router = APIRouter()
+
+class PeriodStartCreate(BaseModel):
+    start_date: date = None
+
+@router.post("/periods")
+async def submit_period_start(
+    user_id: str,
+    period_data: PeriodStartCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Log the first day of a period"""
+    start_date = period_data.start_date or datetime.utcnow().date()
+    if start_date > datetime.utcnow().date():
+        raise HTTPException(status_code=400, detail="Period start can't be in the future")
+    
+    start = datetime.combine(start_date, time())
+    existing = await db.execute(
+        select(PeriodStart.id).where(PeriodStart.user_id == user_id, PeriodStart.date == start)
+    )
+    if existing.first() is not None:
+        raise HTTPException(status_code=409, detail="Period start already logged for this date")
+    
+    period_start = PeriodStart(user_id=user_id, date=start)
+    db.add(period_start)
+    
+    # Update the cached cycle state in the same transaction as the entry
+    state = await get_cycle_for_update(user_id, db)
+    apply_period_start(state, start_date)
+    await _invalidate_forecasts(user_id, db)
+    await db.commit()
+    prediction_cache.invalidate_user(user_id)
+    
+    return {
+        "status": "success",
+        "entry_id": period_start.id,
+        "cycle_length": state.cycle_length,
+        "message": "Period start recorded successfully"
+    }
+
+@router.get("/cycle/{user_id}")
+async def get_cycle(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Current cycle position and the estimated next period"""
+    state = await db.get(UserCycle, user_id)
+    today = datetime.utcnow().date()
+    summary = cycle_summary(state, today)
+    known = state is not None and state.last_period_start is not None
+    
+    return {
+        "user_id": user_id,
+        "last_period_start": state.last_period_start.date().isoformat() if known else None,
+        "cycle_length": summary["cycle_length"],
+        "cycle_day": summary["current_cycle_day"] if known else None,
+        "next_period_date": (today + timedelta(days=summary["days_to_next_period"])).isoformat() if known else None
+    }
\ No newline at end of file
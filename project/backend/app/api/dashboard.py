@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from ..database import get_async_db, PainEntry, LifestyleEntry
+from ..ml.predictor import predictor
+from ..ml.recommender import recommender
+from ..utils.memo import RequestMemo, get_request_memo
+from ..utils.encryption import encryptor
+from .predictions import _get_user_context, _get_forecast
+from .pain import PAIN_FIELDS, LIFESTYLE_FIELDS, _get_history_page, entry_to_dict
+
+router = APIRouter()
+
+@router.get("/dashboard")
+async def get_dashboard(
+    user_id: str,
+    days: int = 7,
+    history_limit: int = 10,
+    db: AsyncSession = Depends(get_async_db),
+    memo: RequestMemo = Depends(get_request_memo)
+):
+    """Predictions, recommendations and recent history in one round trip"""
+    if days < 1 or days > 14:
+        raise HTTPException(status_code=400, detail="Days must be between 1 and 14")
+    
+    # One context lookup and one multi-day forecast feed every section
+    user_context = await _get_user_context(user_id, db, memo)
+    predictions = await _get_forecast(user_id, days, db, memo)
+    recommendations = recommender.get_recommendations(
+        user_id=user_id,
+        prediction_data=predictions[0],
+        user_context=user_context
+    )
+    
+    pain_entries, pain_cursor = await memo.get_or_compute(
+        ("history", "pain", user_id, history_limit),
+        lambda: _get_history_page(PainEntry, user_id, history_limit, None, db)
+    )
+    lifestyle_entries, lifestyle_cursor = await memo.get_or_compute(
+        ("history", "lifestyle", user_id, history_limit),
+        lambda: _get_history_page(LifestyleEntry, user_id, history_limit, None, db)
+    )
+    
+    # Decrypt into the response dicts, never onto the ORM objects (that would be flushed back)
+    pain_rows = [entry_to_dict(entry, PAIN_FIELDS) for entry in pain_entries]
+    notes = await encryptor.decrypt_batch([row["notes"] for row in pain_rows])
+    for row, note in zip(pain_rows, notes):
+        row["notes"] = note
+    
+    return {
+        "user_id": user_id,
+        "predictions": predictions,
+        "recommendations": recommendations,
+        "pain_history": {
+            "entries": pain_rows,
+            "next_cursor": pain_cursor
+        },
+        "lifestyle_history": {
+            "entries": [entry_to_dict(entry, LIFESTYLE_FIELDS) for entry in lifestyle_entries],
+            "next_cursor": lifestyle_cursor
+        },
+        "generated_at": datetime.utcnow().isoformat(),
+        "model_version": predictor.model_version
+    }
\ No newline at end of file
@@ -0,0 +1,90 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+import csv
+import io
+import json
+from ..database import AsyncSessionLocal, PainEntry, LifestyleEntry
+from ..config import settings
+from ..utils.encryption import encryptor
+from .pain import PAIN_FIELDS, LIFESTYLE_FIELDS
+
+router = APIRouter()
+
+EXPORT_KINDS = {
+    "pain": (PainEntry, PAIN_FIELDS),
+    "lifestyle": (LifestyleEntry, LIFESTYLE_FIELDS)
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+@router.get("/export/{user_id}")
+async def export_entries(user_id: str, kind: str = "pain", format: str = "ndjson"):
+    """Stream a user's full pain or lifestyle history as NDJSON or CSV"""
+    if kind not in EXPORT_KINDS:
+        raise HTTPException(status_code=400, detail="Kind must be 'pain' or 'lifestyle'")
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+    
+    model, fields = EXPORT_KINDS[kind]
+    serialize = _ndjson_chunk if format == "ndjson" else _csv_chunk
+    filename = f"{kind}_{user_id}.{format}"
+    
+    return StreamingResponse(
+        _stream_export(model, fields, user_id, serialize, header=format == "csv"),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def _stream_export(model, fields, user_id: str, serialize, header: bool):
+    """Yield serialized chunks from a server-side cursor, oldest entry first"""
+    if header:
+        yield _csv_line(fields)
+    
+    columns = [getattr(model, field) for field in fields]
+    query = select(*columns).where(
+        model.user_id == user_id
+    ).order_by(model.date, model.id).execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+    
+    notes_index = fields.index("notes") if "notes" in fields else None
+    
+    # The session lives inside the generator so it stays open while streaming
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            if notes_index is not None:
+                rows = await _decrypt_column(rows, notes_index)
+            yield serialize(rows, fields)
+
+async def _decrypt_column(rows, index: int) -> list:
+    """Copy of a partition with one column decrypted as a batch"""
+    values = await encryptor.decrypt_batch([row[index] for row in rows])
+    return [(*row[:index], value, *row[index + 1:]) for row, value in zip(rows, values)]
+
+def _ndjson_chunk(rows, fields) -> str:
+    return "".join(
+        json.dumps(dict(zip(fields, row)), default=_json_default) + "\n"
+        for row in rows
+    )
+
+def _csv_chunk(rows, fields) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if hasattr(value, "isoformat") else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
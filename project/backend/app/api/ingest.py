@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
+from ..database import get_async_db
+from ..config import settings
+from ..ingest import ingest_records
+
+router = APIRouter()
+
+@router.post("/entries/batch")
+async def submit_entries_batch(
+    user_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Submit many pain/lifestyle entries at once (JSON array or NDJSON stream)"""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        # Streamed, so the size isn't known up front: stop at the limit and report where
+        records = _iter_ndjson(request)
+        max_records = settings.INGEST_MAX_RECORDS
+    else:
+        try:
+            body = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of records")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of records")
+        if len(body) > settings.INGEST_MAX_RECORDS:
+            raise HTTPException(status_code=413, detail=f"At most {settings.INGEST_MAX_RECORDS} records per request")
+        records = body
+        max_records = None
+    
+    results = await ingest_records(db, records, settings.INGEST_CHUNK_SIZE, user_id=user_id, max_records=max_records)
+    
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "created": sum(result["status"] == "created" for result in results),
+        "duplicates": sum(result["status"] == "duplicate" for result in results),
+        "errors": sum(result["status"] == "error" for result in results),
+        "results": results
+    }
+
+async def _iter_ndjson(request: Request):
+    """Yield decoded records from a streamed NDJSON body, one line at a time"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if buffer.strip():
+        yield _decode_line(buffer)
+
+def _decode_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        # Surfaces as a per-record error instead of failing the whole upload
+        return None
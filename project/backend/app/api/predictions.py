@@ -1,71 +1,169 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from ..database import get_db, PainEntry, LifestyleEntry
-from ..ml.predictor import predictor
+from ..database import get_async_db, Forecast, UserAggregate, UserCycle, UserModel
+from ..aggregates import aggregate_averages, aggregate_from_entries, recent_entry_queries
+from ..cycles import cycle_summary
+from ..ml.predictor import predictor, ModelNotReadyError
+from ..utils.cache import prediction_cache
+from ..personalization import user_models
+from ..utils.memo import RequestMemo, get_request_memo
+from ..utils.singleflight import SingleFlight
+from ..config import settings
 
 router = APIRouter()
 
+# Forest evaluation is CPU-bound, so it runs on a few threads and never on the event loop
+inference_pool = ThreadPoolExecutor(max_workers=settings.INFERENCE_THREADS, thread_name_prefix="inference")
+# Concurrent requests for the same forecast (dashboard fan-out, retries, several devices) share one computation
+forecast_flights = SingleFlight("forecast")
+
 @router.get("/predictions")
 async def get_predictions(
     user_id: str,
     days: int = 7,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    memo: RequestMemo = Depends(get_request_memo)
 ):
     """Get pain predictions for user"""
     if days < 1 or days > 14:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 14")
     
-    # Get user data for context
-    user_data = await _get_user_context(user_id, db)
-    
-    # Get predictions
-    predictions = predictor.predict_for_user(user_data, days)
+    # Get predictions, preferring the precomputed forecast table
+    predictions = await _get_forecast(user_id, days, db, memo)
     
     return {
         "user_id": user_id,
         "predictions": predictions,
         "generated_at": datetime.utcnow().isoformat(),
-        "model_version": "1.0"
+        "model_version": predictor.model_version
     }
 
-async def _get_user_context(user_id: str, db: Session) -> dict:
-    """Get user context for predictions"""
-    # Get recent pain entries
-    pain_entries = db.query(PainEntry).filter(
-        PainEntry.user_id == user_id
-    ).order_by(PainEntry.date.desc()).limit(30).all()
+async def _get_forecast(user_id: str, days: int, db: AsyncSession, memo: RequestMemo = None) -> list:
+    """Get predictions from the cache or forecast table, computing them live if missing"""
+    memo = memo or RequestMemo()
+    # Day i of a forecast doesn't depend on the horizon, so a longer one already
+    # produced for this request covers shorter ones
+    memoized = memo.get(("forecast", user_id))
+    if memoized is not None and len(memoized) >= days:
+        return memoized[:days]
+    
+    # Read once: a hot-swap mid-request must not file old results under the new version
+    model_version = predictor.model_version
+    predictions = await forecast_flights.do(
+        (user_id, days, model_version), lambda: _compute_forecast(user_id, days, model_version, db, memo)
+    )
+    memo.set(("forecast", user_id), predictions)
+    return predictions
+
+async def _compute_forecast(user_id: str, days: int, model_version: str, db: AsyncSession, memo: RequestMemo) -> list:
+    """Build the context and return cached, stored or freshly predicted forecasts"""
+    user_data = await _get_user_context(user_id, db, memo)
+    predictions = prediction_cache.get_predictions(user_id, user_data, days, model_version)
+    if predictions is not None:
+        return predictions
+    
+    predictions = await _load_stored_forecast(user_id, days, model_version, db)
+    if predictions is None:
+        try:
+            predictions = await asyncio.get_running_loop().run_in_executor(
+                inference_pool, predictor.predict_for_user, user_data, days
+            )
+        except ModelNotReadyError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
     
-    # Get recent lifestyle entries  
-    lifestyle_entries = db.query(LifestyleEntry).filter(
-        LifestyleEntry.user_id == user_id
-    ).order_by(LifestyleEntry.date.desc()).limit(7).all()
+    prediction_cache.set_predictions(user_id, user_data, days, model_version, predictions)
+    return predictions
+
+async def _load_stored_forecast(user_id: str, days: int, model_version: str, db: AsyncSession):
+    """Load precomputed predictions, or None unless the whole horizon is stored"""
+    today = datetime.utcnow()
+    dates = [(today + timedelta(days=day)).strftime('%Y-%m-%d') for day in range(days)]
     
-    # Calculate averages
-    historical_pain = [entry.pain_score for entry in pain_entries]
-    avg_pain = sum(historical_pain) / len(historical_pain) if historical_pain else 5.0
+    result = await db.execute(select(Forecast).where(
+        Forecast.user_id == user_id,
+        Forecast.model_version == model_version,
+        Forecast.date.in_(dates)
+    ).order_by(Forecast.date))
+    rows = result.scalars().all()
     
-    sleep_values = [entry.sleep_hours for entry in lifestyle_entries]
-    avg_sleep = sum(sleep_values) / len(sleep_values) if sleep_values else 7.0
+    if len(rows) != days:
+        return None
     
-    stress_values = [entry.stress_level for entry in lifestyle_entries]
-    avg_stress = sum(stress_values) / len(stress_values) if stress_values else 5.0
+    return [
+        {
+            'date': row.date,
+            'predicted_pain': row.predicted_pain,
+            'severe_probability': row.severe_probability,
+            'confidence_interval': [row.confidence_low, row.confidence_high],
+            'drivers': json.loads(row.drivers)
+        }
+        for row in rows
+    ]
+
+async def _get_user_context(user_id: str, db: AsyncSession, memo: RequestMemo = None) -> dict:
+    """Get user context for predictions"""
+    if memo is not None:
+        return await memo.get_or_compute(("context", user_id), lambda: _get_user_context(user_id, db))
     
-    exercise_values = [entry.exercise_minutes for entry in lifestyle_entries]
-    avg_exercise = sum(exercise_values) / len(exercise_values) if exercise_values else 30.0
+    version = await _context_version(user_id, db)
+    user_data = prediction_cache.get_context(user_id, version)
+    if user_data is None:
+        aggregate = await db.get(UserAggregate, user_id)
+        if aggregate is None:
+            # Users without an aggregate row yet (e.g. before a rebuild)
+            pain_query, lifestyle_query = recent_entry_queries(user_id)
+            aggregate = aggregate_from_entries(
+                user_id,
+                (await db.execute(pain_query)).all(),
+                (await db.execute(lifestyle_query)).all()
+            )
+        user_data = _summarize_context(
+            aggregate, await db.get(UserCycle, user_id), await user_models.get(user_id, db, version[2])
+        )
+        prediction_cache.set_context(user_id, user_data, version)
+    return user_data
+
+async def _context_version(user_id: str, db: AsyncSession) -> tuple:
+    """When the user's aggregate, cycle state and correction last changed, in one round trip.
     
-    # Simple cycle estimation (in real app, this would use cycle tracking)
-    # For MVP, we'll use a simple 28-day cycle estimation
-    current_cycle_day = (datetime.now().day % 28) + 1
-    days_to_next_period = 29 - current_cycle_day
+    Read before the context is built, so a write landing in between only
+    makes the entry look older than it is.
+    """
+    result = await db.execute(select(
+        select(UserAggregate.updated_at).where(UserAggregate.user_id == user_id).scalar_subquery(),
+        select(UserCycle.updated_at).where(UserCycle.user_id == user_id).scalar_subquery(),
+        select(UserModel.fitted_at).where(UserModel.user_id == user_id).scalar_subquery()
+    ))
+    return tuple(result.one())
+
+def build_user_context(user_id: str, db: Session) -> dict:
+    """Build user context with a synchronous session (batch jobs)"""
+    aggregate = db.get(UserAggregate, user_id)
+    if aggregate is None:
+        pain_query, lifestyle_query = recent_entry_queries(user_id)
+        aggregate = aggregate_from_entries(
+            user_id,
+            db.execute(pain_query).all(),
+            db.execute(lifestyle_query).all()
+        )
+    return _summarize_context(aggregate, db.get(UserCycle, user_id), user_models.get_sync(user_id, db))
+
+def _summarize_context(aggregate, cycle, personal: dict) -> dict:
+    """Turn a user's rolling aggregate, cycle state and personal correction into prediction context"""
+    averages = aggregate_averages(aggregate)
     
     return {
-        "historical_avg_pain": avg_pain,
-        "current_cycle_day": current_cycle_day,
-        "days_to_next_period": days_to_next_period,
-        "avg_sleep": avg_sleep,
-        "avg_stress": avg_stress,
-        "avg_exercise": avg_exercise,
-        "data_points": len(pain_entries)
+        "historical_avg_pain": averages["historical_avg_pain"],
+        **cycle_summary(cycle, datetime.utcnow().date()),
+        "avg_sleep": averages["avg_sleep"],
+        "avg_stress": averages["avg_stress"],
+        "avg_exercise": averages["avg_exercise"],
+        "data_points": averages["data_points"],
+        **personal
     }
\ No newline at end of file
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from ..ml.recommender import recommender
-from ..api.predictions import _get_user_context
+from ..ml.bandit import feedback_reward
+from ..feedback import feedback_queue
+from ..utils.memo import RequestMemo, get_request_memo
+from ..api.predictions import _get_user_context, _get_forecast
 from datetime import datetime
 
 router = APIRouter()
@@ -11,15 +14,15 @@ router = APIRouter()
 async def get_recommendations(
     user_id: str,
     prediction_date: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    memo: RequestMemo = Depends(get_request_memo)
 ):
     """Get personalized recommendations"""
     # Get user context
-    user_context = await _get_user_context(user_id, db)
+    user_context = await _get_user_context(user_id, db, memo)
     
-    # Get predictions for context
-    from ..ml.predictor import predictor
-    predictions = predictor.predict_for_user(user_context, days=1)
+    # Get predictions for context (reuses the context looked up above)
+    predictions = await _get_forecast(user_id, 1, db, memo)
     
     if not predictions:
         raise HTTPException(status_code=404, detail="No predictions available")
@@ -47,23 +50,30 @@ async def submit_feedback(
     recommendation_type: str,
     helpfulness_score: int,  # 1-5 scale
     pain_reduction: int = None,  # 0-10 scale
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit feedback on recommendations"""
-    # In a real implementation, this would store feedback in database
-    # For MVP, we'll just acknowledge receipt
-    
     if helpfulness_score < 1 or helpfulness_score > 5:
         raise HTTPException(status_code=400, detail="Helpfulness score must be between 1 and 5")
     
-    if pain_reduction and (pain_reduction < 0 or pain_reduction > 10):
+    if pain_reduction is not None and (pain_reduction < 0 or pain_reduction > 10):
         raise HTTPException(status_code=400, detail="Pain reduction must be between 0 and 10")
     
+    action = recommender.resolve_action(recommendation_type)
+    if action is None:
+        raise HTTPException(status_code=400, detail=f"Unknown recommendation type '{recommendation_type}'")
+    
+    # Rankings learn immediately; the row is written by the background flusher
+    reward = feedback_reward(helpfulness_score, pain_reduction)
+    recommender.record_feedback(user_id, action, reward)
+    feedback_queue.submit(user_id, action, helpfulness_score, pain_reduction, reward)
+    
     return {
         "status": "success",
         "message": "Feedback recorded successfully",
         "user_id": user_id,
         "recommendation_type": recommendation_type,
+        "action": action,
         "helpfulness_score": helpfulness_score,
         "pain_reduction": pain_reduction
     }
\ No newline at end of file
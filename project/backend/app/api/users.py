@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import datetime
 import uuid
-from ..database import get_db, PainEntry, LifestyleEntry
+from ..database import get_async_db, PainEntry, LifestyleEntry, Forecast
+from ..utils.cache import prediction_cache
+from ..aggregates import get_aggregate_for_update, apply_pain_entry, apply_lifestyle_entry, commit_with_retry
+from ..utils.pagination import keyset_page_query, split_page
+from ..utils.encryption import encryptor
 
 router = APIRouter()
 
+PAIN_FIELDS = ["id", "date", "pain_score", "pain_type", "productivity_impact", "notes"]
+LIFESTYLE_FIELDS = ["id", "date", "sleep_hours", "exercise_minutes", "stress_level", "hydration_liters"]
+
 class PainEntryCreate(BaseModel):
     pain_score: int
     productivity_impact: int = None
@@ -23,7 +31,7 @@ class LifestyleEntryCreate(BaseModel):
 async def submit_pain_entry(
     user_id: str,
     pain_data: PainEntryCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit pain entry"""
     # Set productivity impact if not provided
@@ -33,14 +41,22 @@ async def submit_pain_entry(
     
     pain_entry = PainEntry(
         user_id=user_id,
+        date=datetime.utcnow(),
         pain_score=pain_data.pain_score,
         pain_type=pain_data.pain_type,
         productivity_impact=productivity_impact,
-        notes=pain_data.notes
+        notes=encryptor.encrypt(pain_data.notes)
     )
     
-    db.add(pain_entry)
-    db.commit()
+    async def write():
+        db.add(pain_entry)
+        # Keep the rolling aggregate in the same transaction as the entry
+        aggregate = await get_aggregate_for_update(user_id, db)
+        apply_pain_entry(aggregate, pain_entry.date, pain_entry.pain_score)
+        await _invalidate_forecasts(user_id, db)
+    
+    await commit_with_retry(db, write)
+    prediction_cache.invalidate_user(user_id)
     
     return {
         "status": "success",
@@ -52,19 +68,32 @@ async def submit_pain_entry(
 async def submit_lifestyle_entry(
     user_id: str,
     lifestyle_data: LifestyleEntryCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit lifestyle data"""
     lifestyle_entry = LifestyleEntry(
         user_id=user_id,
+        date=datetime.utcnow(),
         sleep_hours=lifestyle_data.sleep_hours,
         exercise_minutes=lifestyle_data.exercise_minutes,
         stress_level=lifestyle_data.stress_level,
         hydration_liters=lifestyle_data.hydration_liters
     )
     
-    db.add(lifestyle_entry)
-    db.commit()
+    async def write():
+        db.add(lifestyle_entry)
+        aggregate = await get_aggregate_for_update(user_id, db)
+        apply_lifestyle_entry(
+            aggregate,
+            lifestyle_entry.date,
+            lifestyle_entry.sleep_hours,
+            lifestyle_entry.stress_level,
+            lifestyle_entry.exercise_minutes
+        )
+        await _invalidate_forecasts(user_id, db)
+    
+    await commit_with_retry(db, write)
+    prediction_cache.invalidate_user(user_id)
     
     return {
         "status": "success", 
@@ -72,24 +101,58 @@ async def submit_lifestyle_entry(
         "message": "Lifestyle data recorded successfully"
     }
 
+async def _invalidate_forecasts(user_id: str, db: AsyncSession):
+    """Drop precomputed forecasts that no longer reflect the user's data"""
+    await db.execute(delete(Forecast).where(Forecast.user_id == user_id))
+
 @router.get("/pain/{user_id}")
-async def get_pain_history(user_id: str, limit: int = 30, db: Session = Depends(get_db)):
-    """Get user's pain history"""
-    entries = db.query(PainEntry).filter(
-        PainEntry.user_id == user_id
-    ).order_by(PainEntry.date.desc()).limit(limit).all()
+async def get_pain_history(
+    user_id: str,
+    limit: int = 30,
+    cursor: str = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get user's pain history, newest first, one keyset page at a time"""
+    entries, next_cursor = await _get_history_page(PainEntry, user_id, limit, cursor, db)
+    # Decrypt into the response dicts, never onto the ORM objects (that would be flushed back)
+    rows = [entry_to_dict(entry, PAIN_FIELDS) for entry in entries]
+    notes = await encryptor.decrypt_batch([row["notes"] for row in rows])
+    for row, note in zip(rows, notes):
+        row["notes"] = note
+    
+    return {
+        "user_id": user_id,
+        "entries": rows,
+        "next_cursor": next_cursor
+    }
+
+@router.get("/lifestyle/{user_id}")
+async def get_lifestyle_history(
+    user_id: str,
+    limit: int = 30,
+    cursor: str = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get user's lifestyle history, newest first, one keyset page at a time"""
+    entries, next_cursor = await _get_history_page(LifestyleEntry, user_id, limit, cursor, db)
     
     return {
         "user_id": user_id,
-        "entries": [
-            {
-                "id": entry.id,
-                "date": entry.date,
-                "pain_score": entry.pain_score,
-                "pain_type": entry.pain_type,
-                "productivity_impact": entry.productivity_impact,
-                "notes": entry.notes
-            }
-            for entry in entries
-        ]
-    }
\ No newline at end of file
+        "entries": [entry_to_dict(entry, LIFESTYLE_FIELDS) for entry in entries],
+        "next_cursor": next_cursor
+    }
+
+async def _get_history_page(model, user_id: str, limit: int, cursor: str, db: AsyncSession):
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000")
+    
+    try:
+        query = keyset_page_query(model, user_id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    result = await db.execute(query)
+    return split_page(result.scalars().all(), limit)
+
+def entry_to_dict(entry, fields) -> dict:
+    return {field: getattr(entry, field) for field in fields}
\ No newline at end of file
@@ -1,10 +1,10 @@
 from functools import wraps
 from fastapi import HTTPException, Depends
-from sqlalchemy.orm import Session
-from .database import get_db, User
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db, User
 
-def get_user(user_id: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
\ No newline at end of file
@@ -0,0 +1,242 @@
+import argparse
+import time
+
+def precompute_forecasts(args):
+    """Precompute forecasts for all users"""
+    from .jobs.precompute import precompute_forecasts
+    total_users = precompute_forecasts(days=args.days, chunk_size=args.chunk_size, workers=args.workers)
+    print(f"Stored forecasts for {total_users} users.")
+
+def train_model(args):
+    """Train the population model; the API never trains on its own"""
+    from .ml.predictor import train_initial_model, DEFAULT_MODEL_PATH
+    from .config import settings
+    start = time.perf_counter()
+    train_initial_model(
+        args.output or settings.MODEL_PATH or DEFAULT_MODEL_PATH,
+        n_samples=args.rows,
+        seed=args.seed,
+        data_dir=args.data_dir,
+        chunk_size=args.chunk_size,
+        n_jobs=args.jobs,
+        max_samples=args.max_samples
+    )
+    print(f"Trained in {time.perf_counter() - start:.1f}s, peak memory {_peak_memory_mb():.0f} MB")
+
+def compile_model(args):
+    """Save the bootstrap model's compiled forest so workers can memory-map it"""
+    import joblib
+    from .ml.predictor import save_compiled, compiled_path, DEFAULT_MODEL_PATH
+    from .config import settings
+    model_path = args.model or settings.MODEL_PATH or DEFAULT_MODEL_PATH
+    if save_compiled(joblib.load(model_path), model_path) is None:
+        print("Model can't be compiled; workers will keep loading the sklearn artifact.")
+    else:
+        print(f"Wrote {compiled_path(model_path)}")
+
+def generate_training_data(args):
+    """Write synthetic training rows to disk as memory-mappable arrays"""
+    from .ml.training_data import generate_training_data
+    start = time.perf_counter()
+    generate_training_data(args.rows, seed=args.seed, chunk_size=args.chunk_size, output_dir=args.output)
+    print(
+        f"Wrote {args.rows} rows to {args.output} in {time.perf_counter() - start:.1f}s, "
+        f"peak memory {_peak_memory_mb():.0f} MB"
+    )
+
+def _peak_memory_mb() -> float:
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def retrain_model(args):
+    """Retrain on real entries and publish a new model version"""
+    from .jobs.retrain import retrain_model, RetrainRejected
+    try:
+        metadata = retrain_model(
+            mode=args.mode,
+            chunk_size=args.chunk_size,
+            holdout_fraction=args.holdout_fraction,
+            max_rows=args.max_rows,
+            extra_trees=args.extra_trees,
+            tolerance=args.tolerance,
+            min_rows=args.min_rows,
+            force=args.force
+        )
+    except RetrainRejected as exc:
+        print(f"Not published: {exc}")
+        raise SystemExit(1)
+    
+    print(
+        f"Published model {metadata['version']} ({metadata['train_rows']} rows, "
+        f"holdout MAE {metadata.get('holdout_mae', float('nan')):.3f}, "
+        f"live model MAE {metadata.get('baseline_mae', float('nan')):.3f})"
+    )
+    
+    # Corrections are tied to the population model they were fitted against
+    if not args.skip_user_models:
+        fit_user_models(args)
+
+def fit_user_models(args):
+    """Fit per-user residual corrections against the live model"""
+    from .jobs.personalize import fit_user_models
+    print(f"Fitted personal corrections for {fit_user_models(chunk_size=args.chunk_size)} users.")
+
+def rebuild_aggregates(args):
+    """Recompute rolling aggregates from raw entries"""
+    from .database import SessionLocal
+    from .aggregates import rebuild_aggregates
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt aggregates for {rebuild_aggregates(db, chunk_size=args.chunk_size)} users.")
+    finally:
+        db.close()
+
+def rebuild_cycles(args):
+    """Recompute cached cycle state from logged period starts"""
+    from .database import SessionLocal
+    from .cycles import rebuild_cycles
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt cycle state for {rebuild_cycles(db, chunk_size=args.chunk_size)} users.")
+    finally:
+        db.close()
+
+def rotate_encryption_keys(args):
+    """Re-encrypt stored notes under the current encryption key"""
+    from .jobs.rotate_keys import reencrypt_notes
+    start = time.perf_counter()
+    rewritten = reencrypt_notes(chunk_size=args.chunk_size)
+    print(f"Re-encrypted {rewritten} notes in {time.perf_counter() - start:.1f}s.")
+
+def export_research_data(args):
+    """Export anonymized entries of consenting users for research partners"""
+    from .jobs.research_export import export_research_data, ResearchExportRefused
+    start = time.perf_counter()
+    try:
+        manifest = export_research_data(args.output, chunk_size=args.chunk_size, workers=args.workers, key=args.key)
+    except ResearchExportRefused as exc:
+        print(f"Not exported: {exc}")
+        raise SystemExit(1)
+    print(
+        f"Exported {manifest['rows']} rows for {manifest['users']} consenting users to "
+        f"{len(manifest['parts'])} files in {args.output} in {time.perf_counter() - start:.1f}s."
+    )
+
+def check_aggregates(args):
+    """Compare stored aggregates with the raw entry windows"""
+    from .database import SessionLocal
+    from .aggregates import check_aggregates
+    db = SessionLocal()
+    try:
+        mismatched = check_aggregates(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    
+    if mismatched:
+        print(f"{len(mismatched)} users have inconsistent aggregates, e.g. {', '.join(mismatched[:10])}")
+        raise SystemExit(1)
+    print("All aggregates are consistent.")
+
+def import_csv(args):
+    """Import historical pain/lifestyle entries from CSV"""
+    import asyncio
+    from .ingest import import_csv
+    results = asyncio.run(import_csv(args.path, args.chunk_size))
+    errors = [result for result in results if result["status"] == "error"]
+    created = sum(result["status"] == "created" for result in results)
+    print(f"Imported {created} entries, {len(results) - created - len(errors)} duplicates, {len(errors)} errors.")
+    for error in errors[:20]:
+        print(f"  row {error['index'] + 2}: {error['errors']}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Period Pain Predictor maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    precompute = subparsers.add_parser("precompute-forecasts", help="Precompute forecasts into the forecasts table")
+    precompute.add_argument("--days", type=int, default=14, help="Forecast horizon in days (1-14)")
+    precompute.add_argument("--chunk-size", type=int, default=500, help="Users per worker task")
+    precompute.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    precompute.set_defaults(handler=precompute_forecasts)
+    
+    train = subparsers.add_parser("train-model", help="Train the population model and save it")
+    train.add_argument("--output", default=None, help="Model path (default: MODEL_PATH or ml_models/population_model.joblib)")
+    train.add_argument("--rows", type=int, default=1000, help="Synthetic training rows")
+    train.add_argument("--seed", type=int, default=42, help="Seed for data generation and training")
+    train.add_argument("--data-dir", default=None, help="Train on X.npy/y.npy here (generated first if missing)")
+    train.add_argument("--chunk-size", type=int, default=1_000_000, help="Rows generated per chunk")
+    train.add_argument("--jobs", type=int, default=-1, help="Cores used to fit trees (-1: all)")
+    train.add_argument("--max-samples", type=int, default=None, help="Bootstrap rows per tree (default: all)")
+    train.set_defaults(handler=train_model)
+    
+    compile_forest = subparsers.add_parser("compile-model", help="Save the bootstrap model as memory-mappable arrays")
+    compile_forest.add_argument("--model", default=None, help="Model path (default: MODEL_PATH or ml_models/population_model.joblib)")
+    compile_forest.set_defaults(handler=compile_model)
+    
+    generate = subparsers.add_parser("generate-training-data", help="Write synthetic training rows as .npy arrays")
+    generate.add_argument("output", help="Directory for X.npy and y.npy")
+    generate.add_argument("--rows", type=int, default=1_000_000, help="Rows to generate")
+    generate.add_argument("--seed", type=int, default=42, help="Generation seed")
+    generate.add_argument("--chunk-size", type=int, default=1_000_000, help="Rows generated per chunk")
+    generate.set_defaults(handler=generate_training_data)
+    
+    retrain = subparsers.add_parser("retrain-model", help="Retrain on real entries and publish a new model version")
+    retrain.add_argument("--mode", choices=["fresh", "extend"], default="fresh", help="Train a new forest or add warm-start trees")
+    retrain.add_argument("--chunk-size", type=int, default=5000, help="Rows fetched per round trip")
+    retrain.add_argument("--holdout-fraction", type=float, default=0.1, help="Fraction of users held out for validation")
+    retrain.add_argument("--max-rows", type=int, default=1_000_000, help="Cap on training rows (uniform sample)")
+    retrain.add_argument("--extra-trees", type=int, default=10, help="Trees added in extend mode")
+    retrain.add_argument("--tolerance", type=float, default=0.02, help="Allowed relative MAE regression vs the live model")
+    retrain.add_argument("--min-rows", type=int, default=200, help="Minimum training rows")
+    retrain.add_argument("--force", action="store_true", help="Publish even if validation fails or is impossible")
+    retrain.add_argument("--skip-user-models", action="store_true", help="Don't refit per-user corrections afterwards")
+    retrain.set_defaults(handler=retrain_model)
+    
+    personalize = subparsers.add_parser("fit-user-models", help="Fit per-user corrections for users with enough entries")
+    personalize.add_argument("--chunk-size", type=int, default=5000, help="Rows scored per batch")
+    personalize.set_defaults(handler=fit_user_models)
+    
+    rebuild = subparsers.add_parser("rebuild-aggregates", help="Recompute per-user rolling aggregates from entries")
+    rebuild.add_argument("--chunk-size", type=int, default=500, help="Users per transaction")
+    rebuild.set_defaults(handler=rebuild_aggregates)
+    
+    rebuild_cycle_state = subparsers.add_parser("rebuild-cycles", help="Recompute per-user cycle state from period starts")
+    rebuild_cycle_state.add_argument("--chunk-size", type=int, default=500, help="Users per transaction")
+    rebuild_cycle_state.set_defaults(handler=rebuild_cycles)
+    
+    rotate = subparsers.add_parser("rotate-encryption-keys", help="Re-encrypt pain notes under ENCRYPTION_KEY_VERSION")
+    rotate.add_argument("--chunk-size", type=int, default=500, help="Notes per transaction")
+    rotate.set_defaults(handler=rotate_encryption_keys)
+    
+    research = subparsers.add_parser(
+        "export-research",
+        help="Write pain/lifestyle rows of users consenting to analytics as anonymized gzipped CSV parts"
+    )
+    research.add_argument("output", help="Directory for part-*.csv.gz files and manifest.json")
+    research.add_argument("--chunk-size", type=int, default=500, help="Users per part file")
+    research.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    research.add_argument("--key", default=None, help="User id hash key (default: RESEARCH_EXPORT_KEY, then SECRET_KEY unless it is the default)")
+    research.set_defaults(handler=export_research_data)
+    
+    check = subparsers.add_parser("check-aggregates", help="Verify per-user rolling aggregates against entries")
+    check.add_argument("--chunk-size", type=int, default=500, help="Users per batch")
+    check.set_defaults(handler=check_aggregates)
+    
+    import_entries = subparsers.add_parser(
+        "import-csv",
+        help="Import entries from CSV (columns: type, user_id, date, idempotency_key and the entry fields)"
+    )
+    import_entries.add_argument("path", help="CSV file to import")
+    import_entries.add_argument("--chunk-size", type=int, default=500, help="Records per transaction")
+    import_entries.set_defaults(handler=import_csv)
+    
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
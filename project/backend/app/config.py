@@ -3,9 +3,51 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Placeholder shipped in the repo; anything keyed with it is keyed with a public value
+DEFAULT_SECRET_KEY = "your-secret-key-here"
+DEFAULT_ENCRYPTION_KEY = "your-encryption-key-here"
+
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./pain_predictor.db")
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
-    ENCRYPTION_KEY: str = os.getenv("ENCRYPTION_KEY", "your-encryption-key-here")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_CONNECT_TIMEOUT: float = float(os.getenv("DB_CONNECT_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SECRET_KEY: str = os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY)
+    ENCRYPTION_KEY: str = os.getenv("ENCRYPTION_KEY", DEFAULT_ENCRYPTION_KEY)
+    ENCRYPTION_KEY_VERSION: int = int(os.getenv("ENCRYPTION_KEY_VERSION", "1"))
+    ENCRYPTION_PREVIOUS_KEYS: str = os.getenv("ENCRYPTION_PREVIOUS_KEYS", "")
+    CRYPTO_THREADS: int = int(os.getenv("CRYPTO_THREADS", str(os.cpu_count() or 1)))
+    INGEST_CHUNK_SIZE: int = int(os.getenv("INGEST_CHUNK_SIZE", "500"))
+    INGEST_MAX_RECORDS: int = int(os.getenv("INGEST_MAX_RECORDS", "10000"))
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+    RESEARCH_EXPORT_KEY: str = os.getenv("RESEARCH_EXPORT_KEY", "")
+    MODEL_PATH: str = os.getenv("MODEL_PATH", "")
+    MODEL_DIR: str = os.getenv("MODEL_DIR", "")
+    MODEL_RELOAD_INTERVAL_SECONDS: float = float(os.getenv("MODEL_RELOAD_INTERVAL_SECONDS", "30"))
+    MODEL_MMAP: bool = os.getenv("MODEL_MMAP", "true").lower() in ("1", "true", "yes")
+    INFERENCE_THREADS: int = int(os.getenv("INFERENCE_THREADS", "4"))
+    PREDICTION_INTERVAL_COVERAGE: float = float(os.getenv("PREDICTION_INTERVAL_COVERAGE", "0.8"))
+    CACHE_MAX_SIZE: int = int(os.getenv("CACHE_MAX_SIZE", "10000"))
+    # Cached contexts are keyed on the user's row timestamps, so writes made through any worker
+    # are seen at once; the TTL only bounds memory and day-dependent cycle fields
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+    ACTION_CATALOG_PATH: str = os.getenv("ACTION_CATALOG_PATH", "")
+    USER_MODEL_MIN_ENTRIES: int = int(os.getenv("USER_MODEL_MIN_ENTRIES", "14"))
+    USER_MODEL_SHRINKAGE: float = float(os.getenv("USER_MODEL_SHRINKAGE", "5"))
+    USER_MODEL_CACHE_SIZE: int = int(os.getenv("USER_MODEL_CACHE_SIZE", "100000"))
+    USER_MODEL_CACHE_TTL_SECONDS: float = float(os.getenv("USER_MODEL_CACHE_TTL_SECONDS", "3600"))
+    RECOMMENDER_POLICY: str = os.getenv("RECOMMENDER_POLICY", "thompson")
+    BANDIT_PRIOR_STRENGTH: float = float(os.getenv("BANDIT_PRIOR_STRENGTH", "10"))
+    BANDIT_GLOBAL_WEIGHT: float = float(os.getenv("BANDIT_GLOBAL_WEIGHT", "200"))
+    FEEDBACK_BATCH_SIZE: int = int(os.getenv("FEEDBACK_BATCH_SIZE", "200"))
+    FEEDBACK_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("FEEDBACK_FLUSH_INTERVAL_SECONDS", "1.0"))
+    FEEDBACK_MAX_PENDING: int = int(os.getenv("FEEDBACK_MAX_PENDING", "100000"))
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import json
+from bisect import insort
+from datetime import datetime, date
+from sqlalchemy import select
+from .database import UserCycle, PeriodStart
+from .ml.cycle import DEFAULT_CYCLE_LENGTH, estimate_cycle_length, cycle_position
+
+# Cycle length is estimated from the gaps between the most recent starts
+CYCLE_WINDOW = 6
+
+def new_cycle_state(user_id: str) -> UserCycle:
+    return UserCycle(
+        user_id=user_id,
+        recent_starts="[]",
+        last_period_start=None,
+        cycle_length=float(DEFAULT_CYCLE_LENGTH)
+    )
+
+def apply_period_start(state: UserCycle, start: date) -> bool:
+    """Add a period start to the window and re-estimate; False if it was already there.
+    
+    Late (backdated) starts are inserted in order, so the estimate matches a
+    recomputation from history as long as they fall inside the window.
+    """
+    window = json.loads(state.recent_starts)
+    day = start.isoformat()
+    if day in window:
+        return False
+    
+    insort(window, day)
+    if len(window) > CYCLE_WINDOW + 1:
+        window.pop(0)
+    
+    state.recent_starts = json.dumps(window)
+    state.last_period_start = datetime.fromisoformat(window[-1])
+    state.cycle_length = estimate_cycle_length([date.fromisoformat(day) for day in window])
+    state.updated_at = datetime.utcnow()
+    return True
+
+def cycle_summary(state: UserCycle, on: date) -> dict:
+    """Cycle fields of the prediction context on a date (defaults without any logged period)"""
+    last_start = state.last_period_start.date() if state is not None and state.last_period_start else None
+    cycle_length = state.cycle_length if state is not None else float(DEFAULT_CYCLE_LENGTH)
+    cycle_day, days_to_period = cycle_position(last_start, cycle_length, on)
+    return {
+        "current_cycle_day": cycle_day,
+        "days_to_next_period": days_to_period,
+        "cycle_length": cycle_length
+    }
+
+async def get_cycle_for_update(user_id: str, db) -> UserCycle:
+    """Load (locking where supported) or create the user's cycle state"""
+    result = await db.execute(
+        select(UserCycle).where(UserCycle.user_id == user_id).with_for_update()
+    )
+    state = result.scalar_one_or_none()
+    if state is None:
+        state = new_cycle_state(user_id)
+        db.add(state)
+    return state
+
+def rebuild_cycles(db, chunk_size=500) -> int:
+    """Recompute every user's cycle state from their logged period starts"""
+    rebuilt = 0
+    last_user_id = None
+    while True:
+        query = select(PeriodStart.user_id).distinct().order_by(PeriodStart.user_id).limit(chunk_size)
+        if last_user_id is not None:
+            query = query.where(PeriodStart.user_id > last_user_id)
+        user_ids = db.execute(query).scalars().all()
+        if not user_ids:
+            return rebuilt
+        
+        states = {}
+        for user_id, start in db.execute(
+            select(PeriodStart.user_id, PeriodStart.date)
+            .where(PeriodStart.user_id.in_(user_ids))
+            .order_by(PeriodStart.user_id, PeriodStart.date)
+        ):
+            if user_id not in states:
+                states[user_id] = new_cycle_state(user_id)
+            apply_period_start(states[user_id], start.date())
+        for state in states.values():
+            db.merge(state)
+        db.commit()
+        rebuilt += len(states)
+        last_user_id = user_ids[-1]
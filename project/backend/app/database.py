@@ -1,12 +1,81 @@
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Boolean, Text
+from sqlalchemy import create_engine, event, inspect, Column, String, Integer, Float, DateTime, Boolean, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.engine import make_url
 from datetime import datetime
 import uuid
 from .config import settings
+from .utils.metrics import instrument_engine
 
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {})
+# Async drivers used when DATABASE_URL names a plain dialect
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql"
+}
+
+def _async_database_url(database_url: str):
+    """Map the configured (sync) URL onto its async driver"""
+    url = make_url(database_url)
+    if "+" not in url.drivername and url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{url.drivername}+{ASYNC_DRIVERS[url.drivername]}")
+    return url
+
+def _engine_options(url) -> dict:
+    """Pool sizing and timeouts for an engine on the given URL"""
+    if url.get_backend_name() == "sqlite":
+        connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT}
+        if not url.drivername.endswith("aiosqlite"):
+            connect_args["check_same_thread"] = False
+        if url.database in (None, "", ":memory:"):
+            return {"connect_args": connect_args}
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "connect_args": connect_args
+        }
+    
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the configured SQLite pragmas to every new connection"""
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_JOURNAL_MODE:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    if settings.SQLITE_SYNCHRONOUS:
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+def _create_engines():
+    url = make_url(settings.DATABASE_URL)
+    async_url = _async_database_url(settings.DATABASE_URL)
+    sync_engine = create_engine(url, **_engine_options(url))
+    async_engine = create_async_engine(async_url, **_engine_options(async_url))
+    
+    if url.get_backend_name() == "sqlite":
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    
+    if settings.METRICS_ENABLED:
+        instrument_engine(sync_engine, "sync")
+        instrument_engine(async_engine.sync_engine, "async")
+    
+    return sync_engine, async_engine
+
+engine, async_engine = _create_engines()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 class User(Base):
@@ -19,8 +88,11 @@ class User(Base):
 
 class PainEntry(Base):
     __tablename__ = "pain_entries"
+    __table_args__ = (
+        Index("ix_pain_entries_user_id_date_id", "user_id", "date", "id"),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, index=True)
+    user_id = Column(String)
     date = Column(DateTime, default=datetime.utcnow)
     pain_score = Column(Integer)
     pain_type = Column(String, default="cramps")
@@ -29,14 +101,93 @@ class PainEntry(Base):
 
 class LifestyleEntry(Base):
     __tablename__ = "lifestyle_entries"
+    __table_args__ = (
+        Index("ix_lifestyle_entries_user_id_date_id", "user_id", "date", "id"),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, index=True)
+    user_id = Column(String)
     date = Column(DateTime, default=datetime.utcnow)
     sleep_hours = Column(Float)
     exercise_minutes = Column(Integer)
     stress_level = Column(Integer)
     hydration_liters = Column(Float)
 
+class PeriodStart(Base):
+    __tablename__ = "period_starts"
+    __table_args__ = (
+        Index("ix_period_starts_user_id_date", "user_id", "date"),
+    )
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String)
+    date = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class IngestKey(Base):
+    __tablename__ = "ingest_keys"
+    user_id = Column(String, primary_key=True)
+    idempotency_key = Column(String, primary_key=True)
+    entry_type = Column(String)
+    entry_id = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class UserAggregate(Base):
+    __tablename__ = "user_aggregates"
+    user_id = Column(String, primary_key=True)
+    pain_window = Column(Text, default="[]")
+    pain_sum = Column(Float, default=0.0)
+    pain_count = Column(Integer, default=0)
+    lifestyle_window = Column(Text, default="[]")
+    sleep_sum = Column(Float, default=0.0)
+    stress_sum = Column(Float, default=0.0)
+    exercise_sum = Column(Float, default=0.0)
+    lifestyle_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    # Updates are conditional on the updated_at that was read (the apply_* helpers set the new one),
+    # so a concurrent read-modify-write fails with StaleDataError instead of being lost
+    __mapper_args__ = {"version_id_col": updated_at, "version_id_generator": False}
+
+class UserCycle(Base):
+    __tablename__ = "user_cycles"
+    user_id = Column(String, primary_key=True)
+    recent_starts = Column(Text, default="[]")
+    last_period_start = Column(DateTime, nullable=True)
+    cycle_length = Column(Float)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class Forecast(Base):
+    __tablename__ = "forecasts"
+    user_id = Column(String, primary_key=True)
+    date = Column(String, primary_key=True)
+    model_version = Column(String, primary_key=True)
+    predicted_pain = Column(Float)
+    severe_probability = Column(Float)
+    confidence_low = Column(Float)
+    confidence_high = Column(Float)
+    drivers = Column(Text)
+    generated_at = Column(DateTime, default=datetime.utcnow)
+
+class UserModel(Base):
+    __tablename__ = "user_models"
+    user_id = Column(String, primary_key=True)
+    bias = Column(Float)
+    slope = Column(Float)
+    n_samples = Column(Integer)
+    base_version = Column(String)
+    fitted_at = Column(DateTime, default=datetime.utcnow)
+
+class RecommendationFeedback(Base):
+    __tablename__ = "recommendation_feedback"
+    __table_args__ = (
+        Index("ix_recommendation_feedback_user_id_action", "user_id", "action"),
+    )
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String)
+    action = Column(String)
+    helpfulness_score = Column(Integer)
+    pain_reduction = Column(Integer, nullable=True)
+    reward = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -44,5 +195,28 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Indexes superseded by the (user_id, date, id) composites
+LEGACY_INDEXES = {
+    "pain_entries": [("ix_pain_entries_user_id", ["user_id"]), ("ix_pain_entries_user_id_date", ["user_id", "date"])],
+    "lifestyle_entries": [("ix_lifestyle_entries_user_id", ["user_id"]), ("ix_lifestyle_entries_user_id_date", ["user_id", "date"])]
+}
+
+def migrate_indexes(bind=engine):
+    """Bring indexes on existing tables in line with the models"""
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
+        for legacy_name, columns in LEGACY_INDEXES.get(table.name, []):
+            if legacy_name in existing:
+                Index(legacy_name, *(table.c[column] for column in columns)).drop(bind=bind)
+
 # Create tables
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+migrate_indexes()
\ No newline at end of file
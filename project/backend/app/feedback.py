@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from sqlalchemy import select, insert, func
+from .database import AsyncSessionLocal, RecommendationFeedback
+from .ml.recommender import recommender
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class FeedbackQueue:
+    """Write-behind buffer for recommendation feedback.
+    
+    ``submit`` only appends to an in-memory list, so the request never waits
+    on a commit. A background task inserts the buffered rows in one batch
+    every flush interval, or as soon as a full batch is waiting. While the
+    database is unavailable at most ``max_pending`` rows are kept; beyond
+    that the oldest are dropped and counted in ``dropped``.
+    """
+    
+    def __init__(self, batch_size: int, flush_interval: float, session_factory=AsyncSessionLocal, max_pending: int = 100_000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self.max_pending = max_pending
+        self.pending = []
+        self.dropped = 0
+        self.last_error = None
+        self._wakeup = None
+        self._task = None
+    
+    def submit(self, user_id: str, action: str, helpfulness_score: int, pain_reduction: int, reward: float) -> dict:
+        row = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "action": action,
+            "helpfulness_score": helpfulness_score,
+            "pain_reduction": pain_reduction,
+            "reward": reward,
+            "created_at": datetime.utcnow()
+        }
+        self.pending.append(row)
+        self._trim()
+        if len(self.pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return row
+    
+    async def flush(self) -> int:
+        """Insert everything buffered so far; failed batches are kept for the next flush"""
+        if not self.pending:
+            return 0
+        
+        batch, self.pending = self.pending, []
+        try:
+            async with self.session_factory() as db:
+                await db.execute(insert(RecommendationFeedback), batch)
+                await db.commit()
+        except BaseException as exc:
+            self.pending[:0] = batch
+            self.last_error = str(exc) or type(exc).__name__
+            dropped = self._trim()
+            if dropped:
+                logger.warning("Feedback queue full; dropped the %d oldest unwritten rows", dropped)
+            raise
+        
+        self.last_error = None
+        return len(batch)
+    
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background flusher and write out whatever is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            # Shutdown must go on; the rows are lost either way
+            logger.exception("Could not write %d buffered feedback rows at shutdown", len(self.pending))
+    
+    def _trim(self) -> int:
+        """Drop the oldest rows beyond max_pending; returns how many were dropped"""
+        overflow = len(self.pending) - self.max_pending
+        if overflow <= 0:
+            return 0
+        del self.pending[:overflow]
+        self.dropped += overflow
+        return overflow
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            
+            try:
+                await self.flush()
+            except Exception:
+                # Recorded in last_error; the rows are retried on the next tick
+                pass
+
+async def warm_feedback_stats(session_factory=AsyncSessionLocal) -> int:
+    """Rebuild the recommender's in-memory feedback stats from the table"""
+    query = select(
+        RecommendationFeedback.user_id,
+        RecommendationFeedback.action,
+        func.sum(RecommendationFeedback.reward),
+        func.count()
+    ).group_by(RecommendationFeedback.user_id, RecommendationFeedback.action)
+    
+    recommender.stats.clear()
+    async with session_factory() as db:
+        result = await db.stream(query)
+        async for user_id, action, reward_sum, count in result:
+            if action in recommender.stats.action_index:
+                recommender.stats.update(user_id, action, reward_sum, count)
+    return recommender.stats.n_users
+
+# Global instance
+feedback_queue = FeedbackQueue(
+    settings.FEEDBACK_BATCH_SIZE, settings.FEEDBACK_FLUSH_INTERVAL_SECONDS, max_pending=settings.FEEDBACK_MAX_PENDING
+)
\ No newline at end of file
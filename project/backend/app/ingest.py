@@ -0,0 +1,257 @@
+import csv
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, insert, delete, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from .database import PainEntry, LifestyleEntry, IngestKey, Forecast
+from .aggregates import get_aggregate_for_update, apply_pain_entry, apply_lifestyle_entry
+from .api.pain import PainEntryCreate, LifestyleEntryCreate
+from .utils.cache import prediction_cache
+from .utils.encryption import encryptor
+
+RECORD_MODELS = {
+    "pain": PainEntryCreate,
+    "lifestyle": LifestyleEntryCreate
+}
+
+class BatchRecord(BaseModel):
+    """Envelope shared by every record in a bulk upload"""
+    type: str
+    user_id: Optional[str] = None
+    date: Optional[datetime] = None
+    idempotency_key: Optional[str] = None
+
+def parse_record(index: int, raw, user_id: str = None):
+    """Validate one raw record; returns (parsed, None) or (None, error result).
+    
+    When ``user_id`` is given (API uploads) it overrides any per-record value;
+    otherwise each record must carry its own ``user_id`` (CSV imports).
+    """
+    if not isinstance(raw, dict):
+        return None, _error(index, "Record must be a JSON object")
+    
+    try:
+        envelope = BatchRecord(**raw)
+    except ValidationError as exc:
+        return None, _error(index, exc.errors(include_url=False, include_context=False))
+    
+    model = RECORD_MODELS.get(envelope.type)
+    if model is None:
+        return None, _error(index, f"Unknown record type '{envelope.type}'")
+    
+    user_id = user_id or envelope.user_id
+    if not user_id:
+        return None, _error(index, "Missing user_id")
+    
+    try:
+        data = model(**raw)
+    except ValidationError as exc:
+        return None, _error(index, exc.errors(include_url=False, include_context=False))
+    
+    # Entries are stored as naive UTC, like the single-entry endpoints
+    date = envelope.date or datetime.utcnow()
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    return {
+        "index": index,
+        "type": envelope.type,
+        "user_id": user_id,
+        "date": date,
+        "idempotency_key": envelope.idempotency_key,
+        "data": data
+    }, None
+
+async def ingest_chunk(db, records: list, retry: bool = True) -> list:
+    """Insert one chunk of parsed records in a single transaction.
+    
+    Returns one result per record. Records whose idempotency key was already
+    used (earlier or within the chunk) are reported as duplicates. If a
+    concurrent upload claims one of the chunk's keys first, the new records
+    are reported as errors to retry; any other conflict (such as another
+    writer creating or updating a user's aggregate row first) retries the
+    chunk once.
+    """
+    results = []
+    existing = await _existing_keys(db, records)
+    seen_keys = {}
+    pain_rows, lifestyle_rows, key_rows = [], [], []
+    
+    for record in records:
+        key = (record["user_id"], record["idempotency_key"])
+        if record["idempotency_key"] is not None:
+            entry_id = existing.get(key) or seen_keys.get(key)
+            if entry_id is not None:
+                results.append({"index": record["index"], "status": "duplicate", "entry_id": entry_id})
+                continue
+        
+        entry_id = str(uuid.uuid4())
+        if record["type"] == "pain":
+            pain_rows.append(_pain_row(entry_id, record))
+        else:
+            lifestyle_rows.append(_lifestyle_row(entry_id, record))
+        
+        if record["idempotency_key"] is not None:
+            seen_keys[key] = entry_id
+            key_rows.append({
+                "user_id": record["user_id"],
+                "idempotency_key": record["idempotency_key"],
+                "entry_type": record["type"],
+                "entry_id": entry_id,
+                "created_at": datetime.utcnow()
+            })
+        results.append({"index": record["index"], "status": "created", "entry_id": entry_id})
+    
+    user_ids = {row["user_id"] for row in pain_rows + lifestyle_rows}
+    if not user_ids:
+        return results
+    
+    notes = await encryptor.encrypt_batch([row["notes"] for row in pain_rows])
+    for row, note in zip(pain_rows, notes):
+        row["notes"] = note
+    
+    try:
+        # Before the inserts, so aggregates seeded from stored entries don't already include this chunk
+        await _update_aggregates(db, user_ids, pain_rows, lifestyle_rows)
+        if pain_rows:
+            await db.execute(insert(PainEntry), pain_rows)
+        if lifestyle_rows:
+            await db.execute(insert(LifestyleEntry), lifestyle_rows)
+        if key_rows:
+            await db.execute(insert(IngestKey), key_rows)
+        
+        await db.execute(delete(Forecast).where(Forecast.user_id.in_(user_ids)))
+        await db.commit()
+    except (IntegrityError, StaleDataError):
+        await db.rollback()
+        if seen_keys and (await _existing_keys(db, records)).keys() & seen_keys.keys():
+            # A concurrent upload claimed one of the idempotency keys first
+            return [
+                result if result["status"] == "duplicate"
+                else _error(result["index"], "Conflicting concurrent upload; retry this record")
+                for result in results
+            ]
+        if not retry:
+            raise
+        # Another writer created or updated a row this chunk also wrote; the retry sees it
+        return await ingest_chunk(db, records, retry=False)
+    
+    for user_id in user_ids:
+        prediction_cache.invalidate_user(user_id)
+    return results
+
+async def _existing_keys(db, records) -> dict:
+    keys = {
+        (record["user_id"], record["idempotency_key"])
+        for record in records
+        if record["idempotency_key"] is not None
+    }
+    if not keys:
+        return {}
+    
+    result = await db.execute(
+        select(IngestKey.user_id, IngestKey.idempotency_key, IngestKey.entry_id).where(
+            tuple_(IngestKey.user_id, IngestKey.idempotency_key).in_(list(keys))
+        )
+    )
+    return {(row.user_id, row.idempotency_key): row.entry_id for row in result}
+
+async def _update_aggregates(db, user_ids, pain_rows, lifestyle_rows):
+    """Fold the chunk into each user's rolling aggregate"""
+    aggregates = {user_id: await get_aggregate_for_update(user_id, db) for user_id in sorted(user_ids)}
+    for row in pain_rows:
+        apply_pain_entry(aggregates[row["user_id"]], row["date"], row["pain_score"])
+    for row in lifestyle_rows:
+        apply_lifestyle_entry(
+            aggregates[row["user_id"]],
+            row["date"],
+            row["sleep_hours"],
+            row["stress_level"],
+            row["exercise_minutes"]
+        )
+
+def _pain_row(entry_id: str, record: dict) -> dict:
+    data = record["data"]
+    # Same default as submit_pain_entry
+    productivity_impact = data.productivity_impact
+    if productivity_impact is None:
+        productivity_impact = min(10, int(data.pain_score * 0.8))
+    
+    return {
+        "id": entry_id,
+        "user_id": record["user_id"],
+        "date": record["date"],
+        "pain_score": data.pain_score,
+        "pain_type": data.pain_type,
+        "productivity_impact": productivity_impact,
+        "notes": data.notes
+    }
+
+def _lifestyle_row(entry_id: str, record: dict) -> dict:
+    data = record["data"]
+    return {
+        "id": entry_id,
+        "user_id": record["user_id"],
+        "date": record["date"],
+        "sleep_hours": data.sleep_hours,
+        "exercise_minutes": data.exercise_minutes,
+        "stress_level": data.stress_level,
+        "hydration_liters": data.hydration_liters
+    }
+
+def _error(index: int, detail) -> dict:
+    return {"index": index, "status": "error", "errors": detail}
+
+async def ingest_records(db, raw_records, chunk_size: int, user_id: str = None, max_records: int = None) -> list:
+    """Validate and insert an (async) iterable of raw records chunk by chunk.
+    
+    With ``max_records``, reading stops at the first record past the limit,
+    which is reported as an error; earlier records are stored as usual.
+    """
+    if not hasattr(raw_records, "__aiter__"):
+        raw_records = _aiter(raw_records)
+    
+    results = []
+    chunk = []
+    index = 0
+    async for raw in raw_records:
+        if max_records is not None and index >= max_records:
+            results.append(_error(
+                index, f"Over the limit of {max_records} records per request; this record and any after it were not read"
+            ))
+            break
+        record, error = parse_record(index, raw, user_id)
+        index += 1
+        if error is not None:
+            results.append(error)
+            continue
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            results.extend(await ingest_chunk(db, chunk))
+            chunk = []
+    
+    if chunk:
+        results.extend(await ingest_chunk(db, chunk))
+    return sorted(results, key=lambda result: result["index"])
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
+
+def iter_csv_records(path: str):
+    """Yield raw records from a CSV export; blank cells are treated as missing"""
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            yield {column: value for column, value in row.items() if value not in (None, "")}
+
+async def import_csv(path: str, chunk_size: int) -> list:
+    """Import historical entries from a CSV file through the bulk ingestion path"""
+    from .database import AsyncSessionLocal, async_engine
+    try:
+        async with AsyncSessionLocal() as db:
+            return await ingest_records(db, iter_csv_records(path), chunk_size)
+    finally:
+        await async_engine.dispose()
@@ -0,0 +1,100 @@
+from datetime import datetime
+import numpy as np
+from sqlalchemy import insert
+from ..database import SessionLocal, UserModel, Forecast
+from ..config import settings
+from ..personalization import user_models
+from ..utils.cache import prediction_cache
+from ..ml.predictor import PainPredictor, ModelNotReadyError
+from ..ml.personal import PIVOT, fit_corrections
+from .retrain import iter_training_rows
+
+def _fit_chunk(predictor, user_ids, features, targets, min_entries, shrinkage):
+    """Fit corrections for a chunk of rows in which every user's entries are contiguous"""
+    population = predictor._predict_rows(np.array(features, dtype=float))
+    residual = np.array(targets, dtype=float) - population
+    centered = population - PIVOT
+    
+    starts = np.flatnonzero([True] + [user_ids[i] != user_ids[i - 1] for i in range(1, len(user_ids))])
+    n = np.diff(np.append(starts, len(user_ids)))
+    bias, slope = fit_corrections(
+        n,
+        np.add.reduceat(residual, starts),
+        np.add.reduceat(centered, starts),
+        np.add.reduceat(centered * centered, starts),
+        np.add.reduceat(residual * centered, starts),
+        shrinkage
+    )
+    
+    chunk_users = [user_ids[start] for start in starts]
+    eligible = n >= min_entries
+    fitted = [
+        {
+            "user_id": user_id,
+            "bias": float(user_bias),
+            "slope": float(user_slope),
+            "n_samples": int(count),
+            "base_version": predictor.model_version,
+            "fitted_at": datetime.utcnow()
+        }
+        for user_id, user_bias, user_slope, count in zip(
+            np.array(chunk_users, dtype=object)[eligible], bias[eligible], slope[eligible], n[eligible]
+        )
+    ]
+    return chunk_users, fitted
+
+def _save_user_models(db, chunk_users, fitted):
+    """Replace the stored corrections of every user in the chunk.
+    
+    Their precomputed forecasts were made with the old corrections, so they
+    are dropped in the same transaction. Other processes notice the refit
+    through the fitted_at their cache keys include; this one forgets it here.
+    """
+    db.query(UserModel).filter(UserModel.user_id.in_(chunk_users)).delete(synchronize_session=False)
+    if fitted:
+        db.execute(insert(UserModel), fitted)
+    db.query(Forecast).filter(Forecast.user_id.in_(chunk_users)).delete(synchronize_session=False)
+    db.commit()
+    
+    for user_id in chunk_users:
+        user_models.invalidate(user_id)
+        prediction_cache.invalidate_user(user_id)
+
+def fit_user_models(chunk_size=5000, min_entries=None, shrinkage=None, model_dir=None) -> int:
+    """Fit a residual bias/slope correction for every user with enough pain entries.
+    
+    Rows are streamed in user order and scored by the live population model
+    in chunks that never split a user. Returns the number of users fitted.
+    """
+    min_entries = settings.USER_MODEL_MIN_ENTRIES if min_entries is None else min_entries
+    shrinkage = settings.USER_MODEL_SHRINKAGE if shrinkage is None else shrinkage
+    
+    predictor = PainPredictor(model_dir=model_dir)
+    predictor.load()
+    if not predictor.is_ready:
+        raise ModelNotReadyError(predictor.load_error or "Model is not loaded")
+    
+    fitted_users = 0
+    reader, writer = SessionLocal(), SessionLocal()
+    try:
+        user_ids, features, targets = [], [], []
+        for user_id, _, row_features, pain_score in iter_training_rows(reader, chunk_size):
+            # Flush on a user boundary so each user is fitted from one chunk
+            if len(user_ids) >= chunk_size and user_id != user_ids[-1]:
+                chunk_users, fitted = _fit_chunk(predictor, user_ids, features, targets, min_entries, shrinkage)
+                _save_user_models(writer, chunk_users, fitted)
+                fitted_users += len(fitted)
+                user_ids, features, targets = [], [], []
+            user_ids.append(user_id)
+            features.append(row_features)
+            targets.append(pain_score)
+        
+        if user_ids:
+            chunk_users, fitted = _fit_chunk(predictor, user_ids, features, targets, min_entries, shrinkage)
+            _save_user_models(writer, chunk_users, fitted)
+            fitted_users += len(fitted)
+    finally:
+        reader.close()
+        writer.close()
+    
+    return fitted_users
@@ -0,0 +1,86 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from sqlalchemy import insert
+from ..database import SessionLocal, User, Forecast
+from ..api.predictions import build_user_context
+
+def _predict_chunk(user_ids, contexts, days):
+    """Score one chunk of users inside a worker process"""
+    from ..ml.predictor import predictor
+    return user_ids, predictor.model_version, predictor.predict_many(contexts, days)
+
+def _iter_user_chunks(db, chunk_size):
+    """Yield user ids in primary-key order, one chunk at a time"""
+    last_user_id = None
+    while True:
+        query = db.query(User.user_id).order_by(User.user_id)
+        if last_user_id is not None:
+            query = query.filter(User.user_id > last_user_id)
+        user_ids = [row.user_id for row in query.limit(chunk_size)]
+        if not user_ids:
+            return
+        yield user_ids
+        last_user_id = user_ids[-1]
+
+def _save_forecasts(db, user_ids, model_version, forecasts):
+    """Replace stored forecasts for a chunk of users"""
+    generated_at = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "date": prediction["date"],
+            "model_version": model_version,
+            "predicted_pain": prediction["predicted_pain"],
+            "severe_probability": prediction["severe_probability"],
+            "confidence_low": prediction["confidence_interval"][0],
+            "confidence_high": prediction["confidence_interval"][1],
+            "drivers": json.dumps(prediction["drivers"]),
+            "generated_at": generated_at
+        }
+        for user_id, predictions in zip(user_ids, forecasts)
+        for prediction in predictions
+    ]
+    
+    db.query(Forecast).filter(
+        Forecast.user_id.in_(user_ids),
+        Forecast.model_version == model_version
+    ).delete(synchronize_session=False)
+    if rows:
+        db.execute(insert(Forecast), rows)
+    db.commit()
+
+def _store_results(db, futures):
+    """Write finished chunks to the database and return the number of users stored"""
+    stored = 0
+    for future in futures:
+        user_ids, model_version, forecasts = future.result()
+        _save_forecasts(db, user_ids, model_version, forecasts)
+        stored += len(user_ids)
+    return stored
+
+def precompute_forecasts(days=14, chunk_size=500, workers=None):
+    """Precompute forecasts for every user and store them in the forecasts table"""
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    total_users = 0
+    
+    db = SessionLocal()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for user_ids in _iter_user_chunks(db, chunk_size):
+                contexts = [build_user_context(user_id, db) for user_id in user_ids]
+                pending.add(pool.submit(_predict_chunk, user_ids, contexts, days))
+                
+                # Keep a bounded number of chunks in flight
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    total_users += _store_results(db, done)
+            
+            total_users += _store_results(db, pending)
+    finally:
+        db.close()
+    
+    return total_users
@@ -0,0 +1,153 @@
+import csv
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from sqlalchemy import select
+from ..config import settings, DEFAULT_SECRET_KEY
+from ..database import SessionLocal, User, PainEntry, LifestyleEntry
+from ..utils.privacy import keyed_anonymizer, parse_consent_flags, should_retain_data
+
+# Pain entries joined with the same day's lifestyle entry; notes and entry ids are never exported
+COLUMNS = [
+    "user_hash", "date", "pain_score", "pain_type", "productivity_impact",
+    "sleep_hours", "exercise_minutes", "stress_level", "hydration_liters"
+]
+NO_LIFESTYLE = (None, None, None, None)
+# gzip's own default; Python's gzip module uses 9, which is ~40% slower for ~4% smaller parts
+COMPRESS_LEVEL = 6
+
+class ResearchExportRefused(RuntimeError):
+    """Raised when the export can't be run safely as configured"""
+
+# Set in each worker process by _init_worker
+_anonymize = None
+
+def _init_worker(key: str):
+    """Bind the keyed hash and drop database connections inherited from the parent"""
+    global _anonymize
+    from ..database import engine
+    engine.dispose(close=False)
+    _anonymize = keyed_anonymizer(key)
+
+def _iter_consenting_chunks(db, chunk_size):
+    """Yield ids of users whose consent flags allow analytics use, ``chunk_size`` at a time"""
+    chunk = []
+    last_user_id = None
+    while True:
+        query = select(User.user_id, User.consent_flags).order_by(User.user_id).limit(chunk_size)
+        if last_user_id is not None:
+            query = query.where(User.user_id > last_user_id)
+        rows = db.execute(query).all()
+        if not rows:
+            break
+        chunk.extend(row.user_id for row in rows if should_retain_data(parse_consent_flags(row.consent_flags)))
+        if len(chunk) >= chunk_size:
+            yield chunk[:chunk_size]
+            chunk = chunk[chunk_size:]
+        last_user_id = rows[-1].user_id
+    if chunk:
+        yield chunk
+
+def _iter_joined_rows(db, user_ids):
+    """Yield export rows for a chunk of users, merge-joining lifestyle entries by day"""
+    pain_rows = db.execute(
+        select(PainEntry.user_id, PainEntry.date, PainEntry.pain_score, PainEntry.pain_type, PainEntry.productivity_impact)
+        .where(PainEntry.user_id.in_(user_ids))
+        .order_by(PainEntry.user_id, PainEntry.date, PainEntry.id)
+        .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+    )
+    lifestyle_rows = iter(db.execute(
+        select(LifestyleEntry.user_id, LifestyleEntry.date, LifestyleEntry.sleep_hours,
+               LifestyleEntry.exercise_minutes, LifestyleEntry.stress_level, LifestyleEntry.hydration_liters)
+        .where(LifestyleEntry.user_id.in_(user_ids))
+        .order_by(LifestyleEntry.user_id, LifestyleEntry.date, LifestyleEntry.id)
+        .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+    ).tuples())
+    pending = next(lifestyle_rows, None)
+    current_day, lifestyle = None, NO_LIFESTYLE
+    
+    for user_id, date, pain_score, pain_type, productivity_impact in pain_rows:
+        day = (user_id, date.date())
+        if day != current_day:
+            current_day, lifestyle, day_label = day, NO_LIFESTYLE, day[1].isoformat()
+            # Advance to the end of this user's day, keeping the last lifestyle entry logged on it
+            while pending is not None and (pending[0], pending[1].date()) <= day:
+                if (pending[0], pending[1].date()) == day:
+                    lifestyle = pending[2:]
+                pending = next(lifestyle_rows, None)
+        
+        yield (_anonymize(user_id), day_label, pain_score, pain_type, productivity_impact, *lifestyle)
+
+def _export_chunk(output_dir, part, user_ids):
+    """Write one chunk of users to a gzipped CSV part inside a worker process"""
+    path = os.path.join(output_dir, f"part-{part:05d}.csv.gz")
+    rows = 0
+    db = SessionLocal()
+    try:
+        # Written under a temporary name so a part file is either complete or absent
+        with gzip.open(path + ".tmp", "wt", compresslevel=COMPRESS_LEVEL, newline="", encoding="utf-8") as target:
+            writer = csv.writer(target)
+            writer.writerow(COLUMNS)
+            for row in _iter_joined_rows(db, user_ids):
+                writer.writerow(row)
+                rows += 1
+    finally:
+        db.close()
+    os.replace(path + ".tmp", path)
+    return os.path.basename(path), len(user_ids), rows
+
+def resolve_key(key: str = None) -> str:
+    """The user id hash key: ``key``, else RESEARCH_EXPORT_KEY, else a configured SECRET_KEY"""
+    key = key or settings.RESEARCH_EXPORT_KEY or settings.SECRET_KEY
+    if key == DEFAULT_SECRET_KEY:
+        # Anyone could recompute the hashes from the repo's placeholder
+        raise ResearchExportRefused("Set RESEARCH_EXPORT_KEY (or pass --key); SECRET_KEY is still the default")
+    return key
+
+def export_research_data(output_dir, chunk_size=500, workers=None, key=None):
+    """Export anonymized pain/lifestyle rows of consenting users as gzipped CSV parts.
+    
+    Users are read in keyset chunks and kept only if their consent flags
+    allow analytics use. Each chunk is joined, hashed and compressed in a
+    worker process and written to its own part file, with a bounded number
+    of chunks in flight, so memory stays flat however many rows there are.
+    User ids are replaced by an HMAC of the id under ``key`` (see
+    resolve_key): stable across exports with the same key, and not
+    reversible without it. Returns the manifest, which is also written to
+    manifest.json.
+    """
+    key = resolve_key(key)
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    os.makedirs(output_dir, exist_ok=True)
+    
+    parts = []
+    db = SessionLocal()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(key,)) as pool:
+            pending = set()
+            for part, user_ids in enumerate(_iter_consenting_chunks(db, chunk_size)):
+                pending.add(pool.submit(_export_chunk, output_dir, part, user_ids))
+                
+                # Keep a bounded number of chunks in flight
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+            
+            parts.extend(future.result() for future in pending)
+    finally:
+        db.close()
+    
+    parts.sort()
+    manifest = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "columns": COLUMNS,
+        "users": sum(users for _, users, _ in parts),
+        "rows": sum(rows for _, _, rows in parts),
+        "parts": [{"file": name, "users": users, "rows": rows} for name, users, rows in parts]
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as target:
+        json.dump(manifest, target, indent=2)
+    return manifest
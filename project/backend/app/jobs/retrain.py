@@ -0,0 +1,239 @@
+import zlib
+from collections import deque
+from datetime import datetime
+import numpy as np
+from sqlalchemy import select
+from ..database import SessionLocal, PainEntry, LifestyleEntry, PeriodStart
+from ..aggregates import PAIN_WINDOW, LIFESTYLE_WINDOW
+from ..cycles import CYCLE_WINDOW
+from ..ml.cycle import DEFAULT_CYCLE_LENGTH, estimate_cycle_length, cycle_position
+from ..ml.predictor import PainPredictor, compile_model, tree_predictions
+from ..ml.uncertainty import ConformalCalibration
+
+class RetrainRejected(RuntimeError):
+    """Raised when a candidate model is not good enough (or there is too little data) to publish"""
+
+def iter_training_rows(db, chunk_size: int = 5000, since: datetime = None):
+    """Yield (user_id, date, features, pain_score) for every pain entry.
+    
+    Pain entries, lifestyle entries and period starts are streamed in
+    (user_id, date) order and merge-joined, so memory stays flat however
+    large the tables are. Features mirror the serving context as it looked on
+    the day of the entry: the average of the user's previous pain scores, of
+    their lifestyle entries logged up to that day, and the cycle position
+    implied by the period starts logged up to that day. Entries on or before
+    ``since`` only feed the windows and are not yielded.
+    """
+    pain_rows = db.execute(
+        select(PainEntry.user_id, PainEntry.date, PainEntry.pain_score)
+        .order_by(PainEntry.user_id, PainEntry.date, PainEntry.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    lifestyle_rows = iter(db.execute(
+        select(LifestyleEntry.user_id, LifestyleEntry.date, LifestyleEntry.sleep_hours,
+               LifestyleEntry.stress_level, LifestyleEntry.exercise_minutes)
+        .order_by(LifestyleEntry.user_id, LifestyleEntry.date, LifestyleEntry.id)
+        .execution_options(yield_per=chunk_size)
+    ))
+    period_rows = iter(db.execute(
+        select(PeriodStart.user_id, PeriodStart.date)
+        .order_by(PeriodStart.user_id, PeriodStart.date)
+        .execution_options(yield_per=chunk_size)
+    ))
+    pending = next(lifestyle_rows, None)
+    pending_start = next(period_rows, None)
+    current_user = None
+    
+    for user_id, date, pain_score in pain_rows:
+        if user_id != current_user:
+            current_user = user_id
+            pain_window = deque(maxlen=PAIN_WINDOW)
+            lifestyle_window = deque(maxlen=LIFESTYLE_WINDOW)
+            recent_starts = deque(maxlen=CYCLE_WINDOW + 1)
+            cycle_length = DEFAULT_CYCLE_LENGTH
+        
+        # Advance the lifestyle stream to the end of this entry's day
+        while pending is not None and (
+            pending.user_id < user_id or (pending.user_id == user_id and pending.date.date() <= date.date())
+        ):
+            if pending.user_id == user_id:
+                lifestyle_window.append((pending.sleep_hours, pending.stress_level, pending.exercise_minutes))
+            pending = next(lifestyle_rows, None)
+        
+        # Same for period starts; the cycle length is re-estimated only when one is added
+        while pending_start is not None and (
+            pending_start.user_id < user_id
+            or (pending_start.user_id == user_id and pending_start.date.date() <= date.date())
+        ):
+            if pending_start.user_id == user_id and pending_start.date.date() not in recent_starts:
+                recent_starts.append(pending_start.date.date())
+                cycle_length = estimate_cycle_length(list(recent_starts))
+            pending_start = next(period_rows, None)
+        
+        if pain_score is not None and (since is None or date > since):
+            cycle_day, days_to_period = cycle_position(
+                recent_starts[-1] if recent_starts else None, cycle_length, date.date()
+            )
+            if lifestyle_window:
+                avg_sleep, avg_stress, avg_exercise = np.mean(lifestyle_window, axis=0)
+            else:
+                avg_sleep, avg_stress, avg_exercise = 7.0, 5.0, 30.0
+            features = (
+                cycle_day,
+                days_to_period,
+                sum(pain_window) / len(pain_window) if pain_window else 5.0,
+                avg_sleep,
+                avg_stress,
+                avg_exercise
+            )
+            yield user_id, date, features, pain_score
+        
+        if pain_score is not None:
+            pain_window.append(pain_score)
+
+class _Sample:
+    """Uniform random sample of at most ``max_rows`` rows, built chunk by chunk"""
+    
+    def __init__(self, max_rows: int, rng):
+        self.max_rows = max_rows
+        self.rng = rng
+        self._chunks = []
+        self._count = 0
+    
+    def add(self, X, y):
+        self._chunks.append((X, y, self.rng.random(len(y))))
+        self._count += len(y)
+        # Compact only once the buffer doubles, so each row is copied a bounded number of times
+        if self._count > 2 * self.max_rows:
+            self._compact()
+    
+    def _compact(self):
+        X, y, keys = (np.concatenate(parts) for parts in zip(*self._chunks))
+        if len(y) > self.max_rows:
+            # Keeping the rows with the smallest random keys is a uniform sample
+            keep = np.argpartition(keys, self.max_rows)[:self.max_rows]
+            X, y, keys = X[keep], y[keep], keys[keep]
+        self._chunks = [(X, y, keys)]
+        self._count = len(y)
+    
+    @property
+    def X(self):
+        return self._arrays()[0]
+    
+    @property
+    def y(self):
+        return self._arrays()[1]
+    
+    def _arrays(self):
+        if not self._chunks:
+            return np.empty((0, 6)), np.empty(0)
+        if len(self._chunks) > 1 or self._count > self.max_rows:
+            self._compact()
+        return self._chunks[0][0], self._chunks[0][1]
+
+def is_holdout_user(user_id: str, holdout_fraction: float) -> bool:
+    """Stable per-user split, so no user's entries land on both sides"""
+    return zlib.crc32(user_id.encode()) % 10000 < holdout_fraction * 10000
+
+def collect_training_data(db, chunk_size=5000, holdout_fraction=0.1, max_rows=1_000_000, since=None, seed=42):
+    """Stream training rows into bounded (train, holdout) samples"""
+    rng = np.random.default_rng(seed)
+    train, holdout = _Sample(max_rows, rng), _Sample(max(1, int(max_rows * holdout_fraction)), rng)
+    trained_through = None
+    buffers = {True: ([], []), False: ([], [])}
+    
+    def drain(is_holdout):
+        features, targets = buffers[is_holdout]
+        if targets:
+            (holdout if is_holdout else train).add(np.array(features, dtype=float), np.array(targets, dtype=float))
+            features.clear()
+            targets.clear()
+    
+    for user_id, date, features, pain_score in iter_training_rows(db, chunk_size, since):
+        is_holdout = is_holdout_user(user_id, holdout_fraction)
+        buffers[is_holdout][0].append(features)
+        buffers[is_holdout][1].append(pain_score)
+        if len(buffers[is_holdout][1]) >= chunk_size:
+            drain(is_holdout)
+        trained_through = date if trained_through is None else max(trained_through, date)
+    
+    drain(True)
+    drain(False)
+    return train, holdout, trained_through
+
+def _mae(model, X, y):
+    return float(np.mean(np.abs(np.clip(model.predict(X), 0, 10) - y)))
+
+def retrain_model(mode="fresh", chunk_size=5000, holdout_fraction=0.1, max_rows=1_000_000, n_estimators=50,
+                  extra_trees=10, tolerance=0.02, min_rows=200, force=False, model_dir=None):
+    """Train on real entries, validate on held-out users and publish a new model version.
+    
+    ``fresh`` trains a new forest on all entries; ``extend`` adds
+    ``extra_trees`` warm-start trees fitted on entries newer than the live
+    model. Returns the published metadata; raises RetrainRejected otherwise.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    
+    current = PainPredictor(model_dir=model_dir)
+    current.load()
+    registry = current.registry
+    current_metadata = registry.current() or {}
+    
+    since = None
+    if mode == "extend":
+        if not current.is_ready:
+            raise RetrainRejected("No live model to extend; run a fresh retrain first")
+        if current_metadata.get("trained_through"):
+            since = datetime.fromisoformat(current_metadata["trained_through"])
+    
+    db = SessionLocal()
+    try:
+        train, holdout, trained_through = collect_training_data(db, chunk_size, holdout_fraction, max_rows, since)
+    finally:
+        db.close()
+    
+    trained_through = trained_through or since
+    if len(train.y) < min_rows:
+        raise RetrainRejected(f"Only {len(train.y)} training rows available (need {min_rows})")
+    
+    if mode == "extend":
+        model = current.model
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + extra_trees, n_jobs=-1)
+    else:
+        model = RandomForestRegressor(n_estimators=n_estimators, max_depth=5, random_state=42, n_jobs=-1)
+    model.fit(train.X, train.y)
+    model.set_params(warm_start=False, n_jobs=None)
+    
+    metadata = {
+        "mode": mode,
+        "base_version": current.model_version if current.is_ready else None,
+        "trained_at": datetime.utcnow().isoformat(),
+        "trained_through": trained_through.isoformat() if trained_through else None,
+        "train_rows": int(len(train.y)),
+        "holdout_rows": int(len(holdout.y)),
+        "n_estimators": len(model.estimators_)
+    }
+    
+    if len(holdout.y):
+        holdout_trees = tree_predictions(model, holdout.X)
+        metadata["holdout_mae"] = float(np.mean(np.abs(np.clip(holdout_trees.mean(axis=1), 0, 10) - holdout.y)))
+        # Held-out users weren't trained on, so their residuals calibrate the intervals
+        metadata["calibration"] = ConformalCalibration.fit(holdout_trees, holdout.y).to_dict()
+        if current.is_ready and mode == "fresh":
+            metadata["baseline_mae"] = _mae(current.model, holdout.X, holdout.y)
+        elif current.is_ready:
+            # The live model object was extended in place; score its original trees only
+            metadata["baseline_mae"] = _mae_of_trees(model.estimators_[:-extra_trees], holdout)
+        if not force and "baseline_mae" in metadata and metadata["holdout_mae"] > metadata["baseline_mae"] * (1 + tolerance):
+            raise RetrainRejected(
+                f"Candidate holdout MAE {metadata['holdout_mae']:.3f} is worse than "
+                f"the live model's {metadata['baseline_mae']:.3f}"
+            )
+    elif not force:
+        raise RetrainRejected("No holdout rows to validate against; use --force to publish anyway")
+    
+    return registry.publish(model, metadata, compile_model(model))
+
+def _mae_of_trees(trees, holdout):
+    predictions = np.mean([tree.predict(holdout.X) for tree in trees], axis=0)
+    return float(np.mean(np.abs(np.clip(predictions, 0, 10) - holdout.y)))
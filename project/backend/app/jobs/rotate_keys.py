@@ -0,0 +1,43 @@
+from sqlalchemy import select, update, bindparam
+from ..database import SessionLocal, PainEntry
+from ..utils.encryption import encryptor as default_encryptor
+
+def reencrypt_notes(chunk_size=500, encryptor=None) -> int:
+    """Re-encrypt every pain note not yet under the current key, one chunk per transaction.
+    
+    Covers notes under retired keys and plaintext notes written before
+    encryption was enabled. Chunks are keyed on the entry id, so the job can
+    be stopped and rerun at any point. A row is only overwritten if its note
+    still holds the value that was read. Returns the number of notes rewritten.
+    """
+    encryptor = encryptor or default_encryptor
+    table = PainEntry.__table__
+    rewrite = update(table).where(
+        table.c.id == bindparam("entry_id"), table.c.notes == bindparam("old_notes")
+    ).values(notes=bindparam("new_notes"))
+    
+    rewritten = 0
+    last_id = None
+    db = SessionLocal()
+    try:
+        while True:
+            query = select(PainEntry.id, PainEntry.notes).where(
+                PainEntry.notes.is_not(None), ~PainEntry.notes.startswith(encryptor.current_prefix)
+            ).order_by(PainEntry.id).limit(chunk_size)
+            if last_id is not None:
+                query = query.where(PainEntry.id > last_id)
+            rows = db.execute(query).all()
+            if not rows:
+                return rewritten
+            
+            old_notes = [notes for _, notes in rows]
+            new_notes = encryptor.encrypt_many(encryptor.decrypt_many(old_notes))
+            db.execute(rewrite, [
+                {"entry_id": entry_id, "old_notes": old, "new_notes": new}
+                for (entry_id, _), old, new in zip(rows, old_notes, new_notes)
+            ])
+            db.commit()
+            rewritten += len(rows)
+            last_id = rows[-1].id
+    finally:
+        db.close()
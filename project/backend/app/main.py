@@ -1,15 +1,56 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response, JSONResponse
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
 
-from .api import users, pain, predictions, recommendations
+from .api import users, pain, ingest, export, cycles, predictions, recommendations, dashboard
+from .ml.predictor import predictor
+from .ml.recommender import recommender
+from .database import async_engine
+from .config import settings
+from .feedback import feedback_queue, warm_feedback_stats
+from .personalization import user_models
+from .utils.cache import prediction_cache
+from .utils.encryption import encryptor
+from .utils.metrics import metrics, MetricsMiddleware
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY_ERROR = "ENCRYPTION_KEY is the shipped placeholder; notes are encrypted under a public key"
+
+async def _watch_model():
+    """Pick up newly published model versions without a restart"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(settings.MODEL_RELOAD_INTERVAL_SECONDS)
+        # Loading and compiling happen off the event loop; the swap itself is instant
+        await loop.run_in_executor(None, predictor.reload_if_changed)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if encryptor.uses_default_key:
+        logger.warning("%s. Set ENCRYPTION_KEY before storing real data.", DEFAULT_KEY_ERROR)
+    # Warm the model in the background so startup never waits on it
+    asyncio.get_running_loop().run_in_executor(None, predictor.load)
+    await warm_feedback_stats()
+    await feedback_queue.start()
+    watcher = asyncio.create_task(_watch_model()) if settings.MODEL_RELOAD_INTERVAL_SECONDS > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    await feedback_queue.stop()
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title="Period Pain Predictor MVP",
     description="Privacy-first menstrual cycle pain prediction app",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -21,11 +62,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(users.router, prefix="/api/v1", tags=["users"])
 app.include_router(pain.router, prefix="/api/v1", tags=["pain"])
+app.include_router(ingest.router, prefix="/api/v1", tags=["pain"])
+app.include_router(export.router, prefix="/api/v1", tags=["pain"])
+app.include_router(cycles.router, prefix="/api/v1", tags=["cycles"])
 app.include_router(predictions.router, prefix="/api/v1", tags=["predictions"])
 app.include_router(recommendations.router, prefix="/api/v1", tags=["recommendations"])
+app.include_router(dashboard.router, prefix="/api/v1", tags=["dashboard"])
 
 @app.get("/")
 async def root():
@@ -37,7 +85,60 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    health = {
+        "status": "healthy" if predictor.is_ready else "degraded",
+        "model": {
+            "status": predictor.status,
+            "version": predictor.model_version,
+            "error": predictor.load_error
+        },
+        "encryption": {
+            "key_version": encryptor.current_version,
+            "error": DEFAULT_KEY_ERROR if encryptor.uses_default_key else None
+        }
+    }
+    if encryptor.uses_default_key:
+        health["status"] = "unhealthy"
+        return JSONResponse(health, status_code=503)
+    return health
+
+def _register_state_metrics():
+    """Expose counters that the caches, queue and models already keep"""
+    metrics.callback(
+        "prediction_cache_events_total", "Prediction cache lookups and removals, by event",
+        lambda: {(event,): value for event, value in prediction_cache.stats().items() if event != "size"},
+        ("event",), type="counter"
+    )
+    metrics.callback("prediction_cache_entries", "Entries in the prediction cache", lambda: len(prediction_cache.backend))
+    metrics.callback(
+        "user_model_cache_events_total", "Per-user correction lookups, by result",
+        lambda: {("hit",): user_models.hits, ("miss",): user_models.misses}, ("result",), type="counter"
+    )
+    metrics.callback("user_model_cache_entries", "Per-user corrections held in memory", lambda: len(user_models.backend))
+    metrics.callback("feedback_queue_pending", "Feedback rows waiting to be written", lambda: len(feedback_queue.pending))
+    metrics.callback(
+        "feedback_queue_dropped_total", "Feedback rows dropped because the queue was full",
+        lambda: feedback_queue.dropped, type="counter"
+    )
+    metrics.callback(
+        "feedback_queue_failing", "1 if the last feedback flush failed", lambda: int(feedback_queue.last_error is not None)
+    )
+    metrics.callback(
+        "singleflight_in_flight", "Coalesced computations currently running, by flight",
+        lambda: {("forecast",): len(predictions.forecast_flights)}, ("flight",)
+    )
+    metrics.callback("recommender_feedback_users", "Users with feedback in the ranking stats", lambda: recommender.stats.n_users)
+    metrics.callback(
+        "model_info", "Live model version (value is 1 once a model is loaded)",
+        lambda: {(predictor.model_version,): 1} if predictor.is_ready else {}, ("version",)
+    )
+
+if settings.METRICS_ENABLED:
+    _register_state_metrics()
+    
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == "__main__":
     import uvicorn
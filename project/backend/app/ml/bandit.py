@@ -0,0 +1,110 @@
+import threading
+import numpy as np
+
+class ActionStats:
+    """Per-user and global reward statistics for a fixed set of actions.
+    
+    Stats are kept as (reward sum, count) pairs in one float32 array with a
+    row per user, so 100k users x 6 actions stays under 5 MB.
+    """
+    
+    def __init__(self, actions, initial_capacity: int = 1024):
+        self.actions = list(actions)
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        self.global_stats = np.zeros((len(self.actions), 2), dtype=np.float64)
+        self._user_rows = {}
+        self._user_stats = np.zeros((initial_capacity, len(self.actions), 2), dtype=np.float32)
+        self._lock = threading.Lock()
+    
+    @property
+    def n_users(self) -> int:
+        return len(self._user_rows)
+    
+    def update(self, user_id: str, action: str, reward: float, count: int = 1):
+        """Record ``count`` observations whose rewards sum to ``reward``"""
+        column = self.action_index[action]
+        with self._lock:
+            row = self._row_for(user_id)
+            self._user_stats[row, column, 0] += reward
+            self._user_stats[row, column, 1] += count
+            self.global_stats[column, 0] += reward
+            self.global_stats[column, 1] += count
+    
+    def users_stats(self, user_ids) -> np.ndarray:
+        """(n_users, n_actions, 2) stats for a batch of users; zeros for unseen users"""
+        rows = np.fromiter((self._user_rows.get(user_id, -1) for user_id in user_ids), dtype=np.intp, count=len(user_ids))
+        stats = self._user_stats[np.maximum(rows, 0)]
+        stats[rows < 0] = 0
+        return stats
+    
+    def user_stats(self, user_id: str) -> np.ndarray:
+        """(n_actions, 2) array of reward sums and counts; zeros for unseen users"""
+        row = self._user_rows.get(user_id)
+        if row is None:
+            return np.zeros((len(self.actions), 2), dtype=np.float32)
+        return self._user_stats[row]
+    
+    def clear(self):
+        with self._lock:
+            self.global_stats[:] = 0
+            self._user_rows.clear()
+            self._user_stats[:] = 0
+    
+    def _row_for(self, user_id: str) -> int:
+        row = self._user_rows.get(user_id)
+        if row is None:
+            row = len(self._user_rows)
+            if row == len(self._user_stats):
+                grown = np.zeros((2 * len(self._user_stats),) + self._user_stats.shape[1:], dtype=np.float32)
+                grown[:row] = self._user_stats
+                self._user_stats = grown
+            self._user_rows[user_id] = row
+        return row
+
+class BanditPolicy:
+    """Thompson sampling or UCB1 over Beta posteriors built from ActionStats.
+    
+    The posterior for each action starts from the catalog's heuristic score
+    (``prior_strength`` pseudo-observations), adds global feedback capped at
+    ``global_weight`` pseudo-observations, then adds the user's own feedback.
+    """
+    
+    def __init__(self, stats: ActionStats, method: str = "thompson", prior_strength: float = 10.0,
+                 global_weight: float = 200.0, ucb_scale: float = 0.5, seed: int = None):
+        if method not in ("thompson", "ucb"):
+            raise ValueError(f"Unknown bandit method '{method}'")
+        self.stats = stats
+        self.method = method
+        self.prior_strength = prior_strength
+        self.global_weight = global_weight
+        self.ucb_scale = ucb_scale
+        self.rng = np.random.default_rng(seed)
+    
+    def posterior(self, user_stats: np.ndarray, prior_means: np.ndarray):
+        """Beta (alpha, beta) parameters, shaped like ``prior_means`` (users x actions)"""
+        global_sum, global_count = self.stats.global_stats.T
+        scale = np.minimum(1.0, self.global_weight / np.maximum(global_count, 1.0))
+        global_alpha = scale * global_sum
+        global_beta = scale * global_count - global_alpha
+        
+        prior_alpha = np.clip(prior_means, 0.01, 0.99) * self.prior_strength
+        user_sum, user_count = user_stats[..., 0], user_stats[..., 1]
+        alpha = prior_alpha + global_alpha + user_sum
+        beta = (self.prior_strength - prior_alpha) + global_beta + (user_count - user_sum)
+        return alpha, beta
+    
+    def scores(self, user_stats: np.ndarray, prior_means: np.ndarray) -> np.ndarray:
+        """Ranking scores for every (user, action) pair; higher is better"""
+        alpha, beta = self.posterior(user_stats, prior_means)
+        if self.method == "thompson":
+            return self.rng.beta(alpha, beta)
+        
+        n = alpha + beta
+        return alpha / n + self.ucb_scale * np.sqrt(2 * np.log(n.sum(axis=-1, keepdims=True)) / n)
+
+def feedback_reward(helpfulness_score: int, pain_reduction: int = None) -> float:
+    """Map feedback onto a [0, 1] reward: helpfulness, blended with pain relief when given"""
+    reward = (helpfulness_score - 1) / 4
+    if pain_reduction is not None:
+        reward = (reward + pain_reduction / 10) / 2
+    return reward
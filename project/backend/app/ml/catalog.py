@@ -0,0 +1,81 @@
+import json
+import os
+import numpy as np
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "actions.json")
+
+# Pain buckets select the score multiplier and explanation suffix
+MODERATE_PAIN, SEVERE_PAIN, MILD_PAIN = 0, 1, 2
+EXPLANATION_SUFFIXES = ("", " Particularly helpful for severe pain.", " Good for maintaining comfort.")
+
+# Fields returned to clients for every recommended action
+PUBLIC_FIELDS = ("type", "description", "evidence_level", "effectiveness", "contraindications")
+
+def pain_bucket(pain_level: float) -> int:
+    """Bucket predicted pain: >= 7 is severe, <= 3 is mild, anything else moderate"""
+    if pain_level >= 7:
+        return SEVERE_PAIN
+    if pain_level <= 3:
+        return MILD_PAIN
+    return MODERATE_PAIN
+
+class ActionCatalog:
+    """Relief actions compiled into column arrays.
+    
+    Each action's contraindications are packed into a bitmask, so filtering
+    the whole catalog for a user is a single AND.
+    """
+    
+    def __init__(self, actions: list):
+        self.names = [action["name"] for action in actions]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Action names in the catalog must be unique")
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.effectiveness = np.array([action["effectiveness"] for action in actions], dtype=np.float64)
+        
+        # One row per action, one column per pain bucket
+        self.multipliers = np.ones((len(actions), 3), dtype=np.float64)
+        self.multipliers[:, SEVERE_PAIN] = [action.get("severe_pain_multiplier", 1.0) for action in actions]
+        self.multipliers[:, MILD_PAIN] = [action.get("mild_pain_multiplier", 1.0) for action in actions]
+        
+        contraindications = sorted({name for action in actions for name in action["contraindications"]})
+        if len(contraindications) > 64:
+            raise ValueError("The catalog supports at most 64 distinct contraindications")
+        self.contraindication_bits = {name: 1 << i for i, name in enumerate(contraindications)}
+        self.contraindication_mask = np.array(
+            [sum(self.contraindication_bits[name] for name in action["contraindications"]) for action in actions],
+            dtype=np.uint64
+        )
+        
+        self.payloads = [
+            {**{field: action[field] for field in PUBLIC_FIELDS}, "name": action["name"]}
+            for action in actions
+        ]
+        self.explanations = [
+            [action.get("explanation", "This may help manage your symptoms.") + suffix for suffix in EXPLANATION_SUFFIXES]
+            for action in actions
+        ]
+        self.types = {}
+        for action in actions:
+            self.types.setdefault(action["type"], action["name"])
+    
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_CATALOG_PATH) -> "ActionCatalog":
+        with open(path, encoding="utf-8") as catalog_file:
+            return cls(json.load(catalog_file))
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def user_mask(self, user_context: dict) -> int:
+        """Bitmask of the contraindications flagged in a user's context"""
+        return sum(bit for name, bit in self.contraindication_bits.items() if user_context.get(name, False))
+    
+    def safe_matrix(self, user_masks) -> np.ndarray:
+        """(users, actions) boolean matrix of actions that are safe for each user"""
+        user_masks = np.asarray(user_masks, dtype=np.uint64)
+        return (self.contraindication_mask[None, :] & user_masks[:, None]) == 0
+    
+    def prior_scores(self, buckets) -> np.ndarray:
+        """(users, actions) heuristic scores for each user's pain bucket"""
+        return self.effectiveness[None, :] * self.multipliers[:, buckets].T
@@ -0,0 +1,41 @@
+from datetime import date
+import numpy as np
+
+DEFAULT_CYCLE_LENGTH = 28
+# Gaps outside this range are treated as missed or duplicate logs, not cycles
+MIN_CYCLE_LENGTH = 18
+MAX_CYCLE_LENGTH = 45
+# (cycle day, days to next period) for users who haven't logged a period yet
+UNKNOWN_POSITION = (14, 15)
+
+def estimate_cycle_length(starts) -> float:
+    """Median gap in days between consecutive period starts (sorted dates)"""
+    gaps = [
+        (later - earlier).days
+        for earlier, later in zip(starts, starts[1:])
+        if MIN_CYCLE_LENGTH <= (later - earlier).days <= MAX_CYCLE_LENGTH
+    ]
+    return float(np.median(gaps)) if gaps else float(DEFAULT_CYCLE_LENGTH)
+
+def cycle_position(last_start: date, cycle_length: float, on: date):
+    """(cycle day, days to next period) on a date, assuming regular cycles since ``last_start``.
+    
+    Day 1 is the first day of the period; an overdue period rolls over into
+    the next projected cycle.
+    """
+    if last_start is None or on < last_start:
+        return UNKNOWN_POSITION
+    length = int(round(cycle_length))
+    cycle_day = (on - last_start).days % length + 1
+    return cycle_day, length + 1 - cycle_day
+
+def project_cycle_phases(cycle_day, cycle_length, days: int):
+    """Cycle day and days to next period for ``days`` days ahead of many users at once.
+    
+    Takes per-user arrays of today's cycle day and cycle length and returns
+    two flat arrays of ``len(cycle_day) * days`` rows, ordered user-major.
+    """
+    length = np.rint(np.asarray(cycle_length, dtype=float)).astype(np.int64)[:, None]
+    start = np.asarray(cycle_day, dtype=np.int64)[:, None]
+    projected = (start - 1 + np.arange(days)) % length + 1
+    return projected.ravel(), (length + 1 - projected).ravel()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import numpy as np
+
+# Node arrays written by CompiledForest.save
+ARRAY_FIELDS = ("feature", "threshold", "left", "right", "value", "roots", "path_contributions")
+
+class CompiledForest:
+    """Flat-array copy of a fitted sklearn tree ensemble.
+    
+    All trees are packed into contiguous node arrays so a batch of rows can
+    walk every tree at once with a fixed number of NumPy steps (one per
+    level), without sklearn's per-call validation and per-tree dispatch.
+    
+    ``path_contributions`` holds, for every feature and node, how much that
+    feature's splits moved the value on the way down from the root (Saabas
+    decomposition), so explaining a row is one lookup at the leaves it
+    reaches: root value plus contributions equals the prediction.
+    """
+    
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features, path_contributions=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.path_contributions = path_contributions
+    
+    @classmethod
+    def from_sklearn(cls, model):
+        """Compile a fitted RandomForestRegressor (or any single-output tree ensemble)"""
+        features, thresholds, lefts, rights, values, roots, contributions = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+            
+            # Leaves point at themselves and always branch left, so every row
+            # can take exactly max_depth steps regardless of where it stops
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+            threshold = np.where(is_leaf, np.inf, tree.threshold)
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left.astype(np.int32))
+            rights.append(right.astype(np.int32))
+            values.append(tree.value[:, 0, 0])
+            contributions.append(_path_contributions(tree, model.n_features_in_))
+            roots.append(offset)
+            
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.array(roots, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            path_contributions=np.ascontiguousarray(np.concatenate(contributions).T)
+        )
+    
+    def save(self, target, **metadata):
+        """Write the node arrays uncompressed (so they can be memory-mapped) plus ``metadata``"""
+        import joblib
+        
+        joblib.dump({
+            "arrays": {name: getattr(self, name) for name in ARRAY_FIELDS},
+            "max_depth": self.max_depth,
+            "n_features": self.n_features,
+            "metadata": metadata
+        }, target)
+    
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a saved forest; returns (forest, metadata).
+        
+        With ``mmap`` the arrays are read-only views of the file, so every
+        process that opens the same artifact shares one copy in the page cache.
+        """
+        import joblib
+        
+        saved = joblib.load(path, mmap_mode="r" if mmap else None)
+        # Plain ndarray views skip np.memmap's subclass handling on every operation
+        arrays = {name: np.asarray(array) for name, array in saved["arrays"].items()}
+        forest = cls(**arrays, max_depth=saved["max_depth"], n_features=saved["n_features"])
+        return forest, saved["metadata"]
+    
+    @property
+    def n_trees(self):
+        return len(self.roots)
+    
+    @property
+    def bias(self):
+        """Mean root value: the prediction before any split, which contributions are relative to"""
+        return float(self.value[self.roots].mean())
+    
+    def leaves(self, X):
+        """Return the (rows x trees) matrix of leaf node indices each row ends up in"""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        row_index = np.arange(n_rows)[:, None]
+        
+        for _ in range(self.max_depth):
+            go_left = X[row_index, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        
+        return nodes
+    
+    def predict_trees(self, X):
+        """Return the (rows x trees) matrix of per-tree predictions"""
+        return self.value[self.leaves(X)]
+    
+    def contributions(self, leaves):
+        """Per-feature contributions (rows x features) for the leaves returned by ``leaves``"""
+        # One gather per feature (rather than per tree) keeps small batches cheap
+        total = np.column_stack([
+            feature_contributions[leaves].sum(axis=1) for feature_contributions in self.path_contributions
+        ])
+        return total / leaves.shape[1]
+    
+    def predict(self, X):
+        """Mean prediction across trees, matching RandomForestRegressor.predict"""
+        return self.predict_trees(X).mean(axis=1)
+    
+    def matches(self, model, X, atol=1e-9) -> bool:
+        """Check that compiled predictions agree with the sklearn model"""
+        return bool(np.allclose(self.predict(X), model.predict(X), rtol=0, atol=atol))
+
+def _path_contributions(tree, n_features):
+    """(nodes x features) contributions accumulated along each node's path from the root"""
+    contributions = np.zeros((tree.node_count, n_features))
+    value = tree.value[:, 0, 0]
+    # sklearn numbers children after their parent, so parents are always filled in first
+    for node in range(tree.node_count):
+        for child in (tree.children_left[node], tree.children_right[node]):
+            if child != -1:
+                contributions[child] = contributions[node]
+                contributions[child, tree.feature[node]] += value[child] - value[node]
+    return contributions
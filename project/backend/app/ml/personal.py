@@ -0,0 +1,30 @@
+import numpy as np
+
+# Corrections pivot around the middle of the pain scale:
+# personalized = population + bias + (slope - 1) * (population - PIVOT)
+PIVOT = 5.0
+IDENTITY = (0.0, 1.0)
+BIAS_LIMIT = 3.0
+SLOPE_RANGE = (0.5, 1.5)
+
+def fit_corrections(n, sum_residual, sum_centered, sum_centered_sq, sum_residual_centered, shrinkage: float = 5.0):
+    """Fit a bias/slope correction per user from sufficient statistics.
+    
+    All arguments are arrays with one entry per user, where residual is
+    ``actual - population`` and centered is ``population - PIVOT``. This is
+    ridge regression towards the identity correction, so users with few
+    entries stay close to the population model. Returns (bias, slope) arrays.
+    """
+    bias_penalty = shrinkage
+    slope_penalty = shrinkage * 10
+    a = n + bias_penalty
+    b = sum_centered
+    d = sum_centered_sq + slope_penalty
+    determinant = a * d - b * b
+    bias = (d * sum_residual - b * sum_residual_centered) / determinant
+    slope_delta = (a * sum_residual_centered - b * sum_residual) / determinant
+    return np.clip(bias, -BIAS_LIMIT, BIAS_LIMIT), np.clip(1 + slope_delta, *SLOPE_RANGE)
+
+def apply_corrections(population, bias, slope):
+    """Personalized scores for arrays of population scores and per-row parameters"""
+    return population + bias + (slope - 1) * (population - PIVOT)
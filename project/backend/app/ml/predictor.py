@@ -1,132 +1,454 @@
+import hashlib
+import json
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-import joblib
 import os
+import threading
+import time
 from datetime import datetime, timedelta
-import json
+from typing import Any, NamedTuple, Optional
+from .forest import CompiledForest
+from .registry import ModelRegistry
+from .personal import IDENTITY, apply_corrections
+from .cycle import DEFAULT_CYCLE_LENGTH, UNKNOWN_POSITION, project_cycle_phases
+from .uncertainty import ConformalCalibration, summarize_trees
+from ..config import settings
+from ..utils.metrics import MODEL_INFERENCE_SECONDS, MODEL_BATCH_ROWS
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "ml_models",
+    "population_model.joblib"
+)
+
+class ModelNotReadyError(RuntimeError):
+    """Raised when a prediction is requested but no model could be loaded"""
+
+# Version reported for the bootstrap model trained by `app.cli train-model`
+LEGACY_MODEL_VERSION = "1.0"
+
+class LoadedModel(NamedTuple):
+    """Everything a prediction needs, swapped in as one reference.
+    
+    ``model`` is None when the compiled forest was opened from its own
+    artifact; the sklearn model is then unpickled from ``model_path`` only
+    if something (retraining) asks for it.
+    """
+    model: Any
+    compiled: Optional[CompiledForest]
+    version: str
+    stamp: Any
+    calibration: Optional[ConformalCalibration] = None
+    model_path: Optional[str] = None
 
 class PainPredictor:
-    def __init__(self):
-        self.model = None
-        self.model_path = "ml_models/population_model.joblib"
-        self._ensure_model_exists()
+    def __init__(self, model_path=None, model_dir=None):
+        self.model_path = model_path or settings.MODEL_PATH or DEFAULT_MODEL_PATH
+        self.registry = ModelRegistry(model_dir or settings.MODEL_DIR or os.path.dirname(os.path.abspath(self.model_path)))
+        self.status = "not_loaded"
+        self.load_error = None
+        self._active = None
+        self._load_lock = threading.Lock()
     
-    def _ensure_model_exists(self):
-        """Create model directory and train initial model if it doesn't exist"""
-        os.makedirs("ml_models", exist_ok=True)
+    @property
+    def is_ready(self):
+        return self.status == "ready"
+    
+    @property
+    def model(self):
+        active = self._active
+        if active is None or active.model is not None:
+            return active.model if active else None
         
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
-        else:
-            self._train_initial_model()
-    
-    def _train_initial_model(self):
-        """Train initial model with synthetic data"""
-        print("Training initial model with synthetic data...")
-        
-        # Generate synthetic training data
-        np.random.seed(42)
-        n_samples = 1000
-        
-        # Features: cycle_day, days_to_period, historical_pain, sleep, stress, exercise
-        X = np.random.rand(n_samples, 6)
-        X[:, 0] = np.random.randint(1, 29, n_samples)  # cycle_day
-        X[:, 1] = np.random.randint(1, 15, n_samples)  # days_to_period
-        X[:, 2] = np.random.uniform(0, 10, n_samples)  # historical_pain
-        X[:, 3] = np.random.uniform(4, 10, n_samples)  # sleep
-        X[:, 4] = np.random.uniform(0, 10, n_samples)  # stress
-        X[:, 5] = np.random.uniform(0, 120, n_samples) # exercise
-        
-        # Target: pain score with realistic patterns
-        y = np.zeros(n_samples)
-        for i in range(n_samples):
-            cycle_day = X[i, 0]
-            base_pain = 2.0
+        # Only the compiled forest was opened; unpickle the sklearn model on demand
+        import joblib
+        
+        model = joblib.load(active.model_path)
+        with self._load_lock:
+            # Don't undo a hot swap that happened while unpickling
+            if self._active is active:
+                self._active = active._replace(model=model)
+        return model
+    
+    @property
+    def compiled_model(self):
+        return self._active.compiled if self._active else None
+    
+    @property
+    def model_version(self):
+        return self._active.version if self._active else LEGACY_MODEL_VERSION
+    
+    def load(self):
+        """Load the published (or bootstrap) model from disk; never trains"""
+        with self._load_lock:
+            if self.is_ready:
+                return
+            
+            self.status = "loading"
+            try:
+                loaded = self._load_current()
+            except Exception as exc:
+                self.status = "error"
+                self.load_error = str(exc)
+                return
             
-            # Higher pain during period days (cycle days 1-7)
-            if 1 <= cycle_day <= 7:
-                base_pain += np.random.uniform(3, 6)
-            # Moderate pain before period (cycle days 25-28)
-            elif 25 <= cycle_day <= 28:
-                base_pain += np.random.uniform(1, 3)
+            if loaded is None:
+                self.status = "missing"
+                self.load_error = f"Model file not found at {self.model_path}; run `python -m app.cli train-model`"
+                return
             
-            # Adjust for lifestyle factors
-            sleep_impact = max(0, 7 - X[i, 3]) * 0.5
-            stress_impact = X[i, 4] * 0.3
-            exercise_impact = max(0, 30 - X[i, 5]) * 0.02
+            self._active = loaded
+            self.load_error = None
+            self.status = "ready"
+    
+    def reload_if_changed(self) -> bool:
+        """Hot-swap to a newly published model version.
+        
+        The new model is loaded and compiled in the calling thread while
+        requests keep using the current one; the swap is a single reference
+        assignment, so in-flight predictions see either version but never a mix.
+        """
+        if not self.is_ready:
+            self.load()
+            return self.is_ready
+        
+        stamp = self.registry.stamp()
+        if stamp == self._active.stamp:
+            return False
+        
+        with self._load_lock:
+            if stamp == self._active.stamp:
+                return False
+            try:
+                loaded = self._load_current()
+            except Exception as exc:
+                # Keep serving the current version
+                self.load_error = f"Reload failed: {exc}"
+                return False
+            if loaded is None:
+                return False
             
-            y[i] = base_pain + sleep_impact + stress_impact + exercise_impact
-            y[i] = min(10, max(0, y[i] + np.random.normal(0, 0.5)))
+            changed = loaded.version != self._active.version
+            self._active = loaded
+            self.load_error = None
+            return changed
+    
+    def _load_current(self):
+        """Load the registry's live artifact, falling back to the bootstrap model"""
+        import joblib
         
-        self.model = RandomForestRegressor(n_estimators=50, random_state=42, max_depth=5)
-        self.model.fit(X, y)
+        stamp = self.registry.stamp()
+        metadata = self.registry.current()
+        if metadata is not None:
+            model_path = self.registry.artifact_path(metadata)
+            version = metadata["version"]
+            calibration = metadata.get("calibration")
+            # Published artifacts are never overwritten, so their compiled forest can't be stale
+            compiled = self._open_compiled(self.registry.compiled_path(metadata))
+        elif os.path.exists(self.model_path):
+            model_path = self.model_path
+            version = LEGACY_MODEL_VERSION
+            calibration = load_calibration(calibration_path(self.model_path))
+            compiled = self._open_compiled(compiled_path(self.model_path), source_path=self.model_path)
+        else:
+            return None
         
-        joblib.dump(self.model, self.model_path)
-        print("Initial model trained and saved.")
+        calibration = ConformalCalibration.from_dict(calibration) if calibration else None
+        if compiled is not None:
+            return LoadedModel(None, compiled, version, stamp, calibration, model_path)
+        model = joblib.load(model_path)
+        return LoadedModel(model, compile_model(model), version, stamp, calibration, model_path)
+    
+    def _open_compiled(self, path, source_path=None):
+        """Memory-map a saved compiled forest, or None to fall back to the sklearn artifact.
+        
+        With ``source_path`` the forest is only used if it was compiled from
+        that exact file.
+        """
+        if not settings.MODEL_MMAP or path is None or not os.path.exists(path):
+            return None
+        compiled, saved = CompiledForest.load(path)
+        if source_path is not None and saved.get("source_digest") != file_digest(source_path):
+            return None
+        return compiled
+    
+    def _ensure_model_exists(self):
+        """Load the model on first use, raising if it is unavailable"""
+        if not self.is_ready:
+            self.load()
+        if not self.is_ready:
+            raise ModelNotReadyError(self.load_error or "Model is not loaded")
+        return self._active
+    
+    def _predict_rows(self, features, active=None):
+        """Predict a feature matrix with the compiled forest when available"""
+        active = active or self._active
+        if active.compiled is not None:
+            return active.compiled.predict(features)
+        return active.model.predict(features)
+    
+    def _predict_trees(self, features, active=None):
+        """Per-tree predictions as a (rows x trees) matrix, plus per-feature contributions.
+        
+        Contributions come from the same tree walk and are None when the
+        model couldn't be compiled.
+        """
+        active = active or self._active
+        if active.compiled is not None:
+            leaves = active.compiled.leaves(features)
+            return active.compiled.value[leaves], active.compiled.contributions(leaves)
+        return tree_predictions(active.model, features), None
     
     def predict_for_user(self, user_data, days=7):
         """Generate predictions for a user"""
-        predictions = []
+        return self.predict_many([user_data], days)[0]
+    
+    def predict_many(self, contexts, days=7):
+        """Generate predictions for many users with a single model call"""
+        if not contexts or days < 1:
+            return [[] for _ in contexts]
         
-        for day in range(days):
-            # Create features for this prediction day
-            features = self._create_features(user_data, day)
-            
-            # Make prediction
-            pain_score = self.model.predict([features])[0]
-            pain_score = max(0, min(10, pain_score))
-            
-            # Calculate severe probability
-            severe_prob = 1 / (1 + np.exp(-(pain_score - 6.5)))
-            
-            predictions.append({
-                'date': (datetime.now() + timedelta(days=day)).strftime('%Y-%m-%d'),
-                'predicted_pain': round(pain_score, 1),
-                'severe_probability': round(severe_prob, 3),
-                'confidence_interval': [
-                    max(0, round(pain_score - 1.2, 1)),
-                    min(10, round(pain_score + 1.2, 1))
-                ],
-                'drivers': self._get_drivers(features)
-            })
-        
-        return predictions
-    
-    def _create_features(self, user_data, days_ahead):
-        """Create feature vector for prediction"""
-        cycle_day = (user_data.get('current_cycle_day', 14) + days_ahead) % 28
-        if cycle_day == 0: cycle_day = 28
-        
-        days_to_period = user_data.get('days_to_next_period', 14) - days_ahead
-        if days_to_period < 0:
-            days_to_period = 28 + days_to_period
-        
-        historical_pain = user_data.get('historical_avg_pain', 5.0)
-        sleep = user_data.get('avg_sleep', 7.0)
-        stress = user_data.get('avg_stress', 5.0)
-        exercise = user_data.get('avg_exercise', 30.0)
-        
-        return [cycle_day, days_to_period, historical_pain, sleep, stress, exercise]
-    
-    def _get_drivers(self, features):
-        """Get explanation for prediction"""
-        drivers = []
-        cycle_day, days_to_period, historical_pain, sleep, stress, exercise = features
-        
-        if 1 <= cycle_day <= 7:
-            drivers.append("during your period")
-        elif 25 <= cycle_day <= 28:
-            drivers.append("approaching your period")
-        
-        if sleep < 6:
-            drivers.append("low sleep quality")
-        
-        if stress > 7:
-            drivers.append("high stress levels")
-        
-        return drivers if drivers else ["typical cycle pattern"]
-
-# Global instance
+        active = self._ensure_model_exists()
+        
+        # One row per (user, day), ordered user-major
+        features = self._create_feature_matrix(contexts, days)
+        
+        start = time.perf_counter()
+        trees, contributions = self._predict_trees(features, active)
+        MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - start)
+        MODEL_BATCH_ROWS.observe(len(features))
+        bias, slope = self._personal_corrections(contexts, active.version)
+        if bias is not None:
+            # Correct every tree, so the spread follows the user's slope too
+            trees = apply_corrections(trees, np.repeat(bias, days)[:, None], np.repeat(slope, days)[:, None])
+        
+        # Point estimate, interval and severe probability all come from the same matrix
+        pain_scores, lower, upper, severe_probs = summarize_trees(
+            trees, active.calibration, settings.PREDICTION_INTERVAL_COVERAGE
+        )
+        pain_scores = np.round(np.clip(pain_scores, 0, 10), 1)
+        lower = np.round(np.clip(lower, 0, 10), 1)
+        upper = np.round(np.clip(upper, 0, 10), 1)
+        severe_probs = np.round(severe_probs, 3)
+        drivers = self._get_drivers(features, contributions)
+        
+        now = datetime.utcnow()
+        dates = [(now + timedelta(days=day)).strftime('%Y-%m-%d') for day in range(days)]
+        
+        results = []
+        for user_index in range(len(contexts)):
+            predictions = []
+            for day in range(days):
+                row = user_index * days + day
+                predictions.append({
+                    'date': dates[day],
+                    'predicted_pain': float(pain_scores[row]),
+                    'severe_probability': float(severe_probs[row]),
+                    'confidence_interval': [float(lower[row]), float(upper[row])],
+                    'drivers': drivers[row]
+                })
+            results.append(predictions)
+        
+        return results
+    
+    def _personal_corrections(self, contexts, version):
+        """Per-user (bias, slope) arrays, or (None, None) if no user has a correction for this model"""
+        corrections = [
+            (user_data['personal_bias'], user_data['personal_slope'])
+            if user_data.get('personal_version') == version else IDENTITY
+            for user_data in contexts
+        ]
+        if all(correction == IDENTITY for correction in corrections):
+            return None, None
+        bias, slope = np.array(corrections, dtype=float).T
+        return bias, slope
+    
+    def _create_feature_matrix(self, contexts, days):
+        """Create feature matrix with one row per user and prediction day"""
+        base = np.array([
+            [
+                user_data.get('current_cycle_day', UNKNOWN_POSITION[0]),
+                user_data.get('cycle_length', DEFAULT_CYCLE_LENGTH),
+                user_data.get('historical_avg_pain', 5.0),
+                user_data.get('avg_sleep', 7.0),
+                user_data.get('avg_stress', 5.0),
+                user_data.get('avg_exercise', 30.0)
+            ]
+            for user_data in contexts
+        ], dtype=float)
+        
+        features = np.repeat(base, days, axis=0)
+        # Each user's own cycle length decides where the next period falls
+        features[:, 0], features[:, 1] = project_cycle_phases(base[:, 0], base[:, 1], days)
+        return features
+    
+    def _get_drivers(self, features, contributions=None):
+        """Get explanations for each row of a feature matrix.
+        
+        With per-feature contributions from the forest, the drivers are the
+        features that pushed the prediction up the most; otherwise fixed
+        thresholds on the features are used.
+        """
+        if contributions is None:
+            return self._rule_drivers(features)
+        
+        # Both cycle columns describe the same thing to the user
+        groups = np.column_stack([contributions[:, 0] + contributions[:, 1], contributions[:, 2:]])
+        labels = np.empty(groups.shape, dtype=np.int64)
+        labels[:, 0] = np.where(features[:, 0] <= 7, 0, np.where(features[:, 1] <= 4, 1, 2))
+        labels[:, 1:] = np.arange(3, 3 + groups.shape[1] - 1)
+        
+        order = np.argsort(-groups, axis=1)[:, :MAX_DRIVERS]
+        top = np.take_along_axis(groups, order, axis=1)
+        top_labels = np.where(top >= MIN_DRIVER_CONTRIBUTION, np.take_along_axis(labels, order, axis=1), -1)
+        
+        # Encode each row's ranked labels and build the lists once per distinct combination
+        codes = ((top_labels + 1) * len(DRIVER_LABELS) ** np.arange(MAX_DRIVERS)).sum(axis=1)
+        _, first_rows, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        table = [
+            tuple(DRIVER_LABELS[label] for label in top_labels[row] if label >= 0) or ("typical cycle pattern",)
+            for row in first_rows.tolist()
+        ]
+        return [list(table[index]) for index in inverse.ravel().tolist()]
+    
+    def _rule_drivers(self, features):
+        """Drivers from fixed feature thresholds, for models that can't be compiled"""
+        cycle_day = features[:, 0]
+        period_phase = np.where((cycle_day >= 1) & (cycle_day <= 7), 1,
+                                np.where((cycle_day >= 25) & (cycle_day <= 28), 2, 0))
+        low_sleep = features[:, 3] < 6
+        high_stress = features[:, 4] > 7
+        
+        # Encode each row's driver combination and look it up in a small table
+        codes = period_phase * 4 + low_sleep * 2 + high_stress
+        return [list(DRIVER_TABLE[code]) for code in codes.tolist()]
+
+def compile_model(model):
+    """Compile a forest into flat arrays, or None to keep using sklearn"""
+    try:
+        compiled = CompiledForest.from_sklearn(model)
+    except (AttributeError, IndexError, ValueError):
+        return None
+    
+    # Only switch over if the compiled forest reproduces sklearn's output
+    rng = np.random.default_rng(0)
+    probe = np.column_stack([
+        rng.integers(1, 29, 256),
+        rng.integers(0, 29, 256),
+        rng.uniform(0, 10, 256),
+        rng.uniform(0, 12, 256),
+        rng.uniform(0, 10, 256),
+        rng.uniform(0, 180, 256)
+    ]).astype(float)
+    return compiled if compiled.matches(model, probe) else None
+
+def tree_predictions(model, features):
+    """(rows x trees) predictions of a fitted sklearn forest"""
+    return np.column_stack([tree.predict(features) for tree in model.estimators_])
+
+def compiled_path(model_path: str) -> str:
+    """Sidecar file holding the compiled forest of a bootstrap model"""
+    return os.path.splitext(model_path)[0] + ".forest"
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def save_compiled(model, model_path: str):
+    """Compile a bootstrap model and save it next to the model, tied to that file's contents"""
+    compiled = compile_model(model)
+    if compiled is not None:
+        compiled.save(compiled_path(model_path), source_digest=file_digest(model_path))
+    return compiled
+
+def calibration_path(model_path: str) -> str:
+    """Sidecar file holding the calibration of a bootstrap model"""
+    return os.path.splitext(model_path)[0] + ".calibration.json"
+
+def load_calibration(path: str):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+def calibrate_on_synthetic(model, model_path, n_samples=50_000, seed=43):
+    """Fit the bootstrap model's calibration on fresh synthetic rows and save it next to the model"""
+    from .training_data import generate_training_data
+    
+    X, y = generate_training_data(n_samples, seed=seed)
+    calibration = ConformalCalibration.fit(tree_predictions(model, X), y)
+    with open(calibration_path(model_path), "w", encoding="utf-8") as handle:
+        json.dump(calibration.to_dict(), handle)
+    return calibration
+
+def _build_driver_table():
+    """Precompute driver lists for every (period phase, sleep, stress) combination"""
+    table = []
+    for period_phase in range(3):
+        for low_sleep in (False, True):
+            for high_stress in (False, True):
+                drivers = []
+                if period_phase == 1:
+                    drivers.append("during your period")
+                elif period_phase == 2:
+                    drivers.append("approaching your period")
+                if low_sleep:
+                    drivers.append("low sleep quality")
+                if high_stress:
+                    drivers.append("high stress levels")
+                table.append(tuple(drivers) if drivers else ("typical cycle pattern",))
+    return table
+
+DRIVER_TABLE = _build_driver_table()
+
+# Driver text per feature group; the cycle group reads by phase
+DRIVER_LABELS = (
+    "during your period",
+    "approaching your period",
+    "your cycle phase",
+    "your recent pain levels",
+    "low sleep quality",
+    "high stress levels",
+    "low physical activity"
+)
+MAX_DRIVERS = 3
+# Contributions smaller than this (in pain points) aren't worth mentioning
+MIN_DRIVER_CONTRIBUTION = 0.3
+
+def train_initial_model(model_path=DEFAULT_MODEL_PATH, n_samples=1000, seed=42, data_dir=None,
+                        chunk_size=1_000_000, n_jobs=-1, max_samples=None):
+    """Train initial model with synthetic data.
+    
+    With ``data_dir``, trains on X.npy/y.npy found there (memory-mapped), or
+    generates ``n_samples`` rows into it first. Trees are fitted on
+    ``n_jobs`` cores; ``max_samples`` caps each tree's bootstrap sample.
+    """
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from .training_data import generate_training_data, load_training_data, X_FILE
+    
+    if data_dir and os.path.exists(os.path.join(data_dir, X_FILE)):
+        X, y = load_training_data(data_dir)
+        print(f"Training initial model on {len(y)} synthetic rows from {data_dir}...")
+    else:
+        print(f"Training initial model with {n_samples} synthetic rows...")
+        X, y = generate_training_data(n_samples, seed=seed, chunk_size=chunk_size, output_dir=data_dir)
+    
+    model = RandomForestRegressor(n_estimators=50, random_state=seed, max_depth=5, n_jobs=n_jobs, max_samples=max_samples)
+    model.fit(X, y)
+    # Scoring happens one small batch at a time; don't ship a pool setting with the model
+    model.set_params(n_jobs=None)
+    
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    joblib.dump(model, model_path)
+    save_compiled(model, model_path)
+    # Calibrate on rows the forest hasn't seen (a different seed)
+    calibrate_on_synthetic(model, model_path, n_samples=min(n_samples, 50_000), seed=seed + 1)
+    print("Initial model trained and saved.")
+    return model
+
+# Global instance (the model is loaded lazily on first use)
 predictor = PainPredictor()
\ No newline at end of file
@@ -1,137 +1,94 @@
-import random
-from typing import List, Dict, Any
+import time
+import numpy as np
+from typing import List, Dict, Any, Tuple
+from .bandit import ActionStats, BanditPolicy
+from .catalog import ActionCatalog, DEFAULT_CATALOG_PATH, pain_bucket
+from ..config import settings
+from ..utils.metrics import RECOMMENDER_SECONDS, RECOMMENDER_BATCH_SIZE
 
 class ReliefRecommender:
-    def __init__(self):
-        self.actions = {
-            'hydration': {
-                'type': 'hydration',
-                'description': 'Drink 500ml of water',
-                'evidence_level': 'high',
-                'effectiveness': 0.3,
-                'contraindications': []
-            },
-            'heat_pad': {
-                'type': 'heat_pad',
-                'description': 'Apply heat pad for 15-20 minutes',
-                'evidence_level': 'high', 
-                'effectiveness': 0.4,
-                'contraindications': ['skin_sensitivity']
-            },
-            'gentle_stretching': {
-                'type': 'exercise',
-                'description': 'Gentle pelvic stretches',
-                'evidence_level': 'medium',
-                'effectiveness': 0.35,
-                'contraindications': ['acute_pain']
-            },
-            'magnesium_foods': {
-                'type': 'dietary',
-                'description': 'Foods rich in magnesium (nuts, leafy greens)',
-                'evidence_level': 'medium',
-                'effectiveness': 0.25,
-                'contraindications': []
-            },
-            'breathing_exercise': {
-                'type': 'mind_body',
-                'description': 'Deep breathing for 5 minutes',
-                'evidence_level': 'medium',
-                'effectiveness': 0.3,
-                'contraindications': []
-            },
-            'rest': {
-                'type': 'rest',
-                'description': 'Take a 20-minute rest break',
-                'evidence_level': 'high',
-                'effectiveness': 0.35,
-                'contraindications': []
-            }
-        }
+    def __init__(self, method: str = None, seed: int = None, catalog: ActionCatalog = None):
+        self.catalog = catalog or ActionCatalog.from_file(settings.ACTION_CATALOG_PATH or DEFAULT_CATALOG_PATH)
+        self.actions = {payload['name']: payload for payload in self.catalog.payloads}
+        self.stats = ActionStats(self.catalog.names)
+        self.policy = BanditPolicy(
+            self.stats,
+            method=method or settings.RECOMMENDER_POLICY,
+            prior_strength=settings.BANDIT_PRIOR_STRENGTH,
+            global_weight=settings.BANDIT_GLOBAL_WEIGHT,
+            seed=seed
+        )
     
-    def get_recommendations(self, user_id: str, prediction_data: Dict, user_context: Dict = None) -> List[Dict]:
+    def resolve_action(self, recommendation: str):
+        """Map an action name or action type from feedback onto an action name"""
+        if recommendation in self.catalog.index:
+            return recommendation
+        return self.catalog.types.get(recommendation)
+    
+    def record_feedback(self, user_id: str, action_name: str, reward: float):
+        """Fold one piece of feedback into the ranking statistics"""
+        self.stats.update(user_id, action_name, reward)
+    
+    def get_recommendations(self, user_id: str, prediction_data: Dict, user_context: Dict = None, top_k: int = 3) -> List[Dict]:
         """Get personalized recommendations"""
-        user_context = user_context or {}
-        
-        # Filter safe actions
-        safe_actions = self._filter_safe_actions(user_context)
+        return self.recommend_many([(user_id, prediction_data, user_context)], top_k)[0]
+    
+    def recommend_many(self, requests: List[Tuple[str, Dict, Dict]], top_k: int = 3) -> List[List[Dict]]:
+        """Rank actions for many (user_id, prediction_data, user_context) requests at once"""
+        if not requests:
+            return []
         
-        # Personalize based on prediction and user history
-        personalized = self._personalize_actions(safe_actions, prediction_data, user_id)
+        start = time.perf_counter()
+        user_ids = [user_id for user_id, _, _ in requests]
+        buckets = [pain_bucket(prediction['predicted_pain']) for _, prediction, _ in requests]
+        user_masks = [self.catalog.user_mask(user_context or {}) for _, _, user_context in requests]
         
-        # Return top 3 recommendations
-        return personalized[:3]
-    
-    def _filter_safe_actions(self, user_context: Dict) -> List[Dict]:
-        """Filter out contraindicated actions"""
-        safe_actions = []
+        # Heuristic scores are the prior; feedback from this user and everyone else updates it
+        user_stats = self.stats.users_stats(user_ids)
+        scores = self.policy.scores(user_stats, self.catalog.prior_scores(buckets))
+        if any(user_masks):
+            scores = np.where(self.catalog.safe_matrix(user_masks), scores, -np.inf)
+        top = self._top_k(scores, top_k)
         
-        for action_name, action in self.actions.items():
-            safe = True
-            for contraindication in action['contraindications']:
-                if user_context.get(contraindication, False):
-                    safe = False
+        results = []
+        for row, columns in enumerate(top):
+            recommendations = []
+            for column in columns:
+                score = scores[row, column]
+                if score == -np.inf:
                     break
-            
-            if safe:
-                safe_actions.append({**action, 'name': action_name})
+                recommendations.append({
+                    **self.catalog.payloads[column],
+                    'personal_score': round(float(score), 3),
+                    'explanation': self.catalog.explanations[column][buckets[row]],
+                    'confidence': self._get_confidence(user_stats[row, column, 1])
+                })
+            results.append(recommendations)
         
-        return safe_actions
+        RECOMMENDER_SECONDS.observe(time.perf_counter() - start)
+        RECOMMENDER_BATCH_SIZE.observe(len(requests))
+        return results
     
-    def _personalize_actions(self, actions: List[Dict], prediction: Dict, user_id: str) -> List[Dict]:
-        """Personalize action ranking"""
-        pain_level = prediction['predicted_pain']
-        
-        # Score actions based on pain level and type
-        scored_actions = []
-        for action in actions:
-            score = action['effectiveness']
-            
-            # Adjust scores based on pain level
-            if pain_level >= 7:  # Severe pain
-                if action['type'] in ['heat_pad', 'rest']:
-                    score *= 1.3
-                elif action['type'] in ['gentle_stretching']:
-                    score *= 0.7
-            elif pain_level <= 3:  # Mild pain
-                if action['type'] in ['exercise', 'hydration']:
-                    score *= 1.2
-            
-            # Add some randomness for exploration
-            score *= random.uniform(0.9, 1.1)
-            
-            # Add explanation
-            explanation = self._get_explanation(action, pain_level)
-            
-            scored_actions.append({
-                **action,
-                'personal_score': round(score, 3),
-                'explanation': explanation,
-                'confidence': 'medium'  # Could be based on user feedback history
-            })
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Column indices of each row's k best scores, best first"""
+        n_actions = scores.shape[1]
+        k = min(k, n_actions)
+        # A full sort is cheaper than partitioning for small catalogs
+        if n_actions <= 4 * k:
+            return np.argsort(-scores, axis=1, kind='stable')[:, :k]
         
-        # Sort by score
-        scored_actions.sort(key=lambda x: x['personal_score'], reverse=True)
-        return scored_actions
+        rows = np.arange(scores.shape[0])[:, None]
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-scores[rows, candidates], axis=1, kind='stable')
+        return candidates[rows, order]
     
-    def _get_explanation(self, action: Dict, pain_level: float) -> str:
-        """Generate explanation for recommendation"""
-        explanations = {
-            'hydration': "Hydration helps reduce bloating and muscle cramps.",
-            'heat_pad': "Heat relaxes uterine muscles and increases blood flow.",
-            'gentle_stretching': "Stretching can relieve muscle tension and improve circulation.",
-            'magnesium_foods': "Magnesium helps relax muscles and may reduce cramping.",
-            'breathing_exercise': "Deep breathing reduces stress and can help manage pain perception.",
-            'rest': "Rest allows your body to recover and can reduce inflammation."
-        }
-        
-        base_explanation = explanations.get(action['name'], "This may help manage your symptoms.")
-        
-        if pain_level >= 7:
-            return f"{base_explanation} Particularly helpful for severe pain."
-        elif pain_level <= 3:
-            return f"{base_explanation} Good for maintaining comfort."
-        else:
-            return base_explanation
+    def _get_confidence(self, feedback_count: float) -> str:
+        """Confidence grows with the user's own feedback on the action"""
+        if feedback_count >= 10:
+            return 'high'
+        if feedback_count >= 3:
+            return 'medium'
+        return 'low'
 
 # Global instance
 recommender = ReliefRecommender()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+
+CURRENT_POINTER = "current.json"
+
+class ModelRegistry:
+    """Versioned model artifacts in one directory, plus a pointer to the live one.
+    
+    Artifacts are written under a temporary name and renamed into place, and
+    the pointer is replaced the same way, so readers only ever see a complete
+    artifact and a complete pointer.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.pointer_path = os.path.join(directory, CURRENT_POINTER)
+    
+    def current(self):
+        """Metadata of the live artifact, or None if nothing has been published"""
+        try:
+            with open(self.pointer_path, encoding="utf-8") as pointer:
+                return json.load(pointer)
+        except FileNotFoundError:
+            return None
+    
+    def stamp(self):
+        """Cheap change marker for the pointer (None if it doesn't exist)"""
+        try:
+            stat = os.stat(self.pointer_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    
+    def artifact_path(self, metadata: dict) -> str:
+        return os.path.join(self.directory, metadata["artifact"])
+    
+    def compiled_path(self, metadata: dict):
+        """Path of the memory-mappable compiled forest, or None for artifacts published without one"""
+        return os.path.join(self.directory, metadata["compiled_artifact"]) if metadata.get("compiled_artifact") else None
+    
+    def publish(self, model, metadata: dict, compiled=None) -> dict:
+        """Write a new versioned artifact (plus its compiled forest) and point the registry at it"""
+        import joblib
+        
+        os.makedirs(self.directory, exist_ok=True)
+        version = metadata.get("version") or new_version()
+        # Never overwrite an artifact that a worker may still be loading
+        base_version, suffix = version, 1
+        while os.path.exists(os.path.join(self.directory, f"population_model-{version}.joblib")):
+            version = f"{base_version}.{suffix}"
+            suffix += 1
+        metadata = {**metadata, "version": version, "artifact": f"population_model-{version}.joblib"}
+        if compiled is not None:
+            metadata["compiled_artifact"] = f"population_model-{version}.forest"
+        
+        self._atomic_write(self.artifact_path(metadata), lambda handle: joblib.dump(model, handle), binary=True)
+        if compiled is not None:
+            self._atomic_write(self.compiled_path(metadata), compiled.save, binary=True)
+        self._atomic_write(self.pointer_path, lambda handle: json.dump(metadata, handle, indent=2))
+        return metadata
+    
+    def _atomic_write(self, path: str, write, binary: bool = False):
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(handle, "wb" if binary else "w") as temp_file:
+                write(temp_file)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+def new_version() -> str:
+    """Sortable version string derived from the training time (UTC)"""
+    return datetime.utcnow().strftime("%Y%m%d.%H%M%S")
@@ -0,0 +1,80 @@
+import os
+import numpy as np
+
+# Feature columns, in model order
+FEATURES = ("cycle_day", "days_to_period", "historical_pain", "sleep", "stress", "exercise")
+X_FILE = "X.npy"
+Y_FILE = "y.npy"
+
+def generate_chunk(rng, n_samples: int, out_X=None, out_y=None):
+    """Synthetic feature rows and pain targets for one chunk.
+    
+    Pain is 2 plus 3-6 during the period (cycle days 1-7) or 1-3 before it
+    (days 25-28), plus sleep deficit, stress and lack of exercise, plus
+    N(0, 0.5) noise, clipped to 0-10. Writes into ``out_X``/``out_y`` when given.
+    """
+    X = np.empty((n_samples, len(FEATURES)), dtype=np.float32) if out_X is None else out_X
+    y = np.empty(n_samples, dtype=np.float64) if out_y is None else out_y
+    
+    cycle_day = rng.integers(1, 29, n_samples)
+    sleep = rng.uniform(4, 10, n_samples)
+    stress = rng.uniform(0, 10, n_samples)
+    exercise = rng.uniform(0, 120, n_samples)
+    X[:, 0] = cycle_day
+    X[:, 1] = rng.integers(1, 15, n_samples)
+    X[:, 2] = rng.uniform(0, 10, n_samples)
+    X[:, 3] = sleep
+    X[:, 4] = stress
+    X[:, 5] = exercise
+    
+    phase_pain = np.where(
+        cycle_day <= 7, rng.uniform(3, 6, n_samples),
+        np.where(cycle_day >= 25, rng.uniform(1, 3, n_samples), 0.0)
+    )
+    pain = (
+        2.0 + phase_pain
+        + np.maximum(0, 7 - sleep) * 0.5
+        + stress * 0.3
+        + np.maximum(0, 30 - exercise) * 0.02
+        + rng.normal(0, 0.5, n_samples)
+    )
+    np.clip(pain, 0, 10, out=y)
+    return X, y
+
+def generate_training_data(n_samples: int, seed: int = 42, chunk_size: int = 1_000_000, output_dir: str = None):
+    """Generate ``n_samples`` rows chunk by chunk; returns (X, y).
+    
+    Each chunk has its own child seed, so a given (seed, chunk_size) always
+    produces the same data. With ``output_dir`` the arrays are written as
+    X.npy/y.npy and returned as read-only memory maps; peak memory is then
+    one chunk of temporaries regardless of ``n_samples``.
+    """
+    n_chunks = max(1, -(-n_samples // chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    
+    if output_dir is None:
+        X = np.empty((n_samples, len(FEATURES)), dtype=np.float32)
+        y = np.empty(n_samples, dtype=np.float64)
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+        X = np.lib.format.open_memmap(os.path.join(output_dir, X_FILE), mode="w+", dtype=np.float32, shape=(n_samples, len(FEATURES)))
+        y = np.lib.format.open_memmap(os.path.join(output_dir, Y_FILE), mode="w+", dtype=np.float64, shape=(n_samples,))
+    
+    for chunk, chunk_seed in enumerate(seeds):
+        start = chunk * chunk_size
+        stop = min(start + chunk_size, n_samples)
+        generate_chunk(np.random.default_rng(chunk_seed), stop - start, X[start:stop], y[start:stop])
+    
+    if output_dir is None:
+        return X, y
+    X.flush()
+    y.flush()
+    del X, y
+    return load_training_data(output_dir)
+
+def load_training_data(data_dir: str):
+    """Memory-map previously generated X.npy/y.npy read-only"""
+    return (
+        np.load(os.path.join(data_dir, X_FILE), mmap_mode="r"),
+        np.load(os.path.join(data_dir, Y_FILE), mmap_mode="r")
+    )
\ No newline at end of file
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Pain at or above this counts as severe (the old sigmoid was centred here)
+SEVERE_PAIN_THRESHOLD = 6.5
+# Floor on the tree spread used to scale residuals, so unanimous trees still get an interval
+MIN_SPREAD = 0.25
+# Quantiles of the residual distribution kept with a calibration
+CALIBRATION_POINTS = 201
+
+def tree_spread(tree_predictions: np.ndarray):
+    """(mean, std) of a (rows x trees) prediction matrix, one pass over it"""
+    mean = tree_predictions.mean(axis=1)
+    std = np.sqrt(np.maximum((tree_predictions * tree_predictions).mean(axis=1) - mean * mean, 0))
+    return mean, std
+
+class ConformalCalibration:
+    """Split-conformal calibration of forest uncertainty on held-out rows.
+    
+    Residuals ``(actual - mean) / max(std, MIN_SPREAD)`` are computed on
+    rows the forest wasn't trained on, and a fixed grid of their quantiles
+    is stored. At prediction time the same normalised residual distribution
+    is scaled by each row's own tree spread, which gives intervals with the
+    requested coverage and a calibrated probability of severe pain.
+    """
+    
+    def __init__(self, residual_quantiles, n_samples: int):
+        self.residual_quantiles = np.asarray(residual_quantiles, dtype=np.float64)
+        self.levels = np.linspace(0, 1, len(self.residual_quantiles))
+        self.n_samples = n_samples
+    
+    @classmethod
+    def fit(cls, tree_predictions: np.ndarray, actual: np.ndarray) -> "ConformalCalibration":
+        mean, std = tree_spread(tree_predictions)
+        residuals = (np.asarray(actual, dtype=np.float64) - mean) / np.maximum(std, MIN_SPREAD)
+        return cls(np.quantile(residuals, np.linspace(0, 1, CALIBRATION_POINTS)), len(residuals))
+    
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data["residual_quantiles"], data["n_samples"])
+    
+    def to_dict(self) -> dict:
+        return {
+            "method": "normalized_split_conformal",
+            "residual_quantiles": [round(float(value), 6) for value in self.residual_quantiles],
+            "n_samples": int(self.n_samples)
+        }
+    
+    def interval(self, mean, spread, coverage: float):
+        """Lower and upper bounds that contain the actual score with probability ``coverage``"""
+        # Finite-sample correction: widen each tail level by 1/(n+1)
+        tail = (1 - coverage) / 2
+        adjust = 1 / (self.n_samples + 1)
+        low_level, high_level = max(tail - adjust, 0.0), min(1 - tail + adjust, 1.0)
+        low, high = np.interp([low_level, high_level], self.levels, self.residual_quantiles)
+        scale = np.maximum(spread, MIN_SPREAD)
+        return mean + low * scale, mean + high * scale
+    
+    def exceedance(self, mean, spread, threshold: float):
+        """Probability that the actual score is at or above ``threshold``"""
+        z = (threshold - mean) / np.maximum(spread, MIN_SPREAD)
+        return 1 - np.interp(z, self.residual_quantiles, self.levels, left=0.0, right=1.0)
+
+def summarize_trees(tree_predictions: np.ndarray, calibration: ConformalCalibration = None, coverage: float = 0.8,
+                    threshold: float = SEVERE_PAIN_THRESHOLD):
+    """Point estimate, interval and severe probability per row of a (rows x trees) matrix.
+    
+    Without a calibration the interval is the central ``coverage`` range of
+    the tree predictions and the probability is the share of trees at or
+    above ``threshold``; both reflect only the forest's disagreement.
+    """
+    mean, std = tree_spread(tree_predictions)
+    if calibration is not None:
+        lower, upper = calibration.interval(mean, std, coverage)
+        severe = calibration.exceedance(mean, std, threshold)
+    else:
+        tail = (1 - coverage) / 2
+        lower, upper = np.quantile(tree_predictions, [tail, 1 - tail], axis=1)
+        severe = (tree_predictions >= threshold).mean(axis=1)
+    return mean, lower, upper, severe
\ No newline at end of file
@@ -0,0 +1,67 @@
+from .database import UserModel
+from .utils.cache import LRUCacheBackend
+from .config import settings
+
+# Cached for users without a fitted model too, so they don't hit the database every time
+NO_MODEL = {"personal_bias": 0.0, "personal_slope": 1.0, "personal_version": None}
+
+class UserModelStore:
+    """Per-user correction parameters in a bounded LRU, loaded from user_models on a miss.
+    
+    Memory is capped by ``max_size`` entries of three scalars each, however
+    many users have a fitted model.
+    """
+    
+    def __init__(self, backend=None):
+        self.backend = backend or LRUCacheBackend(
+            max_size=settings.USER_MODEL_CACHE_SIZE,
+            ttl_seconds=settings.USER_MODEL_CACHE_TTL_SECONDS
+        )
+        self.hits = 0
+        self.misses = 0
+    
+    async def get(self, user_id: str, db, fitted_at=None) -> dict:
+        """Context fields for a user's correction (async session).
+        
+        ``fitted_at`` is the model's current fit time as read by the caller;
+        parameters cached for another fit (e.g. before a refit that ran in
+        another process) are not served.
+        """
+        params = self._get_cached(user_id, fitted_at)
+        if params is None:
+            params = self._store(user_id, await db.get(UserModel, user_id), fitted_at)
+        return params
+    
+    def get_sync(self, user_id: str, db) -> dict:
+        """Context fields for a user's correction (sync session, batch jobs)"""
+        params = self._get_cached(user_id)
+        if params is None:
+            params = self._store(user_id, db.get(UserModel, user_id))
+        return params
+    
+    def invalidate(self, user_id: str = None):
+        """Forget one user's parameters, or everyone's after a refit"""
+        if user_id is None:
+            self.backend.clear()
+        else:
+            self.backend.delete_user(user_id)
+    
+    def _get_cached(self, user_id: str, fitted_at=None):
+        params = self.backend.get((user_id, "personal", fitted_at))
+        if params is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return params
+    
+    def _store(self, user_id: str, row, fitted_at=None) -> dict:
+        params = NO_MODEL if row is None else {
+            "personal_bias": row.bias,
+            "personal_slope": row.slope,
+            "personal_version": row.base_version
+        }
+        self.backend.set((user_id, "personal", fitted_at), params)
+        return params
+
+# Global instance
+user_models = UserModelStore()
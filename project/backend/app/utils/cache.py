@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from ..config import settings
+
+class LRUCacheBackend:
+    """In-process LRU store with a size bound and per-entry TTL.
+    
+    Keys are ``(user_id, ...)`` tuples so all entries of one user can be
+    dropped at once. Any object with the same ``get``/``set``/``delete_user``/
+    ``clear``/``__len__`` interface can be plugged into ``PredictionCache``.
+    """
+    
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key):
+        """Return the cached value or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._user_keys.setdefault(key[0], set()).add(key)
+            
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def delete_user(self, user_id: str) -> int:
+        """Drop every entry belonging to a user and return how many were removed"""
+        with self._lock:
+            keys = self._user_keys.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        user_keys = self._user_keys.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_keys[key[0]]
+
+class PredictionCache:
+    """Cache for user contexts and predictions with write-through invalidation"""
+    
+    def __init__(self, backend=None):
+        self.backend = backend or LRUCacheBackend(
+            max_size=settings.CACHE_MAX_SIZE,
+            ttl_seconds=settings.CACHE_TTL_SECONDS
+        )
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get_context(self, user_id: str, version=None):
+        """Cached context built from the user's data as of ``version``.
+        
+        Keying on a version read from the database lets a write made by
+        another worker process (whose invalidation only reaches its own
+        backend) turn this worker's entry into a miss.
+        """
+        return self._get((user_id, "context", version))
+    
+    def set_context(self, user_id: str, context: dict, version=None):
+        self.backend.set((user_id, "context", version), context)
+    
+    def get_predictions(self, user_id: str, context: dict, days: int, model_version: str):
+        return self._get(self._predictions_key(user_id, context, days, model_version))
+    
+    def set_predictions(self, user_id: str, context: dict, days: int, model_version: str, predictions: list):
+        self.backend.set(self._predictions_key(user_id, context, days, model_version), predictions)
+    
+    def invalidate_user(self, user_id: str):
+        """Evict all cached entries for a user after their data changed"""
+        self.invalidations += self.backend.delete_user(user_id)
+    
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "expirations": getattr(self.backend, "expirations", 0),
+            "invalidations": self.invalidations,
+            "size": len(self.backend)
+        }
+    
+    def _get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def _predictions_key(self, user_id, context, days, model_version):
+        return (user_id, "predictions", context_fingerprint(context), days, model_version)
+
+def context_fingerprint(context: dict) -> str:
+    """Stable short hash of a user context"""
+    payload = json.dumps(context, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+# Global instance
+prediction_cache = PredictionCache()
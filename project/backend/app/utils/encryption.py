@@ -1,20 +1,131 @@
 from cryptography.fernet import Fernet
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import base64
-import os
+import binascii
+import hashlib
+import threading
+from ..config import settings, DEFAULT_ENCRYPTION_KEY
+
+# Encrypted values are stored as "enc:v<key version>:<Fernet token>"; anything else is legacy plaintext
+ENCRYPTED_PREFIX = "enc:v"
+# Smallest batch worth handing to another thread
+MIN_CHUNK_SIZE = 64
+
+def _fernet_key(key: str) -> bytes:
+    """Use a Fernet key as is and derive one from any other secret string"""
+    try:
+        if len(base64.urlsafe_b64decode(key.encode())) == 32:
+            return key.encode()
+    except (binascii.Error, ValueError):
+        pass
+    return base64.urlsafe_b64encode(hashlib.sha256(key.encode()).digest())
+
+def parse_keys(spec: str) -> dict:
+    """{version: key} from "version:key,version:key" """
+    keys = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        version, key = item.split(":", 1)
+        keys[int(version)] = key
+    return keys
+
+def key_version(value):
+    """Key version an encrypted value is tagged with, or None for plaintext"""
+    if value is None or not value.startswith(ENCRYPTED_PREFIX):
+        return None
+    version, separator, _ = value[len(ENCRYPTED_PREFIX):].partition(":")
+    if not separator or not version.isdigit():
+        # Starts like a tag but isn't one, e.g. a legacy plaintext note
+        return None
+    return int(version)
 
 class DataEncryptor:
-    def __init__(self, key: str = None):
-        if key:
-            self.key = base64.urlsafe_b64encode(key.encode()[:32].ljust(32, b'\0'))
-        else:
-            self.key = Fernet.generate_key()
-        self.fernet = Fernet(self.key)
-    
-    def encrypt(self, data: str) -> str:
-        return self.fernet.encrypt(data.encode()).decode()
-    
-    def decrypt(self, encrypted_data: str) -> str:
-        return self.fernet.decrypt(encrypted_data.encode()).decode()
+    """Field-level Fernet encryption, tagged with the version of the key used.
+    
+    New values are encrypted with the current key. Values tagged with an
+    older version are decrypted with that key until the rotation job
+    re-encrypts them, and untagged values (written before encryption was
+    enabled) are returned unchanged. Batches are split across a thread pool.
+    ``uses_default_key`` flags a current key anyone can reproduce (the
+    placeholder in config.py); /health reports it as unhealthy.
+    """
+    
+    def __init__(self, keys: dict, current_version: int, threads: int = 1):
+        if current_version not in keys:
+            raise ValueError(f"No key for current version {current_version}")
+        self.uses_default_key = keys[current_version] == DEFAULT_ENCRYPTION_KEY
+        self.current_version = current_version
+        self.current_prefix = f"{ENCRYPTED_PREFIX}{current_version}:"
+        self.threads = max(1, threads)
+        self._fernets = {version: Fernet(_fernet_key(key)) for version, key in keys.items()}
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls, settings):
+        keys = parse_keys(settings.ENCRYPTION_PREVIOUS_KEYS)
+        keys[settings.ENCRYPTION_KEY_VERSION] = settings.ENCRYPTION_KEY
+        return cls(keys, settings.ENCRYPTION_KEY_VERSION, settings.CRYPTO_THREADS)
+    
+    def encrypt(self, data: str):
+        if data is None:
+            return None
+        return self.current_prefix + self._fernets[self.current_version].encrypt(data.encode()).decode()
+    
+    def decrypt(self, value: str):
+        version = key_version(value)
+        if version is None:
+            return value
+        if version not in self._fernets:
+            raise ValueError(f"No key for version {version}; add it to ENCRYPTION_PREVIOUS_KEYS")
+        token = value[value.index(":", len(ENCRYPTED_PREFIX)) + 1:]
+        return self._fernets[version].decrypt(token.encode()).decode()
+    
+    def encrypt_many(self, values: list) -> list:
+        return self._map(self.encrypt, values)
+    
+    def decrypt_many(self, values: list) -> list:
+        if not any(key_version(value) is not None for value in values):
+            return list(values)
+        return self._map(self.decrypt, values)
+    
+    async def encrypt_batch(self, values: list) -> list:
+        """encrypt_many without blocking the event loop"""
+        return await self._map_async(self.encrypt, values)
+    
+    async def decrypt_batch(self, values: list) -> list:
+        """decrypt_many without blocking the event loop"""
+        if not any(key_version(value) is not None for value in values):
+            return list(values)
+        return await self._map_async(self.decrypt, values)
+    
+    @property
+    def pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="crypto")
+            return self._pool
+    
+    def _chunks(self, values: list) -> list:
+        size = max(MIN_CHUNK_SIZE, -(-len(values) // self.threads))
+        return [values[start:start + size] for start in range(0, len(values), size)]
+    
+    def _map(self, function, values: list) -> list:
+        chunks = self._chunks(values)
+        if len(chunks) <= 1:
+            return [function(value) for value in values]
+        results = self.pool.map(lambda chunk: [function(value) for value in chunk], chunks)
+        return [value for chunk in results for value in chunk]
+    
+    async def _map_async(self, function, values: list) -> list:
+        if not values:
+            return []
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, lambda chunk=chunk: [function(value) for value in chunk])
+            for chunk in self._chunks(values)
+        ))
+        return [value for chunk in results for value in chunk]
 
-# Global instance
-encryptor = DataEncryptor()
\ No newline at end of file
+# Global instance (keys come from settings, so every worker reads the same data)
+encryptor = DataEncryptor.from_settings(settings)
\ No newline at end of file
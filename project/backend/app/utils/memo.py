@@ -0,0 +1,27 @@
+class RequestMemo:
+    """Results of queries and model calls already made while serving one request.
+    
+    Endpoints that compose several features (context, forecast, history) pass
+    the same memo down, so each lookup runs at most once per request.
+    """
+    
+    def __init__(self):
+        self._results = {}
+    
+    async def get_or_compute(self, key, compute):
+        """Return the memoized value for ``key``, awaiting ``compute()`` the first time"""
+        if key in self._results:
+            return self._results[key]
+        value = await compute()
+        self._results[key] = value
+        return value
+    
+    def get(self, key, default=None):
+        return self._results.get(key, default)
+    
+    def set(self, key, value):
+        self._results[key] = value
+
+def get_request_memo() -> RequestMemo:
+    """FastAPI dependency; FastAPI caches it, so every dependant in a request shares one memo"""
+    return RequestMemo()
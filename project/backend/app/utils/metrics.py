@@ -0,0 +1,249 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from ..config import settings
+
+# Latency buckets in seconds, from sub-millisecond model calls to slow requests
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic count per label combination"""
+    
+    type = "counter"
+    
+    def __init__(self, name: str, help: str, labelnames=(), enabled: bool = True):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.enabled = enabled
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labels, amount: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label combination"""
+    
+    type = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS, enabled: bool = True):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *labels):
+        if not self.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+    
+    def samples(self):
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, f'le="{_format_value(float(bound))}"'), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), cumulative
+
+class CallbackMetric:
+    """Gauge or counter whose values are read from ``collect()`` at scrape time.
+    
+    ``collect`` returns a number, or a dict mapping label-value tuples to numbers.
+    """
+    
+    def __init__(self, name: str, help: str, collect, labelnames=(), type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.labelnames = tuple(labelnames)
+        self.type = type
+    
+    def samples(self):
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            if value is not None:
+                yield self.name, _format_labels(self.labelnames, labels), value
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text exposition format.
+    
+    Recording is a dict lookup and a few additions under a per-metric lock,
+    cheap enough to leave on; with ``enabled=False`` every metric is a no-op.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics = {}
+    
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, help, labelnames, enabled=self.enabled))
+    
+    def histogram(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets, enabled=self.enabled))
+    
+    def callback(self, name: str, help: str, collect, labelnames=(), type: str = "gauge") -> CallbackMetric:
+        """Expose a value that already lives elsewhere (cache stats, queue depth)"""
+        return self._register(CallbackMetric(name, help, collect, labelnames, type))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+    
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+# Global instance
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template", ("method", "route")
+)
+HTTP_RESPONSES = metrics.counter(
+    "http_responses_total", "Responses sent, by route template and status code", ("method", "route", "status")
+)
+HTTP_REQUEST_QUERIES = metrics.histogram(
+    "http_request_db_queries", "Database queries issued while serving one request", ("method", "route"), COUNT_BUCKETS
+)
+DB_QUERY_SECONDS = metrics.histogram(
+    "db_query_duration_seconds", "Time spent executing database statements", ("engine", "statement")
+)
+MODEL_INFERENCE_SECONDS = metrics.histogram(
+    "model_inference_duration_seconds", "Time spent scoring feature rows with the population model"
+)
+MODEL_BATCH_ROWS = metrics.histogram(
+    "model_batch_rows", "Feature rows scored per model call", buckets=SIZE_BUCKETS
+)
+RECOMMENDER_SECONDS = metrics.histogram(
+    "recommender_duration_seconds", "Time spent ranking relief actions per recommender call"
+)
+RECOMMENDER_BATCH_SIZE = metrics.histogram(
+    "recommender_batch_size", "Requests ranked per recommender call", buckets=SIZE_BUCKETS
+)
+SINGLEFLIGHT_CALLS = metrics.counter(
+    "singleflight_calls_total", "Calls to coalesced computations, by flight and whether they ran it or joined one", ("flight", "result")
+)
+
+# [query count] for the request being served, shared with SQLAlchemy event hooks
+_request_queries = ContextVar("request_queries", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+def _make_after_cursor_execute(engine_name: str):
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+        DB_QUERY_SECONDS.observe(elapsed, engine_name, statement.lstrip().split(None, 1)[0].upper())
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+    return _after_cursor_execute
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_times"):
+        connection.info["query_start_times"].pop()
+
+def instrument_engine(engine, engine_name: str):
+    """Time every statement on a (sync) engine and count it against the current request"""
+    from sqlalchemy import event
+    
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _make_after_cursor_execute(engine_name))
+    event.listen(engine, "handle_error", _handle_error)
+
+def _route_label(scope) -> str:
+    """Template of the matched route, e.g. ``/api/v1/pain/{user_id}``"""
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    # Some FastAPI versions report the template without the include_router prefix
+    path = scope["path"]
+    missing_segments = path.count("/") - template.count("/")
+    if missing_segments > 0:
+        template = "/".join(path.split("/")[:missing_segments + 1]) + template
+    return template
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and query count per route template.
+    
+    Routes are labelled by their template (``/api/v1/pain/{user_id}``), so
+    label cardinality stays bounded; unmatched paths share one label.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = [500]
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+        
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_queries.reset(token)
+            route = _route_label(scope)
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(elapsed, method, route)
+            HTTP_REQUEST_QUERIES.observe(queries[0], method, route)
+            HTTP_RESPONSES.inc(method, route, str(status[0]))
\ No newline at end of file
@@ -0,0 +1,35 @@
+import base64
+from datetime import datetime
+from sqlalchemy import select, tuple_
+
+def encode_cursor(date: datetime, entry_id: str) -> str:
+    """Opaque cursor pointing just past (date, id) in a newest-first listing"""
+    raw = f"{date.isoformat()}|{entry_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_part, entry_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(date_part), entry_id
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def keyset_page_query(model, user_id: str, limit: int, cursor: str = None):
+    """Newest-first page of a user's entries, seeking past the cursor by (date, id).
+
+    Fetches one extra row so callers can tell whether another page exists.
+    """
+    query = select(model).where(model.user_id == user_id)
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.date, model.id) < tuple_(cursor_date, cursor_id))
+    return query.order_by(model.date.desc(), model.id.desc()).limit(limit + 1)
+
+def split_page(entries, limit: int):
+    """Trim the look-ahead row and return (entries, next_cursor)"""
+    if len(entries) <= limit:
+        return entries, None
+    entries = entries[:limit]
+    return entries, encode_cursor(entries[-1].date, entries[-1].id)
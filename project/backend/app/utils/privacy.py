@@ -1,7 +1,27 @@
+from functools import lru_cache, partial
 import hashlib
+import hmac
+import json
 
-def anonymize_user_id(user_id: str) -> str:
-    return hashlib.sha256(user_id.encode()).hexdigest()
+def anonymize_user_id(user_id: str, key: str = None) -> str:
+    """SHA-256 of the user id, keyed with HMAC when ``key`` is given"""
+    if key is None:
+        return hashlib.sha256(user_id.encode()).hexdigest()
+    return hmac.new(key.encode(), user_id.encode(), hashlib.sha256).hexdigest()
+
+def keyed_anonymizer(key: str, cache_size: int = 100_000):
+    """anonymize_user_id bound to ``key`` and memoized, so each user is hashed once"""
+    return lru_cache(maxsize=cache_size)(partial(anonymize_user_id, key=key))
+
+def parse_consent_flags(raw) -> dict:
+    """The users.consent_flags JSON as a dict; missing or malformed flags grant nothing"""
+    if not raw:
+        return {}
+    try:
+        flags = json.loads(raw)
+    except (TypeError, ValueError):
+        return {}
+    return flags if isinstance(flags, dict) else {}
 
 def should_retain_data(consent_flags: dict) -> bool:
     return consent_flags.get('analytics', False)
\ No newline at end of file
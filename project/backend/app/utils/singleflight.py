@@ -0,0 +1,49 @@
+import asyncio
+from .metrics import SINGLEFLIGHT_CALLS
+
+class SingleFlight:
+    """Coalesce concurrent async computations of the same key.
+    
+    The first caller for a key (the leader) runs the computation; callers
+    that arrive while it is in flight await the leader's result (or
+    exception) instead of repeating the work. Nothing is kept once the
+    flight lands, so this only deduplicates concurrent work, not later calls.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._flights = {}
+    
+    def __len__(self):
+        return len(self._flights)
+    
+    async def do(self, key, compute):
+        """Return ``await compute()``, sharing one in-flight call per key"""
+        while key in self._flights:
+            flight = self._flights[key]
+            SINGLEFLIGHT_CALLS.inc(self.name, "coalesced")
+            try:
+                # Shielded so a follower giving up doesn't cancel the leader's work
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The leader was cancelled (e.g. its client went away); take over
+        
+        SINGLEFLIGHT_CALLS.inc(self.name, "leader")
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even if nobody was waiting on it
+        flight.add_done_callback(lambda done: done.cancelled() or done.exception())
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
\ No newline at end of file
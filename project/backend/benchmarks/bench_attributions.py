@@ -0,0 +1,69 @@
+"""Compare forest attributions (and the drivers built from them) against plain prediction.
+
+For each batch size this times the compiled forest's prediction alone, the
+same tree walk with per-feature contributions added, and the full driver
+step of the old threshold rules and of the attribution-based drivers. It
+checks that root value plus contributions reproduces every prediction and
+exits non-zero if explaining costs more than --max-ratio times predicting.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_attributions --repeats 200 --batch-sizes 7 448 7000
+"""
+import argparse
+import time
+import numpy as np
+from app.ml.predictor import predictor
+from app.ml.training_data import generate_training_data
+
+def _p50_us(fn, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return round(float(np.percentile(timings, 50)) * 1e6, 1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[7, 448, 7000])
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="Fail if attributions cost more than this times prediction")
+    args = parser.parse_args(argv)
+    
+    predictor.load()
+    compiled = predictor.compiled_model
+    if compiled is None:
+        raise SystemExit("Compiled forest unavailable: parity check against sklearn failed")
+    
+    worst = 0.0
+    for batch_size in args.batch_sizes:
+        X, _ = generate_training_data(batch_size, seed=batch_size)
+        X = X.astype(float)
+        
+        leaves = compiled.leaves(X)
+        contributions = compiled.contributions(leaves)
+        max_error = float(np.abs(compiled.bias + contributions.sum(axis=1) - compiled.predict(X)).max())
+        assert max_error < 1e-9, f"contributions don't add up to the prediction (off by {max_error})"
+        
+        def explain():
+            leaves = compiled.leaves(X)
+            return compiled.value[leaves], compiled.contributions(leaves)
+        
+        predict_us = _p50_us(lambda: compiled.predict_trees(X), args.repeats)
+        explain_us = _p50_us(explain, args.repeats)
+        rules_us = _p50_us(lambda: predictor._rule_drivers(X), args.repeats)
+        drivers_us = _p50_us(lambda: predictor._get_drivers(X, compiled.contributions(compiled.leaves(X))), args.repeats)
+        ratio = explain_us / predict_us
+        worst = max(worst, ratio)
+        print(
+            f"batch={batch_size:<5} predict p50={predict_us}us | predict+contributions p50={explain_us}us "
+            f"({ratio:.2f}x) | rule drivers p50={rules_us}us | attribution drivers p50={drivers_us}us | "
+            f"max_additivity_error={max_error:.2e}"
+        )
+    
+    if worst > args.max_ratio:
+        raise SystemExit(f"Attributions cost {worst:.2f}x prediction (limit {args.max_ratio}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure API throughput as the number of concurrent clients grows.
+
+Requests are driven in-process through the ASGI app against a throwaway
+SQLite database, so the numbers isolate the server's data path. With the
+async session, throughput should keep rising with concurrency instead of
+flatlining at the single-client rate.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_concurrency --requests 400 --concurrency 1 4 16 64
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+def _seed(users, entries_per_user):
+    from app.database import SessionLocal, PainEntry
+    db = SessionLocal()
+    try:
+        for user_index in range(users):
+            for entry_index in range(entries_per_user):
+                db.add(PainEntry(user_id=f"bench-{user_index}", pain_score=entry_index % 10, productivity_impact=3))
+        db.commit()
+    finally:
+        db.close()
+
+async def _run_level(client, path_for, total_requests, concurrency):
+    counter = iter(range(total_requests))
+    
+    async def worker():
+        for request_index in counter:
+            response = await client.get(path_for(request_index))
+            response.raise_for_status()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total_requests / (time.perf_counter() - start)
+
+async def _main(args):
+    import httpx
+    from app.main import app
+    
+    users = args.users
+    paths = {
+        "history": lambda i: f"/api/v1/pain/bench-{i % users}",
+        "predictions": lambda i: f"/api/v1/predictions?user_id=bench-{i % users}&days=7"
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in args.endpoints:
+            # Warm up (model load, connection pool) before timing
+            await _run_level(client, paths[name], args.users, 1)
+            for concurrency in args.concurrency:
+                throughput = await _run_level(client, paths[name], args.requests, concurrency)
+                print(f"{name:<12} concurrency={concurrency:<4} throughput={throughput:8.1f} req/s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=60, help="Pain entries per user")
+    parser.add_argument("--endpoints", nargs="+", default=["history", "predictions"], choices=["history", "predictions"])
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Must be set before the app (and its engines) are imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        _seed(args.users, args.entries)
+        asyncio.run(_main(args))
+
+if __name__ == "__main__":
+    main()
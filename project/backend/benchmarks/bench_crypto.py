@@ -0,0 +1,76 @@
+"""Measure note encryption/decryption throughput, serially and across the crypto thread pool.
+
+For each thread count, encrypts and decrypts a batch of synthetic notes with
+DataEncryptor.encrypt_many/decrypt_many and reports values per second and per
+core used (threads capped at the CPU count). It also times decrypting one
+1000-row history page with decrypt_batch, as the history endpoint does.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_crypto --values 20000 --threads 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import time
+import numpy as np
+from app.utils.encryption import DataEncryptor
+from .report import environment, write_results
+
+WORDS = ("cramps", "bloating", "headache", "slept", "badly", "after", "coffee", "walk", "helped", "heat", "pad", "tired")
+
+def _notes(count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(WORDS, rng.integers(3, 25))) for _ in range(count)]
+
+def _rate(call, values) -> float:
+    start = time.perf_counter()
+    call(values)
+    return len(values) / (time.perf_counter() - start)
+
+async def _page_ms(encryptor, page) -> float:
+    start = time.perf_counter()
+    await encryptor.decrypt_batch(page)
+    return (time.perf_counter() - start) * 1e3
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    
+    notes = _notes(args.values)
+    cpus = os.cpu_count() or 1
+    results = {}
+    for threads in args.threads:
+        encryptor = DataEncryptor({1: "benchmark-key"}, 1, threads)
+        encrypt_rate = _rate(encryptor.encrypt_many, notes)
+        encrypted = encryptor.encrypt_many(notes)
+        decrypt_rate = _rate(encryptor.decrypt_many, encrypted)
+        assert encryptor.decrypt_many(encrypted[:100]) == notes[:100]
+        
+        page = encrypted[:args.page_size]
+        page_ms = asyncio.run(_page_ms(encryptor, page))
+        
+        cores = min(threads, cpus)
+        results[str(threads)] = {
+            "encrypt_per_s": round(encrypt_rate),
+            "decrypt_per_s": round(decrypt_rate),
+            "encrypt_per_core_per_s": round(encrypt_rate / cores),
+            "decrypt_per_core_per_s": round(decrypt_rate / cores),
+            "page_decrypt_ms": round(page_ms, 2)
+        }
+        print(
+            f"threads={threads:<3} encrypt {encrypt_rate:10,.0f}/s ({encrypt_rate / cores:9,.0f}/s per core) | "
+            f"decrypt {decrypt_rate:10,.0f}/s ({decrypt_rate / cores:9,.0f}/s per core) | "
+            f"{len(page)}-row page {page_ms:6.1f}ms"
+        )
+        encryptor.pool.shutdown()
+    
+    if args.output:
+        write_results({"environment": environment(), "crypto": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Stream a large pain history through the export endpoint under an RSS ceiling.
+
+Seeds one user with N pain entries in a throwaway SQLite database, then
+consumes GET /api/v1/export/{user_id} through the ASGI app while sampling
+resident memory. Fails if RSS grows by more than the ceiling, which would
+mean the export is buffering rows instead of streaming them.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_export --rows 1000000 --max-rss-growth-mb 64
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def _seed(path, rows):
+    start = datetime(2020, 1, 1)
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        "INSERT INTO pain_entries (id, user_id, date, pain_score, pain_type, productivity_impact, notes) "
+        "VALUES (?, 'export-user', ?, ?, 'cramps', ?, NULL)",
+        (
+            (str(uuid.uuid4()), (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S.%f"), i % 11, i % 8)
+            for i in range(rows)
+        )
+    )
+    connection.commit()
+    connection.close()
+
+async def _export(export_format):
+    """Drive the ASGI app directly so the client side never buffers the body"""
+    from app.main import app
+    
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/export/export-user",
+        "raw_path": b"/api/v1/export/export-user",
+        "query_string": f"format={export_format}".encode(),
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80)
+    }
+    state = {"lines": 0, "peak": _rss_mb(), "status": None}
+    baseline = state["peak"]
+    
+    request_sent = asyncio.Event()
+    response_done = asyncio.Event()
+    
+    async def receive():
+        # Deliver the (empty) request once, then block until the response ends
+        if not request_sent.is_set():
+            request_sent.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            state["lines"] += message.get("body", b"").count(b"\n")
+            state["peak"] = max(state["peak"], _rss_mb())
+            if not message.get("more_body", False):
+                response_done.set()
+    
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    if state["status"] != 200:
+        raise SystemExit(f"export failed with status {state['status']}")
+    return state["lines"], time.perf_counter() - start, baseline, state["peak"]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=64)
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "export.db")
+        # Must be set before the app (and its engines) are imported; mmap is
+        # disabled so mapped file pages don't count as process memory
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+        os.environ["SQLITE_MMAP_SIZE"] = "0"
+        import app.database  # creates the schema
+        _seed(path, args.rows)
+        
+        lines, elapsed, baseline, peak = asyncio.run(_export(args.format))
+    
+    growth = peak - baseline
+    print(
+        f"exported {lines} lines in {elapsed:.1f}s ({lines / elapsed:,.0f} rows/s), "
+        f"RSS baseline={baseline:.0f}MB peak={peak:.0f}MB growth={growth:.1f}MB (ceiling {args.max_rss_growth_mb:.0f}MB)"
+    )
+    return 1 if growth > args.max_rss_growth_mb else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Compare the compiled forest evaluator against sklearn's predict.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_forest --repeats 2000
+"""
+import argparse
+import time
+import numpy as np
+from app.ml.predictor import predictor
+
+def _latency(fn, X, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings[i] = time.perf_counter() - start
+    return {
+        "p50_us": round(float(np.percentile(timings, 50)) * 1e6, 1),
+        "p99_us": round(float(np.percentile(timings, 99)) * 1e6, 1)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 14, 1000])
+    args = parser.parse_args(argv)
+    
+    predictor.load()
+    compiled = predictor.compiled_model
+    if compiled is None:
+        raise SystemExit("Compiled forest unavailable: parity check against sklearn failed")
+    
+    rng = np.random.default_rng(42)
+    for batch_size in args.batch_sizes:
+        X = np.column_stack([
+            rng.integers(1, 29, batch_size),
+            rng.integers(0, 29, batch_size),
+            rng.uniform(0, 10, batch_size),
+            rng.uniform(4, 10, batch_size),
+            rng.uniform(0, 10, batch_size),
+            rng.uniform(0, 120, batch_size)
+        ]).astype(float)
+        
+        max_error = float(np.abs(compiled.predict(X) - predictor.model.predict(X)).max())
+        assert max_error < 1e-9, f"compiled forest diverges from sklearn by {max_error}"
+        
+        sklearn_stats = _latency(predictor.model.predict, X, args.repeats)
+        compiled_stats = _latency(compiled.predict, X, args.repeats)
+        print(
+            f"batch={batch_size:<5} sklearn p50={sklearn_stats['p50_us']}us p99={sklearn_stats['p99_us']}us | "
+            f"compiled p50={compiled_stats['p50_us']}us p99={compiled_stats['p99_us']}us | "
+            f"max_abs_error={max_error:.2e}"
+        )
+
+if __name__ == "__main__":
+    main()
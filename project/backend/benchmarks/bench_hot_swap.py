@@ -0,0 +1,83 @@
+"""Measure prediction latency while new model versions are published and hot-swapped.
+
+Copies the bootstrap model into a temporary registry and predicts in a
+tight loop on the main thread. A background thread keeps publishing new
+versions and calling reload_if_changed, as the API's watcher does. Latency
+percentiles are reported for a quiet phase and for the swap phase; every
+prediction must come from a single consistent model version.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_hot_swap --swaps 5
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+from app.ml.predictor import PainPredictor, DEFAULT_MODEL_PATH
+
+CONTEXT = {
+    "historical_avg_pain": 5.5,
+    "current_cycle_day": 3,
+    "days_to_next_period": 26,
+    "avg_sleep": 6.5,
+    "avg_stress": 6.0,
+    "avg_exercise": 20.0
+}
+
+def _time_predictions(predictor, duration, versions):
+    timings = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        predictor.predict_for_user(CONTEXT, 7)
+        timings.append(time.perf_counter() - start)
+        versions.add(predictor.model_version)
+    return np.array(timings)
+
+def _summary(timings):
+    return (
+        f"p50={np.percentile(timings, 50) * 1e6:.0f}us p99={np.percentile(timings, 99) * 1e6:.0f}us "
+        f"max={timings.max() * 1e3:.1f}ms over {len(timings)} calls"
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--swaps", type=int, default=5)
+    parser.add_argument("--quiet-seconds", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as model_dir:
+        bootstrap = shutil.copy(DEFAULT_MODEL_PATH, model_dir)
+        predictor = PainPredictor(model_path=bootstrap, model_dir=model_dir)
+        predictor.load()
+        model = predictor.model
+        
+        versions = set()
+        quiet = _time_predictions(predictor, args.quiet_seconds, versions)
+        
+        done = threading.Event()
+        swapped = []
+        
+        def publish_and_swap():
+            for swap in range(args.swaps):
+                predictor.registry.publish(model, {"version": f"bench.{swap}"})
+                if predictor.reload_if_changed():
+                    swapped.append(predictor.model_version)
+            done.set()
+        
+        publisher = threading.Thread(target=publish_and_swap)
+        publisher.start()
+        timings = []
+        while not done.is_set():
+            timings.append(_time_predictions(predictor, 0.05, versions))
+        publisher.join()
+    
+    print(f"quiet: {_summary(quiet)}")
+    print(f"swapping ({len(swapped)} swaps): {_summary(np.concatenate(timings))}")
+    print(f"versions served: {sorted(versions)}")
+
+if __name__ == "__main__":
+    main()
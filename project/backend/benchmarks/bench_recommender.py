@@ -0,0 +1,80 @@
+"""Measure recommendation latency for the shipped catalog and larger synthetic ones.
+
+For each catalog size this times single-request ranking (get_recommendations)
+and batched ranking (recommend_many). A fraction of users carry
+contraindication flags, so the mask path is exercised too.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_recommender --catalog-sizes 6 100 500 --users 10000
+"""
+import argparse
+import time
+import numpy as np
+from app.ml.catalog import ActionCatalog
+from app.ml.recommender import ReliefRecommender
+
+CONTRAINDICATIONS = ["skin_sensitivity", "acute_pain", "pregnancy", "low_blood_pressure"]
+
+def synthetic_catalog(size: int, rng) -> ActionCatalog:
+    """The shipped catalog padded with generated actions up to ``size``"""
+    base = ActionCatalog.from_file()
+    actions = [{**payload, "explanation": base.explanations[i][0]} for i, payload in enumerate(base.payloads)]
+    for i in range(len(actions), size):
+        actions.append({
+            "name": f"action_{i}",
+            "type": f"type_{i % 20}",
+            "description": f"Generated action {i}",
+            "evidence_level": "low",
+            "effectiveness": float(rng.uniform(0.1, 0.4)),
+            "contraindications": list(rng.choice(CONTRAINDICATIONS, rng.integers(0, 2), replace=False)),
+            "severe_pain_multiplier": float(rng.uniform(0.7, 1.3)),
+            "mild_pain_multiplier": float(rng.uniform(0.7, 1.3))
+        })
+    return ActionCatalog(actions[:size])
+
+def _percentiles(timings) -> str:
+    return f"p50={np.percentile(timings, 50) * 1e6:.1f}us p99={np.percentile(timings, 99) * 1e6:.1f}us"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=[6, 100, 500])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    
+    rng = np.random.default_rng(args.seed)
+    requests = [
+        (
+            f"user-{i}",
+            {"predicted_pain": float(rng.uniform(0, 10))},
+            {"acute_pain": True} if rng.random() < 0.2 else {}
+        )
+        for i in range(args.users)
+    ]
+    
+    for size in args.catalog_sizes:
+        recommender = ReliefRecommender(seed=args.seed, catalog=synthetic_catalog(size, rng))
+        # Give a third of the users some feedback history
+        for user_id, _, _ in requests[::3]:
+            recommender.record_feedback(user_id, recommender.catalog.names[int(rng.integers(size))], float(rng.random()))
+        
+        timings = np.empty(len(requests))
+        for i, (user_id, prediction, user_context) in enumerate(requests):
+            start = time.perf_counter()
+            recommender.get_recommendations(user_id, prediction, user_context)
+            timings[i] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for offset in range(0, len(requests), args.batch_size):
+            recommender.recommend_many(requests[offset:offset + args.batch_size])
+        batched = (time.perf_counter() - start) / len(requests)
+        
+        print(
+            f"{size} actions: single {_percentiles(timings)}, "
+            f"batched({args.batch_size}) {batched * 1e6:.1f}us/user"
+        )
+
+if __name__ == "__main__":
+    main()
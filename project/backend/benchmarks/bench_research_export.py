@@ -0,0 +1,127 @@
+"""Measure research export throughput and memory across worker process counts.
+
+Populates a throwaway SQLite database with synthetic users (a fraction of
+them with analytics consent withdrawn), then runs export_research_data once
+per worker count through ``python -m app.cli export-research`` and reports
+rows/s and the peak RSS of the export process and of its largest worker. It
+also times hashing every exported row's user id with the keyed hash directly
+and through the memoized anonymizer the export uses, which hashes each user
+once.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_research_export --users 2000 --days 365 --workers 1 2 4
+"""
+import argparse
+import os
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from .report import environment, write_results
+
+# Runs the export CLI, then prints the peak RSS (MB) of the export process and of its
+# largest worker. VmHWM is read instead of ru_maxrss because ru_maxrss keeps the
+# peak from before exec, i.e. this (much larger) benchmark process
+PROBE = (
+    "import resource, sys; "
+    "from app.cli import main; "
+    "main(sys.argv[1:]); "
+    "hwm = [line for line in open('/proc/self/status') if line.startswith('VmHWM:')][0]; "
+    "print(int(hwm.split()[1]) / 1024, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)"
+)
+
+def _export(output_dir, workers: int, chunk_size: int, env: dict):
+    """Run the export in a fresh process; returns (manifest, seconds, {process: peak RSS MB})"""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, "export-research", output_dir,
+         "--workers", str(workers), "--chunk-size", str(chunk_size), "--key", "benchmark-key"],
+        env=env, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+    elapsed = time.perf_counter() - start
+    export_mb, worker_mb = map(float, output.splitlines()[-1].split())
+    with open(os.path.join(output_dir, "manifest.json"), encoding="utf-8") as source:
+        manifest = json.load(source)
+    return manifest, elapsed, {"export": export_mb, "worker": worker_mb}
+
+def _hash_rates(user_ids, rows_per_user: int) -> dict:
+    from app.utils.privacy import anonymize_user_id, keyed_anonymizer
+    rows = [user_id for user_id in user_ids for _ in range(rows_per_user)]
+    rates = {}
+    for name, anonymize in (("direct", lambda user_id: anonymize_user_id(user_id, "benchmark-key")),
+                            ("memoized", keyed_anonymizer("benchmark-key"))):
+        start = time.perf_counter()
+        for user_id in rows:
+            anonymize(user_id)
+        rates[name] = len(rows) / (time.perf_counter() - start)
+    return rates
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--revoked", type=float, default=0.1, help="Fraction of users without analytics consent")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=500, help="Users per part file")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Must be set before the app (and its engines) are imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'research.db')}"
+        from app.database import SessionLocal, User
+        from .synthetic import populate
+        
+        db = SessionLocal()
+        try:
+            counts = populate(db, args.users, args.days)
+            user_ids = [row.user_id for row in db.query(User.user_id).order_by(User.user_id)]
+            revoked = user_ids[:int(len(user_ids) * args.revoked)]
+            db.query(User).filter(User.user_id.in_(revoked)).update(
+                {"consent_flags": '{"analytics": false, "personalization": true}'}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+        print(f"Populated {counts['users']} users, {counts['pain_entries']} pain and {counts['lifestyle_entries']} lifestyle entries")
+        
+        # Mapped database pages would otherwise count as export memory
+        env = {**os.environ, "SQLITE_MMAP_SIZE": "0"}
+        for workers in args.workers:
+            output_dir = os.path.join(tmpdir, f"export-{workers}")
+            manifest, elapsed, peak_rss = _export(output_dir, workers, args.chunk_size, env)
+            size_mb = sum(os.path.getsize(os.path.join(output_dir, part["file"])) for part in manifest["parts"]) / 2**20
+            results[str(workers)] = stats = {
+                "rows": manifest["rows"],
+                "users": manifest["users"],
+                "seconds": round(elapsed, 3),
+                "rows_per_s": round(manifest["rows"] / elapsed),
+                "output_mb": round(size_mb, 2),
+                "export_peak_rss_mb": round(peak_rss["export"], 1),
+                "worker_peak_rss_mb": round(peak_rss["worker"], 1)
+            }
+            print(
+                f"workers={workers:<3} {stats['rows']} rows for {stats['users']} users in {elapsed:6.2f}s "
+                f"({stats['rows_per_s']:9,}/s) | {size_mb:6.1f}MB gzip | "
+                f"peak RSS export {peak_rss['export']:6.1f}MB, worker {peak_rss['worker']:6.1f}MB"
+            )
+        
+        rows_per_user = max(1, counts["pain_entries"] // max(1, args.users))
+        rates = _hash_rates(user_ids, rows_per_user)
+        print(
+            f"user id hashing at {rows_per_user} rows per user: direct {rates['direct']:12,.0f} rows/s | "
+            f"memoized {rates['memoized']:12,.0f} rows/s"
+        )
+    
+    if args.output:
+        write_results({
+            "environment": environment(),
+            "export": results,
+            "hash_rows_per_s": {name: round(rate) for name, rate in rates.items()}
+        }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Check that importing app.main stays within a startup-time budget.
+
+Each run imports the app in a fresh interpreter, so the numbers reflect
+what a new uvicorn worker pays before it can accept requests. Exits with
+status 1 when the median import time exceeds the budget or when the
+import trained/loaded the model eagerly.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_startup --budget 2.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = (
+    "import time; start = time.perf_counter(); "
+    "import app.main; "
+    "from app.ml.predictor import predictor; "
+    "print(time.perf_counter() - start, predictor.status)"
+)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=2.0, help="Maximum median import time in seconds")
+    args = parser.parse_args(argv)
+    
+    timings = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Importing the app creates the schema; keep that away from pain_predictor.db
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(tmpdir, 'startup.db')}"}
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True, env=env
+            ).stdout.split()
+            timings.append(float(output[0]))
+            if output[1] != "not_loaded":
+                print(f"FAIL: model was loaded at import time (status={output[1]})")
+                return 1
+    
+    median = statistics.median(timings)
+    print(f"import app.main: median={median:.3f}s min={min(timings):.3f}s max={max(timings):.3f}s budget={args.budget:.3f}s")
+    if median > args.budget:
+        print("FAIL: startup budget exceeded")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Measure synthetic data generation and training time and peak memory at several sizes.
+
+Every size runs in fresh subprocesses (generate-training-data, then
+train-model on the memory-mapped arrays), so each peak-memory figure
+belongs to that step alone. Data goes to a temporary directory that is
+removed afterwards; 50M rows need about 1.6 GB of disk.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_training --rows 1000000 10000000 50000000 --max-samples 1000000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from .report import environment, write_results
+
+SUMMARY = re.compile(r"in ([\d.]+)s, peak memory (\d+) MB")
+
+def _run(*cli_args) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "app.cli", *cli_args], capture_output=True, text=True, check=True
+    ).stdout
+    seconds, peak_mb = SUMMARY.search(output).groups()
+    return {"seconds": float(seconds), "peak_memory_mb": int(peak_mb)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--max-samples", type=int, default=None, help="Bootstrap rows per tree")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    
+    results = {}
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_dir = os.path.join(tmpdir, "data")
+            generate = _run("generate-training-data", data_dir, "--rows", str(rows))
+            train_args = ["train-model", "--data-dir", data_dir, "--output", os.path.join(tmpdir, "model.joblib"), "--jobs", str(args.jobs)]
+            if args.max_samples:
+                train_args += ["--max-samples", str(args.max_samples)]
+            train = _run(*train_args)
+        results[str(rows)] = {"generate": generate, "train": train}
+        print(
+            f"{rows:>11,} rows: generate {generate['seconds']:7.1f}s {generate['peak_memory_mb']:6d} MB | "
+            f"train {train['seconds']:7.1f}s {train['peak_memory_mb']:6d} MB"
+        )
+    
+    if args.output:
+        write_results({"environment": environment(), "training": results}, args.output)
+
+if __name__ == "__main__":
+    main()
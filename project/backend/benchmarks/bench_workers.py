@@ -0,0 +1,116 @@
+"""Measure per-worker memory with 1 vs N worker processes holding the model.
+
+Trains a synthetic forest larger than the bootstrap one (so the model
+dominates a worker's footprint) and saves it with its compiled forest. Then,
+for memory-mapped loading (MODEL_MMAP=true) and for unpickling the sklearn
+model (MODEL_MMAP=false), starts each number of workers at once; every
+worker imports app.main and serves one prediction, as a uvicorn/gunicorn
+worker would. While all of them are alive, RSS and PSS are read from
+/proc/<pid>/smaps_rollup. RSS counts shared pages in full in every process;
+PSS splits them between the processes sharing them, so PSS is what a worker
+really adds. Linux only.
+
+Run from project/backend:
+
+    python -m benchmarks.bench_workers --workers 1 8 --trees 100 --depth 12
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from .report import environment, write_results
+
+PROBE = (
+    "import sys, time; "
+    "import app.main; "
+    "from app.ml.predictor import predictor; "
+    "start = time.perf_counter(); "
+    "predictor.predict_for_user({}, 7); "
+    "print(time.perf_counter() - start, flush=True); "
+    "sys.stdin.readline()"
+)
+
+def _smaps_rollup_mb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {"rss_mb": values["Rss"], "pss_mb": values["Pss"], "pss_anon_mb": values.get("Pss_Anon", 0.0)}
+
+def _run_workers(count: int, env: dict) -> dict:
+    workers = [
+        subprocess.Popen([sys.executable, "-c", PROBE], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env)
+        for _ in range(count)
+    ]
+    try:
+        load_seconds = [float(worker.stdout.readline()) for worker in workers]
+        memory = [_smaps_rollup_mb(worker.pid) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+    
+    return {
+        "workers": count,
+        "load_s": round(float(np.median(load_seconds)), 4),
+        **{f"mean_{name}": round(float(np.mean([m[name] for m in memory])), 1) for name in memory[0]},
+        "total_pss_mb": round(float(sum(m["pss_mb"] for m in memory)), 1)
+    }
+
+def _train(model_path: str, trees: int, depth: int, rows: int):
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from app.ml.predictor import save_compiled
+    from app.ml.training_data import generate_training_data
+    
+    X, y = generate_training_data(rows, seed=7)
+    model = RandomForestRegressor(n_estimators=trees, max_depth=depth, random_state=7, n_jobs=-1).fit(X, y)
+    model.set_params(n_jobs=None)
+    joblib.dump(model, model_path)
+    if save_compiled(model, model_path) is None:
+        raise SystemExit("Compiled forest unavailable: parity check against sklearn failed")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic training rows")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        model_path = os.path.join(model_dir, "population_model.joblib")
+        start = time.perf_counter()
+        _train(model_path, args.trees, args.depth, args.rows)
+        sizes = {name: round(os.path.getsize(os.path.join(model_dir, name)) / 2**20, 1) for name in sorted(os.listdir(model_dir))}
+        print(f"Trained {args.trees} trees of depth {args.depth} in {time.perf_counter() - start:.1f}s; artifact MB: {sizes}")
+        
+        for mode, mmap in (("mmap", "true"), ("pickle", "false")):
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{os.path.join(model_dir, 'bench.db')}",
+                "MODEL_PATH": model_path,
+                "MODEL_DIR": model_dir,
+                "MODEL_MMAP": mmap
+            }
+            for count in args.workers:
+                stats = _run_workers(count, env)
+                results[f"{mode}_{count}"] = stats
+                print(
+                    f"{mode:<6} workers={count:<3} load p50={stats['load_s'] * 1e3:8.1f}ms | per worker "
+                    f"RSS={stats['mean_rss_mb']:7.1f}MB PSS={stats['mean_pss_mb']:7.1f}MB "
+                    f"(anon {stats['mean_pss_anon_mb']:6.1f}MB) | total PSS={stats['total_pss_mb']:8.1f}MB"
+                )
+    
+    if args.output:
+        write_results({"environment": environment(), "artifact_mb": sizes, "workers": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Assert that the hot per-user queries are served by the (user_id, date) indexes.
+
+Runs EXPLAIN QUERY PLAN for each hot query against a throwaway SQLite
+database and fails if a query does not use its composite index or needs a
+temporary B-tree to sort. tests/test_query_plans.py makes the same checks
+under pytest.
+
+Run from project/backend:
+
+    python -m benchmarks.check_query_plans
+"""
+import os
+import sys
+import tempfile
+
+def hot_queries():
+    """(name, query, index it must use) for every hot per-user query"""
+    from app.database import PainEntry
+    from app.database import LifestyleEntry
+    from app.aggregates import recent_entry_queries
+    from app.utils.pagination import keyset_page_query, encode_cursor
+    from datetime import datetime
+    
+    cursor = encode_cursor(datetime(2024, 1, 1), "entry")
+    pain_query, lifestyle_query = recent_entry_queries("user")
+    
+    return [
+        ("pain history", keyset_page_query(PainEntry, "user", 30), "ix_pain_entries_user_id_date_id"),
+        ("pain history (next page)", keyset_page_query(PainEntry, "user", 30, cursor), "ix_pain_entries_user_id_date_id"),
+        ("lifestyle history (next page)", keyset_page_query(LifestyleEntry, "user", 30, cursor), "ix_lifestyle_entries_user_id_date_id"),
+        ("recent pain window", pain_query, "ix_pain_entries_user_id_date_id"),
+        ("recent lifestyle window", lifestyle_query, "ix_lifestyle_entries_user_id_date_id")
+    ]
+
+def query_plan(connection, query) -> str:
+    compiled = query.compile(connection.engine, compile_kwargs={"literal_binds": True})
+    return " | ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+
+def uses_index(plan: str, index_name: str) -> bool:
+    """Served by the index, in index order (no temporary B-tree to sort)"""
+    return index_name in plan and "TEMP B-TREE" not in plan
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Must be set before the app's engines are created
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'plans.db')}"
+        from app.database import engine
+        
+        failures = 0
+        with engine.connect() as connection:
+            for name, query, index_name in hot_queries():
+                plan = query_plan(connection, query)
+                ok = uses_index(plan, index_name)
+                failures += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {name}: {plan}")
+        engine.dispose()
+    
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""In-process ASGI load driver reporting latency percentiles and throughput per endpoint.
+
+Requests go through the full FastAPI app, lifespan included, over
+httpx's ASGI transport against whatever DATABASE_URL points at, so the
+numbers cover routing, validation, the database and the models but no
+network. Each (endpoint, concurrency) run keeps ``concurrency`` clients
+busy until ``--requests`` requests have completed. Users are drawn
+uniformly from the population, so cache hit rates depend on the ratio of
+requests to users.
+
+Run from project/backend against a database filled by benchmarks.synthetic:
+
+    python -m benchmarks.load --users 1000 --concurrency 1 8 32 --endpoints predictions dashboard
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+from .report import latency_summary, environment, write_results
+from .synthetic import user_ids as synthetic_user_ids
+
+ENDPOINTS = {
+    "predictions": lambda user_id: f"/api/v1/predictions?user_id={user_id}&days=7",
+    "recommendations": lambda user_id: f"/api/v1/recommendations?user_id={user_id}",
+    "dashboard": lambda user_id: f"/api/v1/dashboard?user_id={user_id}&days=7",
+    "history": lambda user_id: f"/api/v1/pain/{user_id}?limit=30",
+    "health": lambda user_id: "/health"
+}
+
+async def run_level(client, path_for, user_ids, requests: int, concurrency: int, seed: int = 0) -> dict:
+    """Drive ``requests`` requests with ``concurrency`` concurrent clients"""
+    rng = np.random.default_rng(seed)
+    paths = [path_for(user_ids[index]) for index in rng.integers(0, len(user_ids), requests)]
+    timings = np.empty(requests)
+    errors = 0
+    counter = iter(range(requests))
+    
+    async def client_loop():
+        nonlocal errors
+        for request_index in counter:
+            start = time.perf_counter()
+            response = await client.get(paths[request_index])
+            timings[request_index] = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    summary = latency_summary(timings, time.perf_counter() - start)
+    summary.update({"concurrency": concurrency, "errors": errors})
+    return summary
+
+async def run_load(endpoints, concurrency_levels, requests: int, user_ids, warmup: int = 50, seed: int = 0) -> dict:
+    """Run every endpoint at every concurrency level; returns {"endpoint@cN": summary}"""
+    import httpx
+    from app.main import app
+    
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in endpoints:
+                # Warm up (model load, connection pool) before timing
+                await run_level(client, ENDPOINTS[name], user_ids, warmup, 1, seed)
+                for concurrency in concurrency_levels:
+                    results[f"{name}@c{concurrency}"] = await run_level(
+                        client, ENDPOINTS[name], user_ids, requests, concurrency, seed + concurrency
+                    )
+    return results
+
+def print_summaries(results: dict):
+    for name, stats in results.items():
+        print(
+            f"{name:<24} p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms "
+            f"p99={stats['p99_ms']:8.2f}ms {stats['throughput_per_s']:>8} req/s errors={stats['errors']}"
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", nargs="+", default=["predictions", "recommendations", "dashboard", "history"], choices=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--users", type=int, default=1000, help="Number of synthetic users in the database")
+    parser.add_argument("--prefix", default="synth", help="User id prefix used when the data was generated")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    
+    results = asyncio.run(run_load(
+        args.endpoints, args.concurrency, args.requests, synthetic_user_ids(args.users, args.prefix), seed=args.seed
+    ))
+    print_summaries(results)
+    if args.output:
+        write_results({"environment": environment(), "load": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Microbenchmarks for the predictor and recommender, without HTTP or the database.
+
+Each benchmark calls one entry point in a loop over varied synthetic user
+contexts and reports per-call latency percentiles and calls per second.
+
+Run from project/backend:
+
+    python -m benchmarks.micro --iterations 2000 --output micro.json
+"""
+import argparse
+import time
+import numpy as np
+from .report import latency_summary, environment, write_results
+
+def _contexts(count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "historical_avg_pain": float(rng.uniform(1, 9)),
+            "current_cycle_day": int(rng.integers(1, 29)),
+            "days_to_next_period": int(rng.integers(1, 29)),
+            "avg_sleep": float(rng.uniform(4, 9)),
+            "avg_stress": float(rng.uniform(1, 10)),
+            "avg_exercise": float(rng.uniform(0, 90))
+        }
+        for _ in range(count)
+    ]
+
+def _time_calls(call, arguments, iterations: int) -> dict:
+    timings = np.empty(iterations)
+    for index in range(iterations):
+        argument = arguments[index % len(arguments)]
+        start = time.perf_counter()
+        call(argument)
+        timings[index] = time.perf_counter() - start
+    return latency_summary(timings)
+
+def run_micro(iterations: int = 2000, batch_size: int = 64, seed: int = 0) -> dict:
+    """Time the predictor and recommender entry points; returns {benchmark: summary}"""
+    from app.ml.predictor import predictor
+    from app.ml.recommender import ReliefRecommender
+    
+    predictor.load()
+    recommender = ReliefRecommender(seed=seed)
+    contexts = _contexts(512, seed)
+    batches = [contexts[offset:offset + batch_size] for offset in range(0, len(contexts), batch_size)]
+    predictions = [{"predicted_pain": context["historical_avg_pain"]} for context in contexts]
+    requests = [(f"user-{index}", prediction, None) for index, prediction in enumerate(predictions)]
+    
+    # Warm up lazy paths (compiled model, driver tables) before timing
+    predictor.predict_many(contexts[:batch_size], 7)
+    recommender.recommend_many(requests[:batch_size])
+    
+    results = {
+        "predict_for_user_7d": _time_calls(lambda context: predictor.predict_for_user(context, 7), contexts, iterations),
+        "predict_for_user_1d": _time_calls(lambda context: predictor.predict_for_user(context, 1), contexts, iterations),
+        f"predict_many_{batch_size}x7d": _time_calls(lambda batch: predictor.predict_many(batch, 7), batches, max(1, iterations // 10)),
+        "recommend_one": _time_calls(lambda request: recommender.recommend_many([request]), requests, iterations),
+        f"recommend_many_{batch_size}": _time_calls(
+            recommender.recommend_many,
+            [requests[offset:offset + batch_size] for offset in range(0, len(requests), batch_size)],
+            max(1, iterations // 10)
+        )
+    }
+    return results
+
+def print_summaries(results: dict):
+    for name, stats in results.items():
+        print(
+            f"{name:<28} p50={stats['p50_ms']:8.3f}ms p95={stats['p95_ms']:8.3f}ms "
+            f"p99={stats['p99_ms']:8.3f}ms {stats['throughput_per_s']:>10} /s"
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    
+    results = run_micro(args.iterations, args.batch_size, args.seed)
+    print_summaries(results)
+    if args.output:
+        write_results({"environment": environment(), "micro": results}, args.output)
+
+if __name__ == "__main__":
+    main()
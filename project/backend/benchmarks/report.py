@@ -0,0 +1,65 @@
+"""Shared helpers for turning timings into the suite's JSON results."""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+import numpy as np
+
+def latency_summary(timings, elapsed: float = None) -> dict:
+    """Percentiles (ms) and throughput for an array of per-call durations in seconds"""
+    timings = np.asarray(timings, dtype=float)
+    if not len(timings):
+        return {"count": 0}
+    elapsed = float(timings.sum()) if elapsed is None else elapsed
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1e3
+    return {
+        "count": int(len(timings)),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(timings.max()) * 1e3, 4),
+        "throughput_per_s": round(len(timings) / elapsed, 1) if elapsed > 0 else None
+    }
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, with a -dirty suffix for local changes"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty.strip() else commit
+
+def environment() -> dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "argv": sys.argv[1:]
+    }
+
+def write_results(results: dict, path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=2)
+        output.write("\n")
+
+def compare(baseline: dict, current: dict, metric: str = "p50_ms") -> list:
+    """(section, name, baseline, current, change) rows for every benchmark present in both runs"""
+    rows = []
+    for section in ("micro", "load"):
+        for name, stats in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name, {}).get(metric)
+            after = stats.get(metric)
+            if before and after is not None:
+                rows.append((section, name, before, after, after / before - 1))
+    return rows
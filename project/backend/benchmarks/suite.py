@@ -0,0 +1,85 @@
+"""Run the whole benchmark suite against a fresh synthetic database and save JSON results.
+
+Steps: generate --users x --days of synthetic entries into a throwaway
+SQLite database, run the predictor/recommender microbenchmarks, then the
+ASGI load driver over every endpoint and concurrency level. Results and
+the environment they came from (commit, Python, numpy, CPU count) go to
+one JSON file. With --baseline, the p50 of every benchmark is compared
+with an earlier run, so two commits can be compared by running the suite
+on each.
+
+Run from project/backend:
+
+    python -m benchmarks.suite --users 1000 --days 90
+    python -m benchmarks.suite --baseline benchmarks/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+def _print_comparison(rows, metric):
+    print(f"\n{metric} vs baseline:")
+    for section, name, before, after, change in rows:
+        print(f"  {section:<6} {name:<28} {before:10.3f} -> {after:10.3f} ({change:+.1%})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per microbenchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--endpoints", nargs="+", default=["predictions", "recommendations", "dashboard", "history"])
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Must be set before the app (and its engines) are imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        from app.database import SessionLocal
+        from .report import environment, write_results, compare
+        from .synthetic import populate, user_ids
+        from . import micro, load
+        
+        results = {"environment": environment(), "parameters": vars(args)}
+        
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            results["dataset"] = populate(db, args.users, args.days, seed=args.seed)
+            results["dataset"]["generate_seconds"] = round(time.perf_counter() - start, 2)
+        finally:
+            db.close()
+        print(f"Generated {results['dataset']}")
+        
+        if not args.skip_micro:
+            results["micro"] = micro.run_micro(args.iterations, seed=args.seed)
+            micro.print_summaries(results["micro"])
+        if not args.skip_load:
+            results["load"] = asyncio.run(load.run_load(
+                args.endpoints, args.concurrency, args.requests, user_ids(args.users), seed=args.seed
+            ))
+            load.print_summaries(results["load"])
+    
+    environment_info = results["environment"]
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results",
+        f"{environment_info['timestamp'].replace(':', '').replace('-', '')}-{environment_info['commit']}.json"
+    )
+    write_results(results, output)
+    print(f"\nResults written to {output}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        _print_comparison(compare(baseline, results), "p50_ms")
+
+if __name__ == "__main__":
+    main()
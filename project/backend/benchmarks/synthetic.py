@@ -0,0 +1,137 @@
+"""Fill the database with a synthetic population of users and daily entries.
+
+Every user gets a cycle length and phase, a baseline pain level and their
+own sleep/stress/exercise habits, and logs the first day of every period.
+Pain rises around the period, with short sleep and with high stress, and a
+user logs on each day with probability --log-rate. Rows are bulk-inserted a
+chunk of users at a time, then the rolling aggregates and cycle state are
+rebuilt, so the API sees the data exactly as if it had arrived through the
+endpoints.
+
+Run from project/backend (writes to DATABASE_URL):
+
+    python -m benchmarks.synthetic --users 1000 --days 90
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+import numpy as np
+
+USER_PREFIX = "synth"
+
+def user_ids(users: int, prefix: str = USER_PREFIX) -> list:
+    """Ids of the users generated by ``populate``"""
+    return [f"{prefix}-{index:07d}" for index in range(users)]
+
+def _generate_chunk(rng, ids, days, start, log_rate):
+    """Pain, lifestyle and period-start rows for a chunk of users, as lists of dicts"""
+    n = len(ids)
+    cycle_length = rng.integers(24, 34, n)[:, None]
+    phase = rng.integers(0, 34, n)[:, None]
+    baseline = rng.normal(3.0, 1.0, n)[:, None]
+    
+    cycle_day = (np.arange(days)[None, :] + phase) % cycle_length
+    sleep = np.clip(rng.normal(7.0, 0.8, n)[:, None] + rng.normal(0, 1.0, (n, days)), 3, 11)
+    stress = np.clip(np.rint(rng.normal(5.0, 1.5, n)[:, None] + rng.normal(0, 1.5, (n, days))), 1, 10)
+    exercise = np.clip(rng.normal(30, 15, n)[:, None] + rng.normal(0, 15, (n, days)), 0, 180).astype(int)
+    hydration = np.clip(rng.normal(2.0, 0.5, (n, days)), 0.5, 4.0)
+    
+    pain = (
+        baseline
+        + np.where(cycle_day < 3, 3.5 - cycle_day, 0.0)
+        + np.where(cycle_length - cycle_day <= 3, 1.5, 0.0)
+        + (7.0 - sleep) * 0.4
+        + (stress - 5.0) * 0.3
+        + rng.normal(0, 1.0, (n, days))
+    )
+    pain = np.clip(np.rint(pain), 0, 10).astype(int)
+    productivity = np.clip(np.rint(pain * 0.6 + rng.normal(0, 1, (n, days))), 0, 10).astype(int)
+    logged_pain = rng.random((n, days)) < log_rate
+    logged_lifestyle = rng.random((n, days)) < log_rate
+    
+    dates = [start + timedelta(days=day, hours=8) for day in range(days)]
+    pain_rows, lifestyle_rows, period_rows = [], [], []
+    for row, user_id in enumerate(ids):
+        for day in np.flatnonzero(cycle_day[row] == 0):
+            period_rows.append({"id": str(uuid.uuid4()), "user_id": user_id, "date": dates[day].replace(hour=0)})
+        for day in np.flatnonzero(logged_pain[row]):
+            pain_rows.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "date": dates[day],
+                "pain_score": int(pain[row, day]),
+                "pain_type": "cramps",
+                "productivity_impact": int(productivity[row, day])
+            })
+        for day in np.flatnonzero(logged_lifestyle[row]):
+            lifestyle_rows.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "date": dates[day],
+                "sleep_hours": round(float(sleep[row, day]), 1),
+                "exercise_minutes": int(exercise[row, day]),
+                "stress_level": int(stress[row, day]),
+                "hydration_liters": round(float(hydration[row, day]), 1)
+            })
+    return pain_rows, lifestyle_rows, period_rows
+
+def populate(db, users: int, days: int, seed: int = 0, log_rate: float = 0.8,
+             chunk_users: int = 500, prefix: str = USER_PREFIX, end: datetime = None) -> dict:
+    """Insert ``users`` synthetic users with ``days`` days of entries ending at ``end``.
+    
+    Returns row counts. Generation is deterministic for a given seed.
+    """
+    from sqlalchemy import insert
+    from app.database import User, PainEntry, LifestyleEntry, PeriodStart
+    from app.aggregates import rebuild_aggregates
+    from app.cycles import rebuild_cycles
+    
+    rng = np.random.default_rng(seed)
+    end = end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    ids = user_ids(users, prefix)
+    
+    counts = {"users": users, "pain_entries": 0, "lifestyle_entries": 0, "period_starts": 0}
+    for offset in range(0, users, chunk_users):
+        chunk = ids[offset:offset + chunk_users]
+        pain_rows, lifestyle_rows, period_rows = _generate_chunk(rng, chunk, days, start, log_rate)
+        db.execute(insert(User), [{"user_id": user_id, "created_at": start} for user_id in chunk])
+        if pain_rows:
+            db.execute(insert(PainEntry), pain_rows)
+        if lifestyle_rows:
+            db.execute(insert(LifestyleEntry), lifestyle_rows)
+        if period_rows:
+            db.execute(insert(PeriodStart), period_rows)
+        db.commit()
+        counts["pain_entries"] += len(pain_rows)
+        counts["lifestyle_entries"] += len(lifestyle_rows)
+        counts["period_starts"] += len(period_rows)
+    
+    rebuild_aggregates(db)
+    rebuild_cycles(db)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--log-rate", type=float, default=0.8, help="Probability that a user logs on a given day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prefix", default=USER_PREFIX, help="User id prefix")
+    args = parser.parse_args(argv)
+    
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        counts = populate(db, args.users, args.days, seed=args.seed, log_rate=args.log_rate, prefix=args.prefix)
+    finally:
+        db.close()
+    print(
+        f"Inserted {counts['users']} users, {counts['pain_entries']} pain and "
+        f"{counts['lifestyle_entries']} lifestyle entries in {time.perf_counter() - start:.1f}s"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import atexit
+import os
+import shutil
+import tempfile
+import uuid
+import pytest
+
+# Must be set before the app (and its engines) are imported, so tests never touch pain_predictor.db
+_DB_DIR = tempfile.mkdtemp(prefix="pain-predictor-tests-")
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.setdefault("MODEL_RELOAD_INTERVAL_SECONDS", "0")
+os.environ.setdefault("ENCRYPTION_KEY", "test-encryption-key")
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def user_id():
+    """A fresh user id, so tests sharing the database never see each other's entries"""
+    return f"test-{uuid.uuid4()}"
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+import pytest
+from app import aggregates
+from app.aggregates import aggregate_averages, apply_pain_entry, _recompute
+from app.api import pain, users
+from app.database import SessionLocal, PainEntry, LifestyleEntry, UserAggregate
+
+def _seed_entries_without_aggregate(user_id, count=10):
+    """Entries as they were stored before aggregates existed: no aggregate row"""
+    start = datetime.utcnow() - timedelta(days=count + 1)
+    db = SessionLocal()
+    try:
+        for day in range(count):
+            db.add(PainEntry(user_id=user_id, date=start + timedelta(days=day), pain_score=9))
+            db.add(LifestyleEntry(
+                user_id=user_id, date=start + timedelta(days=day),
+                sleep_hours=5.0, exercise_minutes=10, stress_level=8, hydration_liters=1.5
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+def _stored_and_expected(user_id):
+    db = SessionLocal()
+    try:
+        stored = db.get(UserAggregate, user_id)
+        return aggregate_averages(stored), aggregate_averages(_recompute(user_id, db))
+    finally:
+        db.close()
+
+def test_first_pain_entry_after_upgrade_keeps_history(client, user_id):
+    _seed_entries_without_aggregate(user_id)
+    
+    response = client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 1})
+    assert response.status_code == 200
+    
+    stored, expected = _stored_and_expected(user_id)
+    assert stored["data_points"] == 11
+    assert stored["historical_avg_pain"] == pytest.approx((9 * 10 + 1) / 11)
+    assert stored == pytest.approx(expected)
+
+def test_first_lifestyle_entry_after_upgrade_keeps_history(client, user_id):
+    _seed_entries_without_aggregate(user_id)
+    
+    response = client.post(
+        "/api/v1/lifestyle", params={"user_id": user_id},
+        json={"sleep_hours": 9.0, "exercise_minutes": 60, "stress_level": 1, "hydration_liters": 2.0}
+    )
+    assert response.status_code == 200
+    
+    stored, expected = _stored_and_expected(user_id)
+    assert stored["data_points"] == 10
+    assert stored == pytest.approx(expected)
+
+def test_first_batch_after_upgrade_keeps_history(client, user_id):
+    _seed_entries_without_aggregate(user_id)
+    
+    response = client.post("/api/v1/entries/batch", params={"user_id": user_id}, json=[
+        {"type": "pain", "pain_score": 1},
+        {"type": "pain", "pain_score": 2},
+        {"type": "lifestyle", "sleep_hours": 9.0, "exercise_minutes": 60, "stress_level": 1, "hydration_liters": 2.0}
+    ])
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+    
+    stored, expected = _stored_and_expected(user_id)
+    assert stored["data_points"] == 12
+    assert stored == pytest.approx(expected)
+
+def _after_first_lookup(monkeypatch, write):
+    """Patch the routes' aggregate lookup so a concurrent request commits ``write(db, user_id)`` between
+    the first read and its commit"""
+    original = aggregates.get_aggregate_for_update
+    calls = []
+    
+    async def lookup(user_id, db):
+        aggregate = await original(user_id, db)
+        calls.append(user_id)
+        if len(calls) == 1:
+            other = SessionLocal()
+            try:
+                write(other, user_id)
+                other.commit()
+            finally:
+                other.close()
+        return aggregate
+    
+    for module in (pain, users):
+        monkeypatch.setattr(module, "get_aggregate_for_update", lookup)
+    return calls
+
+def _concurrent_pain_entry(db, user_id):
+    entry = PainEntry(user_id=user_id, date=datetime.utcnow(), pain_score=9)
+    db.add(entry)
+    apply_pain_entry(db.get(UserAggregate, user_id), entry.date, entry.pain_score)
+
+def test_concurrent_pain_entries_are_both_counted(client, user_id, monkeypatch):
+    assert client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 1}).status_code == 200
+    calls = _after_first_lookup(monkeypatch, _concurrent_pain_entry)
+    
+    response = client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 3})
+    assert response.status_code == 200
+    assert len(calls) == 2
+    
+    stored, expected = _stored_and_expected(user_id)
+    assert stored["data_points"] == 3
+    assert stored["historical_avg_pain"] == pytest.approx((1 + 9 + 3) / 3)
+    assert stored == pytest.approx(expected)
+
+def test_concurrent_lifestyle_and_pain_entries_are_both_counted(client, user_id, monkeypatch):
+    assert client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 1}).status_code == 200
+    _after_first_lookup(monkeypatch, _concurrent_pain_entry)
+    
+    response = client.post(
+        "/api/v1/lifestyle", params={"user_id": user_id},
+        json={"sleep_hours": 6.0, "exercise_minutes": 20, "stress_level": 4, "hydration_liters": 2.0}
+    )
+    assert response.status_code == 200
+    
+    stored, expected = _stored_and_expected(user_id)
+    assert stored["data_points"] == 2
+    assert stored["avg_sleep"] == 6.0
+    assert stored == pytest.approx(expected)
+
+def test_concurrent_aggregate_creation_is_retried(client, user_id, monkeypatch):
+    _after_first_lookup(monkeypatch, lambda db, user_id: db.add(aggregates.new_aggregate(user_id)))
+    
+    response = client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 5})
+    assert response.status_code == 200
+    
+    stored, expected = _stored_and_expected(user_id)
+    assert stored["data_points"] == 1
+    assert stored == pytest.approx(expected)
+
+def test_rebuild_overwrites_existing_aggregates(client, user_id):
+    for score in (2, 4):
+        assert client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": score}).status_code == 200
+    
+    db = SessionLocal()
+    try:
+        db.get(UserAggregate, user_id).pain_sum = 100.0
+        db.commit()
+        aggregates.rebuild_aggregates(db)
+    finally:
+        db.close()
+    
+    stored, expected = _stored_and_expected(user_id)
+    assert stored["historical_avg_pain"] == 3.0
+    assert stored == pytest.approx(expected)
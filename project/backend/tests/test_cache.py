@@ -0,0 +1,44 @@
+from datetime import datetime
+from app.aggregates import apply_pain_entry
+from app.database import SessionLocal, UserAggregate, UserModel
+from app.utils.cache import prediction_cache
+
+def _cached_context(user_id):
+    """The most recently cached context of a user"""
+    contexts = [value for key, (_, value) in prediction_cache.backend._entries.items() if key[:2] == (user_id, "context")]
+    return contexts[-1]
+
+def _write_from_another_worker(user_id, change):
+    """Commit a change the way another worker process would: this process's cache isn't invalidated"""
+    db = SessionLocal()
+    try:
+        change(db)
+        db.commit()
+    finally:
+        db.close()
+
+def test_context_sees_aggregate_written_by_another_worker(client, user_id):
+    assert client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 2}).status_code == 200
+    assert client.get("/api/v1/predictions", params={"user_id": user_id}).status_code == 200
+    assert _cached_context(user_id)["data_points"] == 1
+    
+    _write_from_another_worker(
+        user_id, lambda db: apply_pain_entry(db.get(UserAggregate, user_id), datetime.utcnow(), 8)
+    )
+    
+    assert client.get("/api/v1/predictions", params={"user_id": user_id}).status_code == 200
+    context = _cached_context(user_id)
+    assert context["data_points"] == 2
+    assert context["historical_avg_pain"] == 5.0
+
+def test_context_sees_correction_fitted_by_another_process(client, user_id):
+    assert client.post("/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 2}).status_code == 200
+    assert client.get("/api/v1/predictions", params={"user_id": user_id}).status_code == 200
+    assert _cached_context(user_id)["personal_bias"] == 0.0
+    
+    _write_from_another_worker(user_id, lambda db: db.add(UserModel(
+        user_id=user_id, bias=1.5, slope=1.0, n_samples=20, base_version="test", fitted_at=datetime.utcnow()
+    )))
+    
+    assert client.get("/api/v1/predictions", params={"user_id": user_id}).status_code == 200
+    assert _cached_context(user_id)["personal_bias"] == 1.5
@@ -0,0 +1,42 @@
+import json
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.database import SessionLocal, Forecast
+from app.ml.predictor import predictor
+
+# Between them, at least one of these is on a different calendar day than UTC at any moment
+FAR_ZONES = ["Etc/GMT-14", "Etc/GMT+12"]
+
+@pytest.fixture(params=FAR_ZONES)
+def local_zone(request, monkeypatch):
+    monkeypatch.setenv("TZ", request.param)
+    time.tzset()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+
+def _utc_dates(days):
+    today = datetime.utcnow().date()
+    return [(today + timedelta(days=day)).isoformat() for day in range(days)]
+
+def test_live_forecast_starts_on_the_utc_day(client, user_id, local_zone):
+    response = client.get("/api/v1/predictions", params={"user_id": user_id, "days": 3})
+    assert response.status_code == 200
+    assert [prediction["date"] for prediction in response.json()["predictions"]] == _utc_dates(3)
+
+def test_stored_forecast_is_looked_up_by_utc_day(client, user_id, local_zone):
+    db = SessionLocal()
+    try:
+        for date in _utc_dates(3):
+            db.add(Forecast(
+                user_id=user_id, date=date, model_version=predictor.model_version, predicted_pain=-1.0,
+                severe_probability=0.0, confidence_low=0.0, confidence_high=0.0, drivers=json.dumps([])
+            ))
+        db.commit()
+    finally:
+        db.close()
+    
+    response = client.get("/api/v1/predictions", params={"user_id": user_id, "days": 3})
+    assert response.status_code == 200
+    assert [prediction["predicted_pain"] for prediction in response.json()["predictions"]] == [-1.0] * 3
@@ -0,0 +1,21 @@
+from app.database import SessionLocal, PainEntry
+
+def test_dashboard_returns_plaintext_notes(client, user_id):
+    response = client.post(
+        "/api/v1/pain", params={"user_id": user_id}, json={"pain_score": 6, "notes": "cramps after coffee"}
+    )
+    assert response.status_code == 200
+    
+    # Stored encrypted...
+    db = SessionLocal()
+    try:
+        stored = db.query(PainEntry.notes).filter(PainEntry.user_id == user_id).scalar()
+    finally:
+        db.close()
+    assert stored.startswith("enc:v")
+    
+    # ...but served decrypted
+    response = client.get("/api/v1/dashboard", params={"user_id": user_id})
+    assert response.status_code == 200
+    entries = response.json()["pain_history"]["entries"]
+    assert [entry["notes"] for entry in entries] == ["cramps after coffee"]
@@ -0,0 +1,36 @@
+from app.config import DEFAULT_ENCRYPTION_KEY
+from app.utils.encryption import DataEncryptor, encryptor
+
+def test_default_key_is_flagged():
+    assert DataEncryptor({1: DEFAULT_ENCRYPTION_KEY}, 1).uses_default_key
+    assert not DataEncryptor({1: "a-real-key", 2: DEFAULT_ENCRYPTION_KEY}, 1).uses_default_key
+
+def test_health_fails_while_the_default_key_is_in_use(client, monkeypatch):
+    assert client.get("/health").json()["encryption"]["error"] is None
+    
+    monkeypatch.setattr(encryptor, "uses_default_key", True)
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unhealthy"
+    assert "ENCRYPTION_KEY" in response.json()["encryption"]["error"]
+
+def test_values_that_only_look_tagged_are_plaintext():
+    cipher = DataEncryptor({1: "a-real-key"}, 1)
+    for value in ("enc:v", "enc:vx:note", "enc:v1 no separator", "enc:v:empty version", "enc:v-1:negative"):
+        assert cipher.decrypt(value) == value
+    tagged = cipher.encrypt("real note")
+    assert cipher.decrypt_many(["enc:vx:note", tagged]) == ["enc:vx:note", "real note"]
+
+def test_history_serves_a_legacy_note_that_looks_tagged(client, user_id):
+    from app.database import SessionLocal, PainEntry
+    db = SessionLocal()
+    try:
+        db.add(PainEntry(user_id=user_id, pain_score=3, notes="enc:vintage heat pad helped"))
+        db.commit()
+    finally:
+        db.close()
+    
+    for path, params in ((f"/api/v1/pain/{user_id}", {}), ("/api/v1/dashboard", {"user_id": user_id})):
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+    assert response.json()["pain_history"]["entries"][0]["notes"] == "enc:vintage heat pad helped"
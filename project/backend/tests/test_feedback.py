@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from app.feedback import FeedbackQueue
+
+class _Unavailable:
+    """Session factory for a database that is down"""
+    
+    def __call__(self):
+        return self
+    
+    async def __aenter__(self):
+        raise ConnectionError("database unavailable")
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+def _submit(queue, count, start=0):
+    for number in range(start, start + count):
+        queue.submit(f"user-{number}", "heat_pad", 4, 2, 0.5)
+
+def test_failed_flushes_keep_at_most_max_pending_rows():
+    queue = FeedbackQueue(batch_size=10, flush_interval=1.0, session_factory=_Unavailable(), max_pending=5)
+    _submit(queue, 3)
+    with pytest.raises(ConnectionError):
+        asyncio.run(queue.flush())
+    _submit(queue, 4, start=3)
+    with pytest.raises(ConnectionError):
+        asyncio.run(queue.flush())
+    
+    assert len(queue.pending) == 5
+    assert queue.dropped == 2
+    # The oldest rows are the ones dropped
+    assert [row["user_id"] for row in queue.pending] == [f"user-{number}" for number in range(2, 7)]
+    assert queue.last_error == "database unavailable"
+
+def test_stop_logs_instead_of_raising_when_the_database_is_down(caplog):
+    queue = FeedbackQueue(batch_size=10, flush_interval=60.0, session_factory=_Unavailable())
+    
+    async def run():
+        await queue.start()
+        _submit(queue, 3)
+        await queue.stop()
+    
+    asyncio.run(run())
+    assert "Could not write 3 buffered feedback rows at shutdown" in caplog.text
@@ -0,0 +1,55 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from app.ml.forest import CompiledForest
+from app.ml.predictor import PainPredictor, compile_model, save_compiled, compiled_path, tree_predictions
+from app.ml.training_data import generate_training_data
+
+@pytest.fixture(scope="module")
+def forest():
+    X, y = generate_training_data(2000, seed=3)
+    model = RandomForestRegressor(n_estimators=15, max_depth=8, random_state=3).fit(X, y)
+    return model, X[:300]
+
+def _assert_matches(compiled, model, X):
+    assert np.allclose(compiled.predict(X), model.predict(X), rtol=0, atol=1e-9)
+    assert np.allclose(compiled.predict_trees(X), tree_predictions(model, X), rtol=0, atol=1e-9)
+
+def test_compiled_forest_matches_sklearn(forest):
+    model, X = forest
+    compiled = compile_model(model)
+    assert compiled is not None
+    _assert_matches(compiled, model, X)
+    _assert_matches(compiled, model, X[:1])
+
+def test_memory_mapped_forest_matches_sklearn(forest, tmp_path):
+    model, X = forest
+    model_path = str(tmp_path / "population_model.joblib")
+    joblib.dump(model, model_path)
+    assert save_compiled(model, model_path) is not None
+    
+    loaded, metadata = CompiledForest.load(compiled_path(model_path), mmap=True)
+    assert isinstance(loaded.value.base, np.memmap)
+    assert not loaded.value.flags.writeable
+    _assert_matches(loaded, model, X)
+    _assert_matches(loaded, model, X[:1])
+    
+    predictor = PainPredictor(model_path=model_path, model_dir=str(tmp_path))
+    assert predictor._open_compiled(compiled_path(model_path), source_path=model_path) is not None
+
+def test_compiled_forest_of_another_model_file_is_ignored(forest, tmp_path):
+    model, _ = forest
+    model_path = str(tmp_path / "population_model.joblib")
+    joblib.dump(model, model_path)
+    save_compiled(model, model_path)
+    
+    # Retrained in place without recompiling: the sidecar no longer matches
+    joblib.dump(RandomForestRegressor(n_estimators=2, random_state=0).fit(*generate_training_data(50, seed=1)), model_path)
+    predictor = PainPredictor(model_path=model_path, model_dir=str(tmp_path))
+    assert predictor._open_compiled(compiled_path(model_path), source_path=model_path) is None
+
+def test_compile_model_keeps_sklearn_when_the_parity_probe_fails(forest, monkeypatch):
+    model, _ = forest
+    monkeypatch.setattr(CompiledForest, "matches", lambda self, model, X, atol=1e-9: False)
+    assert compile_model(model) is None
@@ -0,0 +1,90 @@
+import json
+from datetime import datetime
+from app import ingest
+from app.aggregates import aggregate_averages, new_aggregate, _recompute
+from app.config import settings
+from app.database import SessionLocal, PainEntry, IngestKey, UserAggregate
+
+def _post_ndjson(client, user_id, records):
+    return client.post(
+        "/api/v1/entries/batch",
+        params={"user_id": user_id},
+        content="\n".join(json.dumps(record) for record in records),
+        headers={"content-type": "application/x-ndjson"}
+    )
+
+def _stored_pain_entries(user_id):
+    db = SessionLocal()
+    try:
+        return db.query(PainEntry).filter(PainEntry.user_id == user_id).count()
+    finally:
+        db.close()
+
+def _concurrently(write):
+    """Patch the aggregate lookup so another writer commits ``write(user_id)`` right after the first lookup"""
+    original = ingest.get_aggregate_for_update
+    calls = []
+    
+    async def lookup(user_id, db):
+        aggregate = await original(user_id, db)
+        calls.append(user_id)
+        if len(calls) == 1:
+            other = SessionLocal()
+            try:
+                other.add(write(user_id))
+                other.commit()
+            finally:
+                other.close()
+        return aggregate
+    return lookup
+
+def test_ndjson_over_limit_stores_records_up_to_it_and_reports_the_rest(client, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_MAX_RECORDS", 3)
+    monkeypatch.setattr(settings, "INGEST_CHUNK_SIZE", 2)
+    
+    response = _post_ndjson(client, user_id, [{"type": "pain", "pain_score": score} for score in range(5)])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 3
+    assert body["errors"] == 1
+    assert [result["status"] for result in body["results"]] == ["created"] * 3 + ["error"]
+    assert body["results"][3]["index"] == 3
+    assert _stored_pain_entries(user_id) == 3
+
+def test_json_array_over_limit_is_rejected_before_storing(client, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_MAX_RECORDS", 3)
+    
+    response = client.post(
+        "/api/v1/entries/batch", params={"user_id": user_id},
+        json=[{"type": "pain", "pain_score": score} for score in range(5)]
+    )
+    assert response.status_code == 413
+    assert _stored_pain_entries(user_id) == 0
+
+def test_concurrent_aggregate_creation_is_retried(client, user_id, monkeypatch):
+    monkeypatch.setattr(ingest, "get_aggregate_for_update", _concurrently(new_aggregate))
+    
+    response = _post_ndjson(client, user_id, [{"type": "pain", "pain_score": 4, "idempotency_key": "a"}])
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert _stored_pain_entries(user_id) == 1
+    
+    db = SessionLocal()
+    try:
+        assert aggregate_averages(db.get(UserAggregate, user_id)) == aggregate_averages(_recompute(user_id, db))
+    finally:
+        db.close()
+
+def test_concurrently_claimed_idempotency_key_is_reported(client, user_id, monkeypatch):
+    def claim_key(user_id):
+        return IngestKey(
+            user_id=user_id, idempotency_key="a", entry_type="pain", entry_id="other-upload", created_at=datetime.utcnow()
+        )
+    monkeypatch.setattr(ingest, "get_aggregate_for_update", _concurrently(claim_key))
+    
+    response = _post_ndjson(client, user_id, [{"type": "pain", "pain_score": 4, "idempotency_key": "a"}])
+    assert response.status_code == 200
+    result = response.json()["results"][0]
+    assert result["status"] == "error"
+    assert "Conflicting concurrent upload" in result["errors"]
+    assert _stored_pain_entries(user_id) == 0
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, timedelta
+from app.database import SessionLocal, PainEntry, Forecast, UserModel
+from app.jobs.personalize import fit_user_models
+from app.ml.predictor import predictor
+
+def _store_forecast(user_id, days, predicted_pain):
+    """Precomputed rows as the precompute job would have left them before the refit"""
+    today = datetime.utcnow().date()
+    db = SessionLocal()
+    try:
+        for day in range(days):
+            db.add(Forecast(
+                user_id=user_id, date=(today + timedelta(days=day)).isoformat(), model_version=predictor.model_version,
+                predicted_pain=predicted_pain, severe_probability=0.0, confidence_low=0.0, confidence_high=0.0,
+                drivers=json.dumps([])
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+def test_refit_drops_stale_forecasts(client, user_id):
+    # Consistently far above what the population model predicts, so the correction is large
+    db = SessionLocal()
+    try:
+        start = datetime.utcnow() - timedelta(days=20)
+        for day in range(20):
+            db.add(PainEntry(user_id=user_id, date=start + timedelta(days=day), pain_score=10))
+        db.commit()
+    finally:
+        db.close()
+    _store_forecast(user_id, 7, predicted_pain=-1.0)
+    served = client.get("/api/v1/predictions", params={"user_id": user_id}).json()["predictions"]
+    assert [prediction["predicted_pain"] for prediction in served] == [-1.0] * 7
+    
+    fit_user_models(min_entries=5)
+    
+    db = SessionLocal()
+    try:
+        assert db.get(UserModel, user_id) is not None
+        assert db.query(Forecast).filter(Forecast.user_id == user_id).count() == 0
+    finally:
+        db.close()
+    
+    response = client.get("/api/v1/predictions", params={"user_id": user_id})
+    assert response.status_code == 200
+    assert all(prediction["predicted_pain"] > 0 for prediction in response.json()["predictions"])
@@ -0,0 +1,9 @@
+import pytest
+from app.database import engine
+from benchmarks.check_query_plans import hot_queries, query_plan, uses_index
+
+@pytest.mark.parametrize("name, query, index_name", hot_queries(), ids=[name for name, _, _ in hot_queries()])
+def test_hot_query_uses_its_composite_index(name, query, index_name):
+    with engine.connect() as connection:
+        plan = query_plan(connection, query)
+    assert uses_index(plan, index_name), f"{name}: {plan}"
@@ -0,0 +1,52 @@
+import csv
+import gzip
+import os
+import pytest
+from app.cli import main
+from app.config import settings, DEFAULT_SECRET_KEY
+from app.database import SessionLocal, User
+from app.jobs.research_export import export_research_data, ResearchExportRefused
+from app.utils.privacy import anonymize_user_id
+
+@pytest.fixture
+def default_keys(monkeypatch):
+    monkeypatch.setattr(settings, "RESEARCH_EXPORT_KEY", "")
+    monkeypatch.setattr(settings, "SECRET_KEY", DEFAULT_SECRET_KEY)
+
+def test_refuses_to_hash_with_the_default_secret_key(default_keys, tmp_path):
+    output_dir = tmp_path / "export"
+    with pytest.raises(ResearchExportRefused):
+        export_research_data(str(output_dir), workers=1)
+    assert not output_dir.exists()
+
+def test_cli_exits_with_an_error_without_a_key(default_keys, tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["export-research", str(tmp_path / "export"), "--workers", "1"])
+    assert exit_info.value.code == 1
+    assert "RESEARCH_EXPORT_KEY" in capsys.readouterr().out
+
+def test_exports_consenting_users_under_an_explicit_key(default_keys, client, user_id, tmp_path):
+    withdrawn = user_id + "-withdrawn"
+    db = SessionLocal()
+    try:
+        db.add(User(user_id=user_id))
+        db.add(User(user_id=withdrawn, consent_flags='{"analytics": false, "personalization": true}'))
+        db.commit()
+    finally:
+        db.close()
+    for member in (user_id, withdrawn):
+        response = client.post("/api/v1/pain", params={"user_id": member}, json={"pain_score": 6, "notes": "private"})
+        assert response.status_code == 200
+    
+    manifest = export_research_data(str(tmp_path), workers=1, key="partner-key")
+    
+    rows = []
+    for part in manifest["parts"]:
+        with gzip.open(os.path.join(tmp_path, part["file"]), "rt", newline="") as source:
+            rows.extend(csv.DictReader(source))
+    hashes = {row["user_hash"] for row in rows}
+    assert anonymize_user_id(user_id, "partner-key") in hashes
+    assert anonymize_user_id(withdrawn, "partner-key") not in hashes
+    exported = [row for row in rows if row["user_hash"] == anonymize_user_id(user_id, "partner-key")]
+    assert [row["pain_score"] for row in exported] == ["6"]
+    assert "notes" not in exported[0]
@@ -0,0 +1,28 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous next to the ~1s a cold import takes, so only a real regression (e.g. training at import) trips it
+STARTUP_BUDGET_SECONDS = 5.0
+
+PROBE = (
+    "import json, sys, time; start = time.perf_counter(); "
+    "import app.main; "
+    "from app.ml.predictor import predictor; "
+    "print(json.dumps({'seconds': time.perf_counter() - start, 'status': predictor.status, "
+    "'modules': [name for name in ('sklearn', 'pandas') if name in sys.modules]}))"
+)
+
+def test_importing_the_app_is_cheap(tmp_path):
+    """A new worker imports app.main without loading the model or the heavy ML/data libraries"""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    
+    assert result["status"] == "not_loaded"
+    assert result["modules"] == []
+    assert result["seconds"] < STARTUP_BUDGET_SECONDS